@@ -10,6 +10,26 @@ class JWTConfig(BaseViewModel):
     expires: int = Field(..., title="JWT Expires", description="JWT 过期时间")
     issuer: str = Field(..., title="JWT Issuer", description="JWT 签发者")
     issue_at: int = Field(..., title="JWT Issue At", description="JWT 签发时间")
+    verified_cache_size: int = Field(
+        4096, title="Verified Cache Size", description="已验证 token 缓存条目数，0 表示关闭"
+    )
+    verified_cache_ttl: int = Field(
+        300, title="Verified Cache TTL", description="已验证 token 缓存最长存活时间（秒）"
+    )
+    revocation_mode: str = Field(
+        "memory",
+        title="Revocation Mode",
+        description="撤销名单模式: redis(每次查询 Redis), memory(进程内集合), bloom(进程内布隆过滤器)",
+    )
+    revocation_channel: str = Field(
+        "jwt_revocation", title="Revocation Channel", description="撤销消息发布订阅频道"
+    )
+    revocation_bloom_capacity: int = Field(
+        100000, title="Revocation Bloom Capacity", description="布隆过滤器预计容量"
+    )
+    revocation_bloom_error_rate: float = Field(
+        0.001, title="Revocation Bloom Error Rate", description="布隆过滤器误判率"
+    )
     # audience: str = Field( "", title="", description="")
 
 
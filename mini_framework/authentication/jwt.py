@@ -1,11 +1,9 @@
 import os
 
 import jwt
-from cryptography import x509
-from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives import serialization
 
 from ..authentication.config import authentication_config
+from ..authentication.jwt_cache import JWTKeyStore, VerifiedTokenCache
 from ..context import env
 from ..design_patterns.singleton import singleton
 from ..utils.log import logger
@@ -21,6 +19,15 @@ class JWTUtils:
         self.jwt_rules: JWTRules = get_injector(JWTRules)
         self.__cert_file = os.path.join(env.app_root, "cert", "token_jwt_key.key")
         self.__certification = None
+        self.__key_store = JWTKeyStore()
+        self.__verified_cache = VerifiedTokenCache(
+            maxsize=max(self.jwt_config.verified_cache_size, 1),
+            max_ttl=(
+                self.jwt_config.verified_cache_ttl
+                if self.jwt_config.verified_cache_size > 0
+                else 0
+            ),
+        )
 
     @property
     def certification(self):
@@ -65,20 +72,22 @@ class JWTUtils:
             client_id = self.jwt_config.audience
         if cert is None:
             cert = self.certification
-        certificate = x509.load_pem_x509_certificate(cert, default_backend())
-        public_bytes = certificate.public_key().public_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PublicFormat.SubjectPublicKeyInfo,
-        )
-        jwt_payload = jwt.decode(
-            token,
-            key=public_bytes,
-            algorithms=self.jwt_config.algorithm,
-            audience=client_id,
-            **kwargs
-        )
+        fingerprint, public_key = self.__key_store.get_public_key(cert)
+        # 自定义解码参数可能改变校验行为，此时不使用已验证缓存
+        jwt_payload = None if kwargs else self.__verified_cache.get(token, client_id, fingerprint)
+        if jwt_payload is None:
+            jwt_payload = jwt.decode(
+                token,
+                key=public_key,
+                algorithms=self.jwt_config.algorithm,
+                audience=client_id,
+                **kwargs
+            )
+            if not kwargs:
+                self.__verified_cache.put(token, client_id, fingerprint, jwt_payload)
         verified = await self.jwt_rules.verify(token)
         if verified:
+            self.__verified_cache.evict(token)
             logger.error("Token has been revoked")
             raise jwt.InvalidTokenError("Token has been revoked")
         return jwt_payload
@@ -109,6 +118,7 @@ class JWTUtils:
         :param token: JWT
         """
         payload = self.get_payload(token)
+        self.__verified_cache.evict(token)
         await self.jwt_rules.destroy(token, payload["exp"])
 
 
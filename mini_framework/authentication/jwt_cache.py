@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import hashlib
+import time
+
+from cachetools import LRUCache, TLRUCache
+from cryptography import x509
+from cryptography.hazmat.backends import default_backend
+
+from ..design_patterns.singleton import singleton
+
+
+def _to_bytes(content: str | bytes) -> bytes:
+    if isinstance(content, str):
+        return content.encode("utf-8")
+    return content
+
+
+def token_digest(token: str) -> str:
+    """
+    计算 token 摘要，避免在内存中以 token 原文作为键
+    :param token: JWT
+    :return: SHA256 摘要
+    """
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+@singleton
+class JWTKeyStore:
+    """
+    JWT 公钥仓库
+    每个证书（全局证书与各租户 cert_content）只解析一次，以证书指纹为键缓存公钥对象
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.__keys: LRUCache = LRUCache(maxsize=maxsize)
+
+    @staticmethod
+    def fingerprint(cert: str | bytes) -> str:
+        """
+        计算证书指纹
+        :param cert: PEM 格式证书内容
+        :return: 证书指纹
+        """
+        return hashlib.sha256(_to_bytes(cert)).hexdigest()
+
+    def get_public_key(self, cert: str | bytes):
+        """
+        获取证书公钥
+        :param cert: PEM 格式证书内容
+        :return: (证书指纹, 公钥对象)
+        """
+        fingerprint = self.fingerprint(cert)
+        public_key = self.__keys.get(fingerprint)
+        if public_key is None:
+            certificate = x509.load_pem_x509_certificate(_to_bytes(cert), default_backend())
+            public_key = certificate.public_key()
+            self.__keys[fingerprint] = public_key
+        return fingerprint, public_key
+
+    def clear(self):
+        """
+        清空公钥缓存，证书轮换时调用
+        """
+        self.__keys.clear()
+
+
+class VerifiedTokenCache:
+    """
+    已验证 token 缓存
+    以 token 摘要为键缓存解码后的载荷及其受众、证书指纹，条目在 token 的 exp 到期时失效，
+    命中时可跳过签名校验；token 被撤销时需调用 evict 移除
+    """
+
+    def __init__(self, maxsize: int = 4096, max_ttl: int = 300):
+        """
+        :param maxsize: 最大缓存条目数
+        :param max_ttl: 条目最长存活时间（秒），用于没有 exp 的 token 以及限制证书轮换后的陈旧时间
+        """
+        self.__max_ttl = max_ttl
+        self.__cache: TLRUCache = TLRUCache(maxsize=maxsize, ttu=self.__ttu, timer=time.time)
+
+    def __ttu(self, key, value: tuple, now: float) -> float:
+        expires = now + self.__max_ttl
+        exp = value[2].get("exp")
+        if isinstance(exp, (int, float)):
+            expires = min(expires, exp)
+        return expires
+
+    def get(self, token: str, audience, fingerprint: str) -> dict | None:
+        """
+        获取已验证的载荷
+        :param token: JWT
+        :param audience: 受众
+        :param fingerprint: 证书指纹
+        :return: 载荷副本，未命中返回 None
+        """
+        value = self.__cache.get(token_digest(token))
+        if value is None:
+            return None
+        cached_audience, cached_fingerprint, payload = value
+        if cached_audience != audience or cached_fingerprint != fingerprint:
+            return None
+        return dict(payload)
+
+    def put(self, token: str, audience, fingerprint: str, payload: dict):
+        """
+        缓存已验证的载荷
+        :param token: JWT
+        :param audience: 受众
+        :param fingerprint: 证书指纹
+        :param payload: 载荷
+        """
+        if self.__max_ttl <= 0:
+            return
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)) and exp <= time.time():
+            return
+        self.__cache[token_digest(token)] = (audience, fingerprint, dict(payload))
+
+    def evict(self, token: str):
+        """
+        移除 token 的缓存条目
+        :param token: JWT
+        """
+        self.__cache.pop(token_digest(token), None)
+
+    def clear(self):
+        self.__cache.clear()
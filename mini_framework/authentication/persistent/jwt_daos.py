@@ -15,6 +15,18 @@ class JwtDAO(DAOBase):
         result = await session.execute(select(JWTBlacklist).filter(JWTBlacklist.jwt_token == token))
         return result.first()
 
+    async def get_unexpired_tokens(self, now: int) -> list[tuple[str, int]]:
+        """
+        获取未过期的token
+        :param now: 当前时间戳（秒）
+        :return: (token, 过期时间戳) 列表
+        """
+        session = await self.slave_db()
+        result = await session.execute(
+            select(JWTBlacklist.jwt_token, JWTBlacklist.expire_at).filter(JWTBlacklist.expire_at > now)
+        )
+        return [(row[0], row[1]) for row in result.fetchall()]
+
     async def add_token(self, token, expire_at):
         """
         新增token
@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+from ..authentication.jwt_cache import token_digest
+from ..design_patterns.singleton import singleton
+from ..utils.bloom_filter import BloomFilter
+from ..utils.json import JsonUtils
+from ..utils.log import logger
+
+# 撤销名单模式
+REVOCATION_MODE_REDIS = "redis"  # 每次验证查询 Redis
+REVOCATION_MODE_MEMORY = "memory"  # 进程内精确集合
+REVOCATION_MODE_BLOOM = "bloom"  # 进程内布隆过滤器，命中时回查 Redis
+
+
+@singleton
+class TokenRevocationList:
+    """
+    进程内 JWT 撤销名单
+    启动时从 jwt_blacklist 表加载未过期的记录，之后通过 Redis 发布订阅保持更新，
+    一致性延迟取决于发布订阅的延迟。订阅中断期间名单视为不可用，由调用方回退到 Redis 查询。
+    """
+
+    def __init__(self):
+        from ..authentication.config import authentication_config
+
+        jwt_config = authentication_config.jwt
+        self.__mode = jwt_config.revocation_mode
+        self.__channel = jwt_config.revocation_channel
+        self.__bloom_capacity = jwt_config.revocation_bloom_capacity
+        self.__bloom_error_rate = jwt_config.revocation_bloom_error_rate
+        self.__revoked: dict[str, int] = {}
+        self.__bloom: BloomFilter | None = None
+        self.__ready = False
+        self.__subscribed = False
+        # 每次(重新)订阅成功递增，只有在订阅之后开始的加载才能保证不遗漏消息
+        self.__subscription_generation = 0
+        self.__loaded_generation = -1
+        self.__reloading = False
+        self.__reload_after = 0
+        # 加载期间收到的撤销消息，加载完成后合并，避免被加载结果覆盖
+        self.__pending: dict[str, int] = {}
+        # 订阅线程与事件循环都会修改名单，名单、待合并记录与加载后的替换都在锁内进行
+        self.__lock = threading.Lock()
+        self.__running = False
+        self.__listener: threading.Thread | None = None
+        self.__pubsub = None
+        self.__purge_at = 0
+
+    @property
+    def mode(self) -> str:
+        return self.__mode
+
+    @property
+    def channel(self) -> str:
+        return self.__channel
+
+    @property
+    def enabled(self) -> bool:
+        return self.__mode in (REVOCATION_MODE_MEMORY, REVOCATION_MODE_BLOOM)
+
+    @property
+    def ready(self) -> bool:
+        """
+        名单是否可用于判定
+        """
+        return (
+            self.__ready
+            and self.__subscribed
+            and self.__loaded_generation == self.__subscription_generation
+        )
+
+    async def start(self):
+        """
+        启动撤销名单：先订阅频道再加载数据库记录，避免两者之间的撤销消息丢失
+        """
+        if not self.enabled or self.__running:
+            return
+        self.__running = True
+        self.__listener = threading.Thread(
+            target=self.__listen, name="jwt-revocation-listener", daemon=True
+        )
+        self.__listener.start()
+        # 等待订阅建立后再加载，超时则先加载，订阅建立后会再次触发加载
+        for _ in range(60):
+            if self.__subscribed:
+                break
+            await asyncio.sleep(0.05)
+        await self.reload()
+
+    def stop(self):
+        """
+        停止订阅
+        """
+        self.__running = False
+        self.__ready = False
+        pubsub = self.__pubsub
+        if pubsub is not None:
+            try:
+                pubsub.close()
+            except Exception as e:
+                logger.exception(str(e), exc_info=e)
+
+    async def reload(self):
+        """
+        从 jwt_blacklist 表重新加载未过期的撤销记录
+        """
+        with self.__lock:
+            if self.__reloading:
+                return
+            self.__reloading = True
+            self.__pending = {}
+        generation = self.__subscription_generation
+        try:
+            from ..authentication.persistent.jwt_daos import JwtDAO
+            from ..databases.conn_managers.db_manager import db_connection_manager
+            from ..databases.conn_managers.utilities import (
+                reset_database_transaction_id,
+                set_database_transaction_id,
+            )
+            from ..design_patterns.depend_inject import get_injector
+
+            tokens = set_database_transaction_id(f"jwt-revocation-{id(self)}")
+            try:
+                jwt_dao: JwtDAO = get_injector(JwtDAO)
+                rows = await jwt_dao.get_unexpired_tokens(int(time.time()))
+            finally:
+                await db_connection_manager.clear_async_session()
+                reset_database_transaction_id(tokens)
+            # 撤销是单调的，与内存中已有记录合并，避免覆盖已广播但尚未提交到数据库的撤销
+            revoked = {token_digest(jwt_token): expire_at for jwt_token, expire_at in rows}
+            with self.__lock:
+                # 持锁期间订阅线程的消息只能等待，合并之后到替换之前不会有写入落到旧名单
+                revoked.update(self.__pending)
+                bloom = None
+                if self.__mode == REVOCATION_MODE_BLOOM:
+                    previous_count = len(self.__bloom) if self.__bloom is not None else 0
+                    bloom = BloomFilter(
+                        max(self.__bloom_capacity, len(revoked) * 2, previous_count * 2, 1),
+                        self.__bloom_error_rate,
+                    )
+                    for digest in revoked:
+                        bloom.add(digest)
+                    if self.__bloom is not None and bloom.compatible(self.__bloom):
+                        bloom.update(self.__bloom)
+                    revoked = {}
+                else:
+                    merged = dict(self.__revoked)
+                    merged.update(revoked)
+                    revoked = merged
+                self.__revoked = revoked
+                self.__bloom = bloom
+                self.__purge_at = 0
+                self.__purge_expired()
+                self.__reloading = False
+                self.__pending = {}
+                self.__ready = True
+                self.__loaded_generation = generation
+            logger.info(f"JWT revocation list loaded: {len(rows)} tokens")
+        except Exception as e:
+            self.__ready = False
+            self.__reload_after = time.time() + 5
+            logger.exception(f"JWT revocation list load failed: {e}", exc_info=e)
+        finally:
+            with self.__lock:
+                self.__reloading = False
+                self.__pending = {}
+
+    def add(self, token: str, expire_at: int):
+        """
+        登记撤销的 token
+        :param token: JWT
+        :param expire_at: 过期时间戳（秒）
+        """
+        self.__add_digest(token_digest(token), expire_at)
+
+    def __add_digest(self, digest: str, expire_at: int):
+        with self.__lock:
+            if self.__reloading:
+                self.__pending[digest] = expire_at
+            if self.__mode == REVOCATION_MODE_BLOOM:
+                bloom = self.__bloom
+                if bloom is not None:
+                    bloom.add(digest)
+                    if bloom.saturated:
+                        # 过滤器超出容量后误判率上升，重新加载以扩容
+                        self.__loaded_generation = -1
+                return
+            self.__revoked[digest] = expire_at
+            self.__purge_expired()
+
+    def contains(self, token: str) -> bool | None:
+        """
+        判断 token 是否已撤销
+        :param token: JWT
+        :return: True 已撤销；False 未撤销；bloom 模式下 True 表示可能已撤销，需要回查；
+                 名单不可用时返回 None
+        """
+        if not self.ready:
+            self.__schedule_reload()
+            return None
+        digest = token_digest(token)
+        if self.__mode == REVOCATION_MODE_BLOOM:
+            return digest in self.__bloom
+        expire_at = self.__revoked.get(digest)
+        if expire_at is None:
+            return False
+        if expire_at and expire_at < time.time():
+            self.__revoked.pop(digest, None)
+            return False
+        return True
+
+    def __purge_expired(self):
+        now = time.time()
+        if now < self.__purge_at:
+            return
+        self.__purge_at = now + 60
+        expired = [
+            digest
+            for digest, expire_at in list(self.__revoked.items())
+            if expire_at and expire_at < now
+        ]
+        for digest in expired:
+            self.__revoked.pop(digest, None)
+
+    def __schedule_reload(self):
+        if not self.__running or not self.__subscribed or self.__reloading:
+            return
+        if time.time() < self.__reload_after:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        loop.create_task(self.reload())
+
+    def __listen(self):
+        """
+        订阅线程：接收撤销消息，连接中断后重连，重新订阅后名单需要重新加载
+        """
+        from ..cache.manager import redis_client_manager
+
+        while self.__running:
+            try:
+                self.__pubsub = redis_client_manager.get_client("jwt_blacklist").pubsub()
+                self.__pubsub.subscribe(self.__channel)
+                self.__subscription_generation += 1
+                self.__subscribed = True
+                for message in self.__pubsub.listen():
+                    if not self.__running:
+                        break
+                    if message.get("type") != "message":
+                        continue
+                    data = JsonUtils.json_str_to_dict(message["data"])
+                    self.__add_digest(data["digest"], data.get("expire_at", 0))
+            except Exception as e:
+                self.__subscribed = False
+                if not self.__running:
+                    break
+                logger.exception(f"JWT revocation listener error: {e}", exc_info=e)
+                time.sleep(1)
+        self.__subscribed = False
+
+    async def publish(self, token: str, expire_at: int):
+        """
+        广播撤销消息
+        :param token: JWT
+        :param expire_at: 过期时间戳（秒）
+        """
+        from ..cache.manager import redis_client_manager
+
+        message = JsonUtils.dict_to_json_str(
+            dict(digest=token_digest(token), expire_at=expire_at)
+        )
+        await redis_client_manager.get_client_async("jwt_blacklist").publish(self.__channel, message)
+
+
+jwt_revocation_list = TokenRevocationList()
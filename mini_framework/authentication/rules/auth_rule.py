@@ -19,9 +19,9 @@ class AuthRules(object):
         try:
             from mini_framework.cache.manager import redis_client_manager
 
-            client = redis_client_manager.get_client("account")
+            client = redis_client_manager.get_client_async("account")
             account_dict_str = JsonUtils.dict_to_json_str(account_dict)
-            client.set(
+            await client.set(
                 account_info.account_id,
                 account_dict_str,
                 ex=authentication_config.jwt.expires + 60,
@@ -52,8 +52,8 @@ class AuthRules(object):
         """
         from mini_framework.cache.manager import redis_client_manager
 
-        client = redis_client_manager.get_client("account")
-        account_info_str = client.get(account_id)
+        client = redis_client_manager.get_client_async("account")
+        account_info_str = await client.get(account_id)
         if account_info_str:
             account_info = AccountInfo.model_validate_json(account_info_str)
             return account_info
@@ -1,3 +1,5 @@
+import time
+
 from mini_framework.authentication.persistent.jwt_daos import JwtDAO
 from mini_framework.authentication.persistent.models import JWTBlacklist
 from mini_framework.design_patterns.depend_inject import dataclass_inject
@@ -11,12 +13,28 @@ class JWTRules(object):
     async def verify(self, token: str):
         """
         验证token是否已销毁
+        优先使用进程内撤销名单，名单不可用或布隆过滤器命中时回查 Redis
+        :param token:
+        :return:
+        """
+        from mini_framework.authentication.revocation import jwt_revocation_list, REVOCATION_MODE_MEMORY
+
+        revoked = jwt_revocation_list.contains(token)
+        if revoked is False:
+            return False
+        if revoked and jwt_revocation_list.mode == REVOCATION_MODE_MEMORY:
+            return True
+        return await self.__verify_remote(token)
+
+    async def __verify_remote(self, token: str):
+        """
+        从 Redis 验证token是否已销毁，Redis 异常时查询数据库
         :param token:
         :return:
         """
         try:
             from mini_framework.cache.manager import redis_client_manager
-            black_token: JWTBlacklist = redis_client_manager.get_client("jwt_blacklist").get(token)
+            black_token: JWTBlacklist = await redis_client_manager.get_client_async("jwt_blacklist").get(token)
         except Exception as e:
             logger.exception(str(e), exc_info=e, stack_info=True, extra=dict(token=token))
             black_token = await self.jwt_dao.get_token(token)
@@ -30,7 +48,16 @@ class JWTRules(object):
         :param expire_at:
         :return:
         """
+        from mini_framework.authentication.revocation import jwt_revocation_list
         from mini_framework.cache.manager import redis_client_manager
-        redis_client_manager.get_client("jwt_blacklist").set(token, 1)
+
+        ttl = int(expire_at - time.time()) if expire_at else 0
+        await redis_client_manager.get_client_async("jwt_blacklist").set(token, 1, ex=ttl if ttl > 0 else None)
         await self.jwt_dao.add_token(token, expire_at)
+        if jwt_revocation_list.enabled:
+            jwt_revocation_list.add(token, expire_at)
+            try:
+                await jwt_revocation_list.publish(token, expire_at)
+            except Exception as e:
+                logger.exception(str(e), exc_info=e, stack_info=True, extra=dict(token=token))
         return
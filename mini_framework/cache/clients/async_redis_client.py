@@ -0,0 +1,365 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import redis.asyncio as async_redis
+
+from mini_framework.cache.clients.client import (
+    AbstractRedisClient,
+    AbstractRedisConnectionPool,
+    PoolStatistics,
+)
+from mini_framework.cache.clients.pipeline import AsyncRedisPipeline, ThreadedAsyncRedisPipeline
+from mini_framework.utils.timing import record_redis_time
+
+
+class _AsyncInstrumentedPoolMixin(object):
+    """
+    为 redis.asyncio 连接池记录获取连接的统计信息
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.statistics = PoolStatistics()
+        super().__init__(*args, **kwargs)
+
+    def reset(self):
+        super().reset()
+        self.statistics.reset()
+
+    async def get_connection(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            connection = await super().get_connection(*args, **kwargs)
+        except Exception:
+            self.statistics.record_acquire(time.perf_counter() - start, success=False)
+            raise
+        self.statistics.record_acquire(time.perf_counter() - start)
+        return connection
+
+    async def release(self, connection):
+        await super().release(connection)
+        self.statistics.record_release()
+
+    @property
+    def created_connections(self) -> int:
+        if hasattr(self, "_connections"):
+            return len(self._connections)
+        return self._created_connections
+
+
+class _AsyncInstrumentedConnectionPool(_AsyncInstrumentedPoolMixin, async_redis.ConnectionPool):
+    pass
+
+
+class _AsyncInstrumentedBlockingConnectionPool(_AsyncInstrumentedPoolMixin, async_redis.BlockingConnectionPool):
+    pass
+
+
+class _TimedAsyncRedis(async_redis.StrictRedis):
+    """
+    累计每条命令耗时到当前请求
+    """
+
+    async def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            record_redis_time(time.perf_counter() - start, args[0] if args else None)
+
+
+class AsyncRedisConnectionPool(AbstractRedisConnectionPool):
+    """
+    Redis 异步连接池
+    连接参数与同步连接池 RedisConnectionPool 保持一致，保证同步、异步客户端访问同一键空间
+    """
+
+    def _initialize(self):
+        kwargs = dict(
+            host=self.config.host,
+            port=self.config.port,
+            password=self.config.password,
+            decode_responses=True,
+            max_connections=self.config.max_connections,
+        )
+        if self.config.pool_timeout is not None:
+            self._pool = _AsyncInstrumentedBlockingConnectionPool(timeout=self.config.pool_timeout, **kwargs)
+        else:
+            self._pool = _AsyncInstrumentedConnectionPool(**kwargs)
+
+    async def close(self):
+        await self._pool.disconnect()
+
+
+class AsyncRedisClient(AbstractRedisClient):
+    """
+    Redis 异步客户端，基于 redis.asyncio，方法与 RedisClient 一致，返回值需要 await
+    """
+
+    async def ping(self) -> bool:
+        return await self._client.ping()
+
+    async def connect(self):
+        pass
+
+    async def disconnect(self):
+        pass
+
+    async def set(self, key, value, ex=None, px=None, nx=False, xx=False) -> bool | None:
+        return await self._client.set(key, value, ex=ex, px=px, nx=nx, xx=xx)
+
+    async def get(self, key) -> str | None:
+        return await self._client.get(key)
+
+    async def delete(self, *keys) -> int:
+        return await self._client.delete(*keys)
+
+    async def exists(self, *keys) -> int:
+        return await self._client.exists(*keys)
+
+    async def expire(self, key, seconds) -> bool:
+        return await self._client.expire(key, seconds)
+
+    async def expire_at(self, key, timestamp) -> bool:
+        return await self._client.expireat(key, timestamp)
+
+    async def ttl(self, key) -> int | None:
+        return await self._client.ttl(key)
+
+    async def incr(self, key, amount=1) -> int:
+        return await self._client.incr(key, amount)
+
+    async def decr(self, key, amount=1) -> int:
+        return await self._client.decr(key, amount)
+
+    async def hset(self, name, key, value) -> int:
+        return await self._client.hset(name, key, value)
+
+    async def hget(self, name, key) -> str:
+        return await self._client.hget(name, key)
+
+    async def hincrby(self, name, key, amount=1) -> int:
+        return await self._client.hincrby(name, key, amount)
+
+    async def hdel(self, name, *keys) -> int:
+        return await self._client.hdel(name, *keys)
+
+    async def hkeys(self, name) -> list:
+        return await self._client.hkeys(name)
+
+    async def hexists(self, name, key) -> bool:
+        return await self._client.hexists(name, key)
+
+    async def hlen(self, name) -> int:
+        return await self._client.hlen(name)
+
+    async def hget_all(self, name) -> dict:
+        return await self._client.hgetall(name)
+
+    async def left_push(self, name, *values) -> int:
+        return await self._client.lpush(name, *values)
+
+    async def right_push(self, name, *values) -> int:
+        return await self._client.rpush(name, *values)
+
+    async def left_range(self, name, start, end) -> list:
+        return await self._client.lrange(name, start, end)
+
+    async def sadd(self, name, *values) -> int:
+        return await self._client.sadd(name, *values)
+
+    async def smembers(self, name) -> set:
+        return await self._client.smembers(name)
+
+    async def srem(self, name, *values) -> int:
+        return await self._client.srem(name, *values)
+
+    async def hmget(self, name, mapping) -> list:
+        return await self._client.hmget(name, mapping)
+
+    async def hmset(self, name, mapping) -> int:
+        return await self._client.hset(name, mapping=mapping)
+
+    def pipeline(self, transaction: bool = True) -> AsyncRedisPipeline:
+        return AsyncRedisPipeline(self._client.pipeline(transaction=transaction))
+
+    async def mget(self, keys: list) -> list:
+        if not keys:
+            return []
+        return await self._client.mget(keys)
+
+    async def mset(self, mapping: dict, ex: int | dict | None = None) -> bool:
+        if not mapping:
+            return True
+        if ex is None:
+            return await self._client.mset(mapping)
+        async with self.pipeline() as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=ex.get(key) if isinstance(ex, dict) else ex)
+        return all(pipe.results)
+
+    async def hget_all_many(self, names: list) -> list[dict]:
+        if not names:
+            return []
+        async with self.pipeline(transaction=False) as pipe:
+            for name in names:
+                pipe.hget_all(name)
+        return pipe.results
+
+    async def delete_many(self, keys: list) -> int:
+        if not keys:
+            return 0
+        return await self._client.delete(*keys)
+
+    async def publish(self, channel, message) -> int:
+        return await self._client.publish(channel, message)
+
+    def pubsub(self):
+        return self._client.pubsub(ignore_subscribe_messages=True)
+
+    def register_script(self, script):
+        return self._client.register_script(script)
+
+    def _initialize(self):
+        """
+        初始化 Redis 异步客户端
+        """
+        self._client = _TimedAsyncRedis(
+            connection_pool=self.pool,
+            db=self.db,
+            decode_responses=True,
+        )
+
+
+class ThreadedAsyncRedisClient(AbstractRedisClient):
+    """
+    在线程池中调用同步客户端的异步适配器
+    用于不支持 redis.asyncio 的部署（如 Redis 集群）或显式配置为 thread 模式的库，避免阻塞事件循环
+    """
+
+    def __init__(self, client: AbstractRedisClient):
+        """
+        :param client: 同步 Redis 客户端
+        """
+        self._sync_client = client
+        super().__init__(client.pool, client.db, client.config)
+
+    def _initialize(self):
+        self._client = self._sync_client
+
+    async def __call(self, method: str, *args, **kwargs):
+        return await asyncio.to_thread(getattr(self._sync_client, method), *args, **kwargs)
+
+    async def ping(self) -> bool:
+        return await self.__call("ping")
+
+    async def connect(self):
+        pass
+
+    async def disconnect(self):
+        pass
+
+    async def set(self, key, value, ex=None, px=None, nx=False, xx=False) -> bool | None:
+        return await self.__call("set", key, value, ex=ex, px=px, nx=nx, xx=xx)
+
+    async def get(self, key) -> str | None:
+        return await self.__call("get", key)
+
+    async def delete(self, *keys) -> int:
+        return await self.__call("delete", *keys)
+
+    async def exists(self, *keys) -> int:
+        return await self.__call("exists", *keys)
+
+    async def expire(self, key, seconds) -> bool:
+        return await self.__call("expire", key, seconds)
+
+    async def expire_at(self, key, timestamp) -> bool:
+        return await self.__call("expire_at", key, timestamp)
+
+    async def ttl(self, key) -> int | None:
+        return await self.__call("ttl", key)
+
+    async def incr(self, key, amount=1) -> int:
+        return await self.__call("incr", key, amount)
+
+    async def decr(self, key, amount=1) -> int:
+        return await self.__call("decr", key, amount)
+
+    async def hset(self, name, key, value) -> int:
+        return await self.__call("hset", name, key, value)
+
+    async def hget(self, name, key) -> str:
+        return await self.__call("hget", name, key)
+
+    async def hincrby(self, name, key, amount=1) -> int:
+        return await self.__call("hincrby", name, key, amount)
+
+    async def hdel(self, name, *keys) -> int:
+        return await self.__call("hdel", name, *keys)
+
+    async def hkeys(self, name) -> list:
+        return await self.__call("hkeys", name)
+
+    async def hexists(self, name, key) -> bool:
+        return await self.__call("hexists", name, key)
+
+    async def hlen(self, name) -> int:
+        return await self.__call("hlen", name)
+
+    async def hget_all(self, name) -> dict:
+        return await self.__call("hget_all", name)
+
+    async def left_push(self, name, *values) -> int:
+        return await self.__call("left_push", name, *values)
+
+    async def right_push(self, name, *values) -> int:
+        return await self.__call("right_push", name, *values)
+
+    async def left_range(self, name, start, end) -> list:
+        return await self.__call("left_range", name, start, end)
+
+    async def sadd(self, name, *values) -> int:
+        return await self.__call("sadd", name, *values)
+
+    async def smembers(self, name) -> set:
+        return await self.__call("smembers", name)
+
+    async def srem(self, name, *values) -> int:
+        return await self.__call("srem", name, *values)
+
+    async def hmget(self, name, mapping) -> list:
+        return await self.__call("hmget", name, mapping)
+
+    async def hmset(self, name, mapping) -> int:
+        return await self.__call("hmset", name, mapping)
+
+    def pipeline(self, transaction: bool = True) -> ThreadedAsyncRedisPipeline:
+        return ThreadedAsyncRedisPipeline(self._sync_client.pipeline(transaction))
+
+    async def mget(self, keys: list) -> list:
+        return await self.__call("mget", keys)
+
+    async def mset(self, mapping: dict, ex: int | dict | None = None) -> bool:
+        return await self.__call("mset", mapping, ex)
+
+    async def hget_all_many(self, names: list) -> list[dict]:
+        return await self.__call("hget_all_many", names)
+
+    async def delete_many(self, keys: list) -> int:
+        return await self.__call("delete_many", keys)
+
+    async def publish(self, channel, message) -> int:
+        return await self.__call("publish", channel, message)
+
+    def pubsub(self):
+        return self._sync_client.pubsub()
+
+    def register_script(self, script):
+        sync_script = self._sync_client.register_script(script)
+
+        async def invoke(keys=None, args=None):
+            return await asyncio.to_thread(sync_script, keys=keys, args=args)
+
+        return invoke
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import threading
+import time
 from abc import ABC, abstractmethod
 
 from redis.commands.core import Script
@@ -7,6 +9,89 @@ from redis.commands.core import Script
 from mini_framework.cache.config import RedisServerConfig, redis_config
 
 
+class PoolStatistics(object):
+    """
+    连接池获取连接的统计信息
+    """
+
+    def __init__(self):
+        self.in_use = 0
+        self.acquired = 0
+        self.failed = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.__lock = threading.Lock()
+
+    def record_acquire(self, wait_time: float, success: bool = True):
+        """
+        记录一次获取连接
+        :param wait_time: 获取连接耗时（秒），包括等待空闲连接与建立新连接
+        :param success: 是否获取成功，连接数耗尽或连接失败时为 False
+        """
+        with self.__lock:
+            if success:
+                self.in_use += 1
+                self.acquired += 1
+            else:
+                self.failed += 1
+            self.wait_time_total += wait_time
+            if wait_time > self.wait_time_max:
+                self.wait_time_max = wait_time
+
+    def record_release(self):
+        with self.__lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def reset(self):
+        with self.__lock:
+            self.in_use = 0
+
+    def to_dict(self) -> dict:
+        attempts = self.acquired + self.failed
+        return dict(
+            in_use=self.in_use,
+            acquired=self.acquired,
+            failed=self.failed,
+            wait_time_avg=self.wait_time_total / attempts if attempts else 0.0,
+            wait_time_max=self.wait_time_max,
+        )
+
+
+class InstrumentedPoolMixin(object):
+    """
+    为 redis-py 同步连接池记录获取连接的统计信息
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.statistics = PoolStatistics()
+        super().__init__(*args, **kwargs)
+
+    def reset(self):
+        super().reset()
+        self.statistics.reset()
+
+    def get_connection(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            connection = super().get_connection(*args, **kwargs)
+        except Exception:
+            self.statistics.record_acquire(time.perf_counter() - start, success=False)
+            raise
+        self.statistics.record_acquire(time.perf_counter() - start)
+        return connection
+
+    def release(self, connection):
+        super().release(connection)
+        self.statistics.record_release()
+
+    @property
+    def created_connections(self) -> int:
+        if hasattr(self, "_connections"):
+            # BlockingConnectionPool
+            return len(self._connections)
+        return self._created_connections
+
+
 class AbstractRedisConnectionPool(ABC):
     def __init__(self, server_key: str):
         self._server_key = server_key
@@ -24,6 +109,26 @@ class AbstractRedisConnectionPool(ABC):
     def pool(self):
         return self._pool
 
+    def metrics(self) -> dict:
+        """
+        获取连接池指标
+        :return: 最大连接数、已创建连接数、使用中与空闲连接数以及获取连接的耗时统计
+        """
+        metrics = dict(server_key=self._server_key, max_connections=self.config.max_connections)
+        statistics = getattr(self._pool, "statistics", None)
+        if statistics is not None:
+            metrics.update(statistics.to_dict())
+            created = self._pool.created_connections
+            metrics["created"] = created
+            metrics["idle"] = max(0, created - statistics.in_use)
+        return metrics
+
+    def close(self):
+        """
+        关闭连接池中的所有连接
+        """
+        self._pool.disconnect()
+
     @property
     def server_key(self) -> str:
         """
@@ -97,6 +202,13 @@ class AbstractRedisClient(ABC):
         """
         return self._db
 
+    @abstractmethod
+    def ping(self) -> bool:
+        """
+        检查与 Redis 服务器的连接是否可用
+        """
+        pass
+
     @abstractmethod
     def connect(self):
         """
@@ -385,6 +497,77 @@ class AbstractRedisClient(ABC):
         """
         pass
 
+    @abstractmethod
+    def pipeline(self, transaction: bool = True):
+        """
+        创建管道，命令入队后一次往返发送
+
+        :param transaction: 是否以事务（MULTI/EXEC）方式执行，集群模式不支持事务
+        :return: 管道对象，可作为上下文管理器使用，退出时自动执行
+        """
+        pass
+
+    @abstractmethod
+    def mget(self, keys: list) -> list:
+        """
+        批量获取多个键的值
+
+        :param keys: 键列表
+        :return: 值列表，顺序与键一致，键不存在时对应 None
+        """
+        pass
+
+    @abstractmethod
+    def mset(self, mapping: dict, ex: int | dict | None = None) -> bool:
+        """
+        批量设置键值对
+
+        :param mapping: 键值对
+        :param ex: 过期时间（秒），可以是统一的过期时间，也可以是键到过期时间的字典
+        :return: 全部设置成功返回 True
+        """
+        pass
+
+    @abstractmethod
+    def hget_all_many(self, names: list) -> list[dict]:
+        """
+        批量获取多个哈希表的所有键值对
+
+        :param names: 哈希表名称列表
+        :return: 字典列表，顺序与名称一致
+        """
+        pass
+
+    @abstractmethod
+    def delete_many(self, keys: list) -> int:
+        """
+        批量删除键
+
+        :param keys: 键列表
+        :return: 成功删除的键的数量
+        """
+        pass
+
+    @abstractmethod
+    def publish(self, channel, message) -> int:
+        """
+        向频道发布消息
+
+        :param channel: 频道名称
+        :param message: 消息内容
+        :return: 接收到消息的订阅者数量
+        """
+        pass
+
+    @abstractmethod
+    def pubsub(self):
+        """
+        创建发布订阅对象
+
+        :return: PubSub 对象
+        """
+        pass
+
     @abstractmethod
     def register_script(self, script) -> Script:
         """
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Callable, Optional
+
+
+def _identity(key):
+    return key
+
+
+class RedisPipeline(object):
+    """
+    Redis 管道
+    命令方法与 AbstractRedisClient 一致，调用时仅入队，execute 时一次往返发送；
+    作为上下文管理器使用时，退出且无异常时自动执行尚未执行的命令，结果保存在 results 中
+    """
+
+    def __init__(self, pipe, key_func: Optional[Callable] = None, field_key_func: Optional[Callable] = None):
+        """
+        :param pipe: redis-py 管道对象
+        :param key_func: 键转换函数，例如集群客户端的库前缀
+        :param field_key_func: 哈希字段转换函数，设置后 hset/hget/hincrby/hdel/hexists 转换字段而不转换哈希名，
+                               与集群客户端的单字段哈希命令保持同一存储布局
+        """
+        self._pipe = pipe
+        self._key = key_func or _identity
+        self._field = field_key_func
+        self.results: list | None = None
+
+    def __len__(self):
+        return len(self._pipe)
+
+    def set(self, key, value, ex=None, px=None, nx=False, xx=False):
+        self._pipe.set(self._key(key), value, ex=ex, px=px, nx=nx, xx=xx)
+        return self
+
+    def get(self, key):
+        self._pipe.get(self._key(key))
+        return self
+
+    def delete(self, *keys):
+        self._pipe.delete(*[self._key(key) for key in keys])
+        return self
+
+    def exists(self, *keys):
+        self._pipe.exists(*[self._key(key) for key in keys])
+        return self
+
+    def expire(self, key, seconds):
+        self._pipe.expire(self._key(key), seconds)
+        return self
+
+    def expire_at(self, key, timestamp):
+        self._pipe.expireat(self._key(key), timestamp)
+        return self
+
+    def ttl(self, key):
+        self._pipe.ttl(self._key(key))
+        return self
+
+    def incr(self, key, amount=1):
+        self._pipe.incr(self._key(key), amount)
+        return self
+
+    def decr(self, key, amount=1):
+        self._pipe.decr(self._key(key), amount)
+        return self
+
+    def _hash_name(self, name):
+        return name if self._field else self._key(name)
+
+    def _hash_field(self, key):
+        return self._field(key) if self._field else key
+
+    def hset(self, name, key, value):
+        self._pipe.hset(self._hash_name(name), self._hash_field(key), value)
+        return self
+
+    def hget(self, name, key):
+        self._pipe.hget(self._hash_name(name), self._hash_field(key))
+        return self
+
+    def hincrby(self, name, key, amount=1):
+        self._pipe.hincrby(self._hash_name(name), self._hash_field(key), amount)
+        return self
+
+    def hdel(self, name, *keys):
+        self._pipe.hdel(self._hash_name(name), *[self._hash_field(key) for key in keys])
+        return self
+
+    def hkeys(self, name):
+        self._pipe.hkeys(self._key(name))
+        return self
+
+    def hexists(self, name, key):
+        self._pipe.hexists(self._hash_name(name), self._hash_field(key))
+        return self
+
+    def hlen(self, name):
+        self._pipe.hlen(self._key(name))
+        return self
+
+    def hget_all(self, name):
+        self._pipe.hgetall(self._key(name))
+        return self
+
+    def hmget(self, name, mapping):
+        self._pipe.hmget(self._key(name), mapping)
+        return self
+
+    def hmset(self, name, mapping):
+        self._pipe.hset(self._key(name), mapping=mapping)
+        return self
+
+    def left_push(self, name, *values):
+        self._pipe.lpush(self._key(name), *values)
+        return self
+
+    def right_push(self, name, *values):
+        self._pipe.rpush(self._key(name), *values)
+        return self
+
+    def left_range(self, name, start, end):
+        self._pipe.lrange(self._key(name), start, end)
+        return self
+
+    def sadd(self, name, *values):
+        self._pipe.sadd(self._key(name), *values)
+        return self
+
+    def smembers(self, name):
+        self._pipe.smembers(self._key(name))
+        return self
+
+    def srem(self, name, *values):
+        self._pipe.srem(self._key(name), *values)
+        return self
+
+    def execute(self) -> list:
+        """
+        发送已入队的命令
+        :return: 各命令的结果，顺序与入队顺序一致
+        """
+        self.results = self._pipe.execute()
+        return self.results
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if exc_type is None and len(self._pipe) > 0:
+                self.execute()
+        finally:
+            self._pipe.reset()
+
+
+class AsyncRedisPipeline(RedisPipeline):
+    """
+    Redis 异步管道，基于 redis.asyncio 管道，execute 需要 await，使用 async with
+    """
+
+    async def execute(self) -> list:
+        self.results = await self._pipe.execute()
+        return self.results
+
+    def __enter__(self):
+        raise TypeError("AsyncRedisPipeline must be used with 'async with'")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if exc_type is None and len(self._pipe) > 0:
+                await self.execute()
+        finally:
+            await self._pipe.reset()
+
+
+class ThreadedAsyncRedisPipeline(object):
+    """
+    在线程池中执行同步管道的异步适配器
+    """
+
+    def __init__(self, pipeline: RedisPipeline):
+        self._pipeline = pipeline
+
+    def __getattr__(self, item):
+        attr = getattr(self._pipeline, item)
+        if not callable(attr):
+            return attr
+
+        def enqueue(*args, **kwargs):
+            attr(*args, **kwargs)
+            return self
+
+        return enqueue
+
+    def __len__(self):
+        return len(self._pipeline)
+
+    @property
+    def results(self) -> list | None:
+        return self._pipeline.results
+
+    async def execute(self) -> list:
+        return await asyncio.to_thread(self._pipeline.execute)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await asyncio.to_thread(self._pipeline.__exit__, exc_type, exc_val, exc_tb)
@@ -1,23 +1,57 @@
 from __future__ import annotations
 
+import time
+
 import redis
 from redis.commands.core import Script
-from mini_framework.cache.clients.client import AbstractRedisClient, AbstractRedisConnectionPool
+from mini_framework.cache.clients.client import (
+    AbstractRedisClient,
+    AbstractRedisConnectionPool,
+    InstrumentedPoolMixin,
+)
+from mini_framework.cache.clients.pipeline import RedisPipeline
+from mini_framework.utils.timing import record_redis_time
+
+
+class _InstrumentedConnectionPool(InstrumentedPoolMixin, redis.ConnectionPool):
+    pass
+
+
+class _InstrumentedBlockingConnectionPool(InstrumentedPoolMixin, redis.BlockingConnectionPool):
+    pass
+
+
+class _TimedRedis(redis.StrictRedis):
+    """
+    累计每条命令耗时到当前请求
+    """
+
+    def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return super().execute_command(*args, **options)
+        finally:
+            record_redis_time(time.perf_counter() - start, args[0] if args else None)
 
 
 class RedisConnectionPool(AbstractRedisConnectionPool):
     """
     Redis 连接池
+    配置了 pool_timeout 时连接耗尽后等待空闲连接，否则立即报错
     """
 
     def _initialize(self):
-        self._pool = redis.ConnectionPool(
+        kwargs = dict(
             host=self.config.host,
             port=self.config.port,
             password=self.config.password,
             decode_responses=True,
             max_connections=self.config.max_connections,
         )
+        if self.config.pool_timeout is not None:
+            self._pool = _InstrumentedBlockingConnectionPool(timeout=self.config.pool_timeout, **kwargs)
+        else:
+            self._pool = _InstrumentedConnectionPool(**kwargs)
 
 
 class RedisClient(AbstractRedisClient):
@@ -25,6 +59,9 @@ class RedisClient(AbstractRedisClient):
     Redis 客户端
     """
 
+    def ping(self) -> bool:
+        return self._client.ping()
+
     def connect(self):
         pass
 
@@ -106,6 +143,43 @@ class RedisClient(AbstractRedisClient):
     def hmset(self, name, mapping) -> int:
         return self._client.hset(name, mapping=mapping)
 
+    def pipeline(self, transaction: bool = True) -> RedisPipeline:
+        return RedisPipeline(self._client.pipeline(transaction=transaction))
+
+    def mget(self, keys: list) -> list:
+        if not keys:
+            return []
+        return self._client.mget(keys)
+
+    def mset(self, mapping: dict, ex: int | dict | None = None) -> bool:
+        if not mapping:
+            return True
+        if ex is None:
+            return self._client.mset(mapping)
+        with self.pipeline() as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=ex.get(key) if isinstance(ex, dict) else ex)
+        return all(pipe.results)
+
+    def hget_all_many(self, names: list) -> list[dict]:
+        if not names:
+            return []
+        with self.pipeline(transaction=False) as pipe:
+            for name in names:
+                pipe.hget_all(name)
+        return pipe.results
+
+    def delete_many(self, keys: list) -> int:
+        if not keys:
+            return 0
+        return self._client.delete(*keys)
+
+    def publish(self, channel, message) -> int:
+        return self._client.publish(channel, message)
+
+    def pubsub(self):
+        return self._client.pubsub(ignore_subscribe_messages=True)
+
     def register_script(self, script) -> Script:
         return self._client.register_script(script)
 
@@ -113,7 +187,7 @@ class RedisClient(AbstractRedisClient):
         """
         初始化 Redis 客户端
         """
-        self._client = redis.StrictRedis(
+        self._client = _TimedRedis(
             connection_pool=self.pool,
             db=self.db,
             decode_responses=True,
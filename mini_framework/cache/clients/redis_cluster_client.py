@@ -1,9 +1,12 @@
+from __future__ import annotations
+
 from redis.commands.core import Script
 
 from mini_framework.cache.clients.client import (
     AbstractRedisConnectionPool,
     AbstractRedisClient,
 )
+from mini_framework.cache.clients.pipeline import RedisPipeline
 
 
 class RedisClusterPoolConnection(AbstractRedisConnectionPool):
@@ -22,6 +25,20 @@ class RedisClusterPoolConnection(AbstractRedisConnectionPool):
             password=self.config.password,
         )
 
+    def metrics(self) -> dict:
+        metrics = dict(server_key=self._server_key, max_connections=self.config.max_connections)
+        pool = self._pool.connection_pool
+        in_use = getattr(pool, "_in_use_connections", None)
+        available = getattr(pool, "_available_connections", None)
+        if isinstance(in_use, dict) and isinstance(available, dict):
+            # 集群连接池按节点维护连接
+            metrics["in_use"] = sum(len(connections) for connections in in_use.values())
+            metrics["idle"] = sum(len(connections) for connections in available.values())
+        return metrics
+
+    def close(self):
+        self._pool.connection_pool.disconnect()
+
 
 class RedisClusterClient(AbstractRedisClient):
     """
@@ -36,6 +53,51 @@ class RedisClusterClient(AbstractRedisClient):
     def register_script(self, script) -> Script:
         return self.__client.register_script(script)
 
+    def ping(self) -> bool:
+        return bool(self.__client.ping())
+
+    def pipeline(self, transaction: bool = False) -> RedisPipeline:
+        # 集群管道不支持事务，命令按哈希槽所在节点分组，每个节点一次往返
+        return RedisPipeline(self.__client.pipeline(), key_func=self.__get_key, field_key_func=self.__get_key)
+
+    def mget(self, keys: list) -> list:
+        if not keys:
+            return []
+        with self.pipeline() as pipe:
+            for key in keys:
+                pipe.get(key)
+        return pipe.results
+
+    def mset(self, mapping: dict, ex: int | dict | None = None) -> bool:
+        if not mapping:
+            return True
+        with self.pipeline() as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=ex.get(key) if isinstance(ex, dict) else ex)
+        return all(pipe.results)
+
+    def hget_all_many(self, names: list) -> list[dict]:
+        if not names:
+            return []
+        with self.pipeline() as pipe:
+            for name in names:
+                pipe.hget_all(name)
+        return pipe.results
+
+    def delete_many(self, keys: list) -> int:
+        if not keys:
+            return 0
+        with self.pipeline() as pipe:
+            for key in keys:
+                pipe.delete(key)
+        return sum(pipe.results)
+
+    def publish(self, channel, message) -> int:
+        return self.__client.publish(channel, message)
+
+    def pubsub(self):
+        return self.__client.pubsub(ignore_subscribe_messages=True)
+
     def connect(self):
         pass
 
@@ -13,6 +13,9 @@ class RedisServerConfig(BaseViewModel):
     port: int = Field(6379, title="Port", description="Redis 服务器端口")
     password: str = Field(None, title="Password", description="Redis 服务器密码")
     max_connections: int = Field(10, title="Max Connections", description="Redis 最大连接数")
+    pool_timeout: float = Field(
+        None, title="Pool Timeout", description="连接耗尽时等待空闲连接的超时时间（秒），为空时不等待直接报错"
+    )
 
 
 class RedisDBConfig(BaseViewModel):
@@ -23,6 +26,11 @@ class RedisDBConfig(BaseViewModel):
     prefix: str = Field(..., title="Prefix", description="Redis Key 前缀")
     server_key: str = Field(..., title="Server Key", description="Redis 服务器 Key")
     server: RedisServerConfig = Field(..., title="Server", description="Redis 服务器配置")
+    async_mode: str = Field(
+        "native",
+        title="Async Mode",
+        description="异步客户端模式: native(redis.asyncio), thread(在线程池中调用同步客户端)",
+    )
 
 
 @singleton
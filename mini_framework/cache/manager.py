@@ -1,19 +1,39 @@
+import asyncio
+import threading
+
+from mini_framework.cache.clients.async_redis_client import (
+    AsyncRedisClient,
+    AsyncRedisConnectionPool,
+    ThreadedAsyncRedisClient,
+)
 from mini_framework.cache.clients.client import AbstractRedisClient
 from mini_framework.cache.clients.redis_client import RedisClient, RedisConnectionPool
 from mini_framework.cache.clients.redis_cluster_client import RedisClusterPoolConnection, RedisClusterClient
 from mini_framework.cache.config import redis_config
 from mini_framework.design_patterns.singleton import singleton
+from mini_framework.utils.log import logger
 
 
 @singleton
 class RedisClientManager:
     """
     Redis 客户端管理器
+    客户端按库 Key 延迟创建并复用，连接池按服务器 Key 共享
     """
 
     def __init__(self):
         self.__config = redis_config
         self.__pools = {}
+        self.__async_pools = {}
+        self.__clients: dict[str, AbstractRedisClient] = {}
+        self.__async_clients: dict[str, AbstractRedisClient] = {}
+        self.__lock = threading.Lock()
+
+    def __get_db_config(self, db_key: str):
+        db_config = self.__config.dbs.get(db_key, None)
+        if not db_config:
+            raise ValueError(f"Redis db config not found: {db_key}")
+        return db_config
 
     def get_client(self, db_key: str) -> AbstractRedisClient:
         """
@@ -21,9 +41,18 @@ class RedisClientManager:
         :param db_key: Redis 数据库 Key
         :return:
         """
-        db_config = self.__config.dbs.get(db_key, None)
-        if not db_config:
-            raise ValueError(f"Redis db config not found: {db_key}")
+        client = self.__clients.get(db_key)
+        if client is not None:
+            return client
+        with self.__lock:
+            client = self.__clients.get(db_key)
+            if client is None:
+                client = self.__create_client(db_key)
+                self.__clients[db_key] = client
+        return client
+
+    def __create_client(self, db_key: str) -> AbstractRedisClient:
+        db_config = self.__get_db_config(db_key)
         pool = self.__pools.get(db_config.server_key, None)
         cluster = db_config.server.startup_nodes is not None
         if not pool:
@@ -33,10 +62,96 @@ class RedisClientManager:
                 pool = RedisConnectionPool(db_config.server_key)
             self.__pools[db_config.server_key] = pool
         if cluster:
-            client = RedisClusterClient(pool=pool.pool, db=db_config.db, server_config=db_config.server)
+            return RedisClusterClient(pool=pool.pool, db=db_config.db, server_config=db_config.server)
+        return RedisClient(pool=pool.pool, db=db_config.db, server_config=db_config.server)
+
+    def get_client_async(self, db_key: str) -> AbstractRedisClient:
+        """
+        获取 Redis 异步客户端，方法与同步客户端一致，返回值需要 await
+        集群或配置为 thread 模式的库返回在线程池中调用同步客户端的适配器
+        :param db_key: Redis 数据库 Key
+        :return:
+        """
+        client = self.__async_clients.get(db_key)
+        if client is not None:
+            return client
+        db_config = self.__get_db_config(db_key)
+        cluster = db_config.server.startup_nodes is not None
+        if cluster or db_config.async_mode == "thread":
+            client = ThreadedAsyncRedisClient(self.get_client(db_key))
         else:
-            client = RedisClient(pool=pool.pool, db=db_config.db, server_config=db_config.server)
-        return client
+            with self.__lock:
+                pool = self.__async_pools.get(db_config.server_key, None)
+                if not pool:
+                    pool = AsyncRedisConnectionPool(db_config.server_key)
+                    self.__async_pools[db_config.server_key] = pool
+            client = AsyncRedisClient(pool=pool.pool, db=db_config.db, server_config=db_config.server)
+        return self.__async_clients.setdefault(db_key, client)
+
+    async def health_check(self) -> dict[str, bool]:
+        """
+        对已创建的客户端执行 PING
+        检查失败的客户端从注册表中移除，下次获取时重新创建；
+        连接池由同一服务器的所有库共享，不在此断开，出错的连接由连接池自行丢弃
+        :return: 库 Key 到检查结果的映射，异步客户端的 Key 以 async: 开头
+        """
+        results = {}
+        for db_key, client in list(self.__clients.items()):
+            try:
+                results[db_key] = bool(await asyncio.to_thread(client.ping))
+            except Exception as e:
+                logger.warning(f"Redis health check failed: {db_key}, {e}")
+                results[db_key] = False
+            if not results[db_key]:
+                self.__clients.pop(db_key, None)
+                self.__async_clients.pop(db_key, None)
+        for db_key, client in list(self.__async_clients.items()):
+            try:
+                results[f"async:{db_key}"] = bool(await client.ping())
+            except Exception as e:
+                logger.warning(f"Redis async health check failed: {db_key}, {e}")
+                results[f"async:{db_key}"] = False
+            if not results[f"async:{db_key}"]:
+                self.__async_clients.pop(db_key, None)
+        return results
+
+    @staticmethod
+    def __disconnect(pool):
+        if pool is None:
+            return
+        try:
+            pool.close()
+        except Exception as e:
+            logger.exception(str(e), exc_info=e)
+
+    def metrics(self) -> dict[str, dict]:
+        """
+        获取各连接池指标
+        :return: 服务器 Key 到连接池指标的映射，异步连接池的 Key 以 async: 开头
+        """
+        metrics = {server_key: pool.metrics() for server_key, pool in self.__pools.items()}
+        for server_key, pool in self.__async_pools.items():
+            metrics[f"async:{server_key}"] = pool.metrics()
+        return metrics
+
+    async def close_all(self):
+        """
+        关闭所有客户端与连接池，应用退出时调用
+        """
+        with self.__lock:
+            pools = list(self.__pools.values())
+            async_pools = list(self.__async_pools.values())
+            self.__clients.clear()
+            self.__async_clients.clear()
+            self.__pools.clear()
+            self.__async_pools.clear()
+        for pool in pools:
+            self.__disconnect(pool)
+        for pool in async_pools:
+            try:
+                await pool.close()
+            except Exception as e:
+                logger.exception(str(e), exc_info=e)
 
 
 redis_client_manager = RedisClientManager()
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import base64
+import pickle
+from abc import ABC, abstractmethod
+from typing import Any, get_args
+
+from mini_framework.utils.json import JsonUtils
+
+
+class CacheSerializer(ABC):
+    """
+    缓存值序列化器，Redis 客户端以字符串读写，序列化结果必须为 str
+    """
+
+    @abstractmethod
+    def dumps(self, value: Any) -> str:
+        """
+        序列化
+        :param value: 缓存值
+        :return: 字符串
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def loads(self, data: str) -> Any:
+        """
+        反序列化
+        :param data: 字符串
+        :return: 缓存值
+        """
+        raise NotImplementedError
+
+
+# JSON 中标记 pydantic 模型类型的键
+_MODEL_KEY = "__model__"
+_MODEL_DATA_KEY = "data"
+
+# 允许 JsonSerializer 还原的模型类，键为模型标记；Redis 中的内容不可信，不按标记导入任意模块
+_model_registry: dict[str, type] = {}
+
+
+def _is_model_class(cls) -> bool:
+    return isinstance(cls, type) and hasattr(cls, "model_validate") and hasattr(cls, "model_dump")
+
+
+def _model_tag(cls: type) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def register_model(cls: type):
+    """
+    注册允许 JsonSerializer 缓存与还原的 pydantic 模型类
+    :param cls: 模型类
+    """
+    if not _is_model_class(cls):
+        raise TypeError(f"Cache model must be a pydantic model class: {cls!r}")
+    _model_registry[_model_tag(cls)] = cls
+
+
+def register_models_from_annotation(annotation: Any):
+    """
+    注册类型注解中出现的所有 pydantic 模型类，包括 Optional、list、dict 等的类型参数
+    :param annotation: 类型注解，例如函数的返回类型
+    """
+    if _is_model_class(annotation):
+        register_model(annotation)
+        return
+    for arg in get_args(annotation):
+        register_models_from_annotation(arg)
+
+
+class JsonSerializer(CacheSerializer):
+    """
+    JSON 序列化器，适用于字典、列表等基础类型
+    pydantic 模型（包括列表、字典中的模型）连同类型一起缓存，读取时以 model_validate 还原为原类型；
+    模型类必须先以 register_model 注册，two_tier_cache 装饰时会注册返回类型中的模型
+    """
+
+    def dumps(self, value: Any) -> str:
+        return JsonUtils.dict_to_json_str(self.__encode(value), separators=(",", ":"))
+
+    def loads(self, data: str) -> Any:
+        return self.__decode(JsonUtils.json_str_to_dict(data))
+
+    def __encode(self, value: Any) -> Any:
+        if _is_model_class(type(value)):
+            tag = _model_tag(type(value))
+            if tag not in _model_registry:
+                raise ValueError(
+                    f"Cache model not registered: {tag}, declare it in the return type or use register_model"
+                )
+            return {_MODEL_KEY: tag, _MODEL_DATA_KEY: value.model_dump()}
+        if isinstance(value, (list, tuple)):
+            return [self.__encode(item) for item in value]
+        if isinstance(value, dict):
+            return {key: self.__encode(item) for key, item in value.items()}
+        return value
+
+    def __decode(self, value: Any) -> Any:
+        if isinstance(value, list):
+            return [self.__decode(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        if len(value) == 2 and _MODEL_KEY in value and _MODEL_DATA_KEY in value:
+            cls = _model_registry.get(value[_MODEL_KEY])
+            if cls is None:
+                raise ValueError(f"Cache model not registered: {value[_MODEL_KEY]}")
+            return cls.model_validate(value[_MODEL_DATA_KEY])
+        return {key: self.__decode(item) for key, item in value.items()}
+
+
+class PickleSerializer(CacheSerializer):
+    """
+    pickle 序列化器，可以缓存任意可序列化对象，只能用于受信任的 Redis
+    """
+
+    def dumps(self, value: Any) -> str:
+        return base64.b64encode(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)).decode("ascii")
+
+    def loads(self, data: str) -> Any:
+        return pickle.loads(base64.b64decode(data))
+
+
+serializers: dict[str, CacheSerializer] = {
+    "json": JsonSerializer(),
+    "pickle": PickleSerializer(),
+}
+
+
+def register_serializer(name: str, serializer: CacheSerializer):
+    """
+    注册序列化器
+    :param name: 名称
+    :param serializer: 序列化器
+    """
+    serializers[name] = serializer
+
+
+def get_serializer(serializer: str | CacheSerializer) -> CacheSerializer:
+    """
+    获取序列化器
+    :param serializer: 名称或序列化器实例
+    :return: 序列化器
+    """
+    if isinstance(serializer, CacheSerializer):
+        return serializer
+    if serializer not in serializers:
+        raise ValueError(f"Cache serializer not found: {serializer}")
+    return serializers[serializer]
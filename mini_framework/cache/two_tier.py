@@ -0,0 +1,481 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import inspect
+import threading
+import time
+import uuid
+from functools import wraps
+from typing import Any, Awaitable, Callable, get_type_hints
+
+from cachetools import TTLCache
+
+from mini_framework.cache.serializers import CacheSerializer, get_serializer, register_models_from_annotation
+from mini_framework.design_patterns.singleton import singleton
+from mini_framework.utils.json import JsonUtils
+from mini_framework.utils.log import logger
+
+_MISSING = object()
+_MAX_KEY_LENGTH = 128
+
+
+def make_key(args: tuple, kwargs: dict) -> str:
+    """
+    根据调用参数生成缓存键，过长时使用摘要
+    :param args: 位置参数
+    :param kwargs: 关键字参数
+    :return: 缓存键
+    """
+    parts = [str(arg) for arg in args]
+    parts.extend(f"{name}={value}" for name, value in sorted(kwargs.items()))
+    key = ":".join(parts)
+    if len(key) > _MAX_KEY_LENGTH:
+        key = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return key
+
+
+class _InvalidationListener(object):
+    """
+    单个 Redis 库的缓存失效消息订阅线程
+    """
+
+    def __init__(self, db_key: str, channel: str, origin: str):
+        self.__db_key = db_key
+        self.__channel = channel
+        self.__origin = origin
+        self.__caches: dict[str, TwoTierCache] = {}
+        self.__running = False
+        self.__thread: threading.Thread | None = None
+        self.__pubsub = None
+        self.__lock = threading.Lock()
+
+    def register(self, cache: TwoTierCache):
+        """
+        登记缓存，首次登记时启动订阅线程
+        :param cache: 两级缓存
+        """
+        self.__caches[cache.namespace] = cache
+        with self.__lock:
+            if self.__running:
+                return
+            self.__running = True
+            self.__thread = threading.Thread(
+                target=self.__listen, name=f"cache-invalidation-{self.__db_key}", daemon=True
+            )
+            self.__thread.start()
+
+    def stop(self):
+        self.__running = False
+        pubsub = self.__pubsub
+        if pubsub is not None:
+            try:
+                pubsub.close()
+            except Exception as e:
+                logger.exception(str(e), exc_info=e)
+
+    def __listen(self):
+        from mini_framework.cache.manager import redis_client_manager
+
+        subscribed = False
+        while self.__running:
+            try:
+                self.__pubsub = redis_client_manager.get_client(self.__db_key).pubsub()
+                self.__pubsub.subscribe(self.__channel)
+                if subscribed:
+                    # 断线期间可能遗漏失效消息，重新订阅后清空本地缓存
+                    for cache in list(self.__caches.values()):
+                        cache.clear_local()
+                subscribed = True
+                for message in self.__pubsub.listen():
+                    if not self.__running:
+                        break
+                    if message.get("type") != "message":
+                        continue
+                    self.__dispatch(JsonUtils.json_str_to_dict(message["data"]))
+            except Exception as e:
+                if not self.__running:
+                    break
+                logger.exception(f"Cache invalidation listener error: {e}", exc_info=e)
+                time.sleep(1)
+
+    def __dispatch(self, data: dict):
+        if data.get("origin") == self.__origin:
+            return
+        cache = self.__caches.get(data.get("namespace"))
+        if cache is None:
+            return
+        if data.get("all"):
+            cache.clear_local()
+        else:
+            cache.invalidate_local(*data.get("keys", []))
+
+
+@singleton
+class CacheInvalidationBus:
+    """
+    两级缓存失效广播
+    每个 Redis 库一个订阅线程，频道为 {prefix}:cache_invalidation，本进程发出的消息在接收时忽略
+    """
+
+    def __init__(self):
+        self.__origin = uuid.uuid4().hex
+        self.__listeners: dict[str, _InvalidationListener] = {}
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def channel(db_key: str) -> str:
+        """
+        获取失效消息频道
+        :param db_key: Redis 数据库 Key
+        """
+        from mini_framework.cache.config import redis_config
+
+        db_config = redis_config.dbs.get(db_key, None)
+        if not db_config:
+            raise ValueError(f"Redis db config not found: {db_key}")
+        return f"{db_config.prefix}:cache_invalidation"
+
+    def register(self, cache: TwoTierCache):
+        """
+        登记缓存以接收其他进程的失效消息
+        :param cache: 两级缓存
+        """
+        with self.__lock:
+            listener = self.__listeners.get(cache.db_key)
+            if listener is None:
+                listener = _InvalidationListener(cache.db_key, self.channel(cache.db_key), self.__origin)
+                self.__listeners[cache.db_key] = listener
+        listener.register(cache)
+
+    async def publish(self, cache: TwoTierCache, keys: list[str] | None = None):
+        """
+        广播失效消息
+        :param cache: 两级缓存
+        :param keys: 失效的键，为空时清空该缓存的全部本地条目
+        """
+        from mini_framework.cache.manager import redis_client_manager
+
+        message = dict(origin=self.__origin, namespace=cache.namespace)
+        if keys is None:
+            message["all"] = True
+        else:
+            message["keys"] = keys
+        try:
+            client = redis_client_manager.get_client_async(cache.db_key)
+            await client.publish(self.channel(cache.db_key), JsonUtils.dict_to_json_str(message))
+        except Exception as e:
+            logger.exception(f"Cache invalidation publish failed: {e}", exc_info=e)
+
+    def stop(self):
+        """
+        停止所有订阅线程
+        """
+        with self.__lock:
+            listeners = list(self.__listeners.values())
+            self.__listeners.clear()
+        for listener in listeners:
+            listener.stop()
+
+
+cache_invalidation_bus = CacheInvalidationBus()
+
+
+class TwoTierCache(object):
+    """
+    两级缓存：L1 为进程内有界 TTL 缓存，L2 为 Redis
+    写入与失效通过 Redis 发布订阅通知其他进程移除 L1 条目，L1 的陈旧时间不超过其 TTL；
+    同一进程内同一键的并发加载只执行一次
+    """
+
+    def __init__(
+        self,
+        db_key: str,
+        namespace: str,
+        maxsize: int = 1024,
+        ttl: float = 30,
+        l2_ttl: int | None = 300,
+        serializer: str | CacheSerializer = "json",
+        cache_none: bool = False,
+    ):
+        """
+        :param db_key: Redis 数据库 Key，键以该库配置的 prefix 为前缀
+        :param namespace: 命名空间，同一库内区分不同缓存
+        :param maxsize: L1 最大条目数，为 0 时不使用 L1
+        :param ttl: L1 条目存活时间（秒），为 0 时不使用 L1
+        :param l2_ttl: L2 条目存活时间（秒），为空时不过期
+        :param serializer: 序列化器名称或实例
+        :param cache_none: 是否缓存加载结果 None
+        """
+        self.__db_key = db_key
+        self.__namespace = namespace
+        self.__local: TTLCache | None = TTLCache(maxsize=maxsize, ttl=ttl) if maxsize > 0 and ttl > 0 else None
+        self.__l2_ttl = l2_ttl
+        self.__serializer = get_serializer(serializer)
+        self.__cache_none = cache_none
+        self.__lock = threading.Lock()
+        self.__loading: dict[str, asyncio.Future] = {}
+        # 每次本地失效递增，加载开始后发生失效时不写入 L1，避免写回旧值
+        self.__generation = 0
+        self.__prefix: str | None = None
+        self.__registered = False
+
+    @property
+    def db_key(self) -> str:
+        return self.__db_key
+
+    @property
+    def namespace(self) -> str:
+        return self.__namespace
+
+    def key(self, key: str) -> str:
+        """
+        获取 Redis 中的完整键
+        :param key: 缓存键
+        :return: {prefix}:{namespace}:{key}
+        """
+        if self.__prefix is None:
+            from mini_framework.cache.config import redis_config
+
+            db_config = redis_config.dbs.get(self.__db_key, None)
+            if not db_config:
+                raise ValueError(f"Redis db config not found: {self.__db_key}")
+            self.__prefix = db_config.prefix
+        return f"{self.__prefix}:{self.__namespace}:{key}"
+
+    def __client(self):
+        from mini_framework.cache.manager import redis_client_manager
+
+        if not self.__registered:
+            self.__registered = True
+            cache_invalidation_bus.register(self)
+        return redis_client_manager.get_client_async(self.__db_key)
+
+    def get_local(self, key: str, default=None) -> Any:
+        """
+        仅从 L1 获取
+        :param key: 缓存键
+        :param default: 未命中时的返回值
+        """
+        if self.__local is None:
+            return default
+        with self.__lock:
+            return self.__local.get(key, default)
+
+    def __set_local(self, key: str, value, generation: int):
+        if self.__local is None:
+            return
+        with self.__lock:
+            if generation == self.__generation:
+                self.__local[key] = value
+
+    def invalidate_local(self, *keys: str):
+        """
+        移除 L1 条目
+        :param keys: 缓存键
+        """
+        with self.__lock:
+            self.__generation += 1
+            if self.__local is not None:
+                for key in keys:
+                    self.__local.pop(key, None)
+
+    def clear_local(self):
+        """
+        清空 L1
+        """
+        with self.__lock:
+            self.__generation += 1
+            if self.__local is not None:
+                self.__local.clear()
+
+    async def get(self, key: str, default=None) -> Any:
+        """
+        获取缓存值，L1 未命中时读取 L2 并回填 L1
+        :param key: 缓存键
+        :param default: 未命中时的返回值
+        """
+        value = self.get_local(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        generation = self.__generation
+        value = await self.__get_remote(key)
+        if value is _MISSING:
+            return default
+        self.__set_local(key, value, generation)
+        return value
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        获取缓存值，两级均未命中时调用 loader 加载并写入两级缓存
+        :param key: 缓存键
+        :param loader: 加载函数
+        """
+        value = self.get_local(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        future = self.__loading.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+        future = asyncio.get_running_loop().create_future()
+        self.__loading[key] = future
+        try:
+            value = await self.__load(key, loader)
+        except BaseException as e:
+            future.set_exception(e)
+            # 没有其他等待者时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            self.__loading.pop(key, None)
+        return value
+
+    async def __load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        generation = self.__generation
+        value = await self.__get_remote(key)
+        if value is _MISSING:
+            value = await loader()
+            if value is None and not self.__cache_none:
+                return value
+            data = self.__serializer.dumps(value)
+            await self.__set_remote(key, data)
+            value = self.__roundtrip(value, data)
+        self.__set_local(key, value, generation)
+        return value
+
+    def __roundtrip(self, value, data: str) -> Any:
+        """
+        L1 保存与 L2 读取结果相同的反序列化值，两级命中返回相同类型，且与调用方持有的原对象分离
+        L1 中的值由命中的调用方共享，应视为只读
+        """
+        loaded = self.__serializer.loads(data)
+        if type(loaded) is not type(value):
+            logger.warning(
+                f"Cache serializer changed value type: {self.__namespace}, "
+                f"{type(value).__name__} -> {type(loaded).__name__}"
+            )
+        return loaded
+
+    async def __get_remote(self, key: str) -> Any:
+        try:
+            data = await self.__client().get(self.key(key))
+        except Exception as e:
+            # Redis 不可用时视为未命中，由调用方加载
+            logger.warning(f"Cache L2 get failed: {self.__namespace}:{key}, {e}")
+            return _MISSING
+        if data is None:
+            return _MISSING
+        try:
+            return self.__serializer.loads(data)
+        except ValueError as e:
+            # 无法还原的内容（例如未注册的模型类型）视为未命中，加载后覆盖
+            logger.warning(f"Cache L2 value rejected: {self.__namespace}:{key}, {e}")
+            return _MISSING
+
+    async def __set_remote(self, key: str, data: str):
+        try:
+            await self.__client().set(self.key(key), data, ex=self.__l2_ttl)
+        except Exception as e:
+            logger.warning(f"Cache L2 set failed: {self.__namespace}:{key}, {e}")
+
+    async def set(self, key: str, value):
+        """
+        写入缓存，并通知其他进程移除该键的 L1 条目
+        :param key: 缓存键
+        :param value: 缓存值
+        """
+        data = self.__serializer.dumps(value)
+        await self.__client().set(self.key(key), data, ex=self.__l2_ttl)
+        self.invalidate_local(key)
+        self.__set_local(key, self.__roundtrip(value, data), self.__generation)
+        await cache_invalidation_bus.publish(self, [key])
+
+    async def invalidate(self, *keys: str):
+        """
+        删除两级缓存中的键，并通知其他进程移除 L1 条目
+        :param keys: 缓存键
+        """
+        if not keys:
+            return
+        await self.__client().delete_many([self.key(key) for key in keys])
+        self.invalidate_local(*keys)
+        await cache_invalidation_bus.publish(self, list(keys))
+
+    async def clear_local_all(self):
+        """
+        清空所有进程的 L1，L2 中的条目按 l2_ttl 过期
+        """
+        self.__client()
+        self.clear_local()
+        await cache_invalidation_bus.publish(self)
+
+
+def two_tier_cache(
+    db_key: str,
+    namespace: str | None = None,
+    maxsize: int = 1024,
+    ttl: float = 30,
+    l2_ttl: int | None = 300,
+    serializer: str | CacheSerializer = "json",
+    key_builder: Callable[..., Any] | None = None,
+    cache_none: bool = False,
+):
+    """
+    两级缓存装饰器，用于异步函数或方法
+    被装饰的函数增加 cache 属性（TwoTierCache）与 invalidate(*args, **kwargs) 异步方法
+    使用 json 序列化器时，返回类型注解中的 pydantic 模型类会被注册为可还原的类型，其他模型类需以 register_model 注册
+
+    :param db_key: Redis 数据库 Key
+    :param namespace: 命名空间，默认为函数的模块名与限定名
+    :param maxsize: L1 最大条目数
+    :param ttl: L1 条目存活时间（秒）
+    :param l2_ttl: L2 条目存活时间（秒）
+    :param serializer: 序列化器名称或实例
+    :param key_builder: 缓存键生成函数，接收与被装饰函数相同的参数；默认使用参数拼接，方法忽略 self/cls
+    :param cache_none: 是否缓存返回值 None
+    """
+
+    def decorator(func):
+        if not inspect.iscoroutinefunction(func):
+            raise TypeError("two_tier_cache only supports async functions")
+        signature = inspect.signature(func)
+        parameters = list(signature.parameters)
+        skip_first = bool(parameters) and parameters[0] in ("self", "cls")
+        # 返回类型中的模型类即允许从 L2 还原的类型
+        try:
+            return_type = get_type_hints(func).get("return")
+        except Exception:
+            return_type = signature.return_annotation
+        if return_type is not None and not isinstance(return_type, str):
+            register_models_from_annotation(return_type)
+        cache = TwoTierCache(
+            db_key,
+            namespace or f"{func.__module__}.{func.__qualname__}",
+            maxsize=maxsize,
+            ttl=ttl,
+            l2_ttl=l2_ttl,
+            serializer=serializer,
+            cache_none=cache_none,
+        )
+
+        def build_key(*args, **kwargs) -> str:
+            if key_builder is not None:
+                return str(key_builder(*args, **kwargs))
+            if skip_first:
+                args = args[1:]
+            return make_key(args, kwargs)
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await cache.get_or_load(build_key(*args, **kwargs), lambda: func(*args, **kwargs))
+
+        async def invalidate(*args, **kwargs):
+            await cache.invalidate(build_key(*args, **kwargs))
+
+        wrapper.cache = cache
+        wrapper.invalidate = invalidate
+        return wrapper
+
+    return decorator
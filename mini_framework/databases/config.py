@@ -87,6 +87,22 @@ class DatabaseClusterConfig:
     slaves: list[DatabaseConfig]
     sync_driver: str
     async_driver: str
+    # 从库选择策略: round_robin, least_in_flight, power_of_two, latency_weighted 或自定义注册的策略
+    balance_policy: str = "least_in_flight"
+    # 连续连接错误达到该次数时摘除从库
+    eject_failures: int = 3
+    # 摘除时长（秒）
+    eject_seconds: float = 30
+    # 从库健康检查间隔（秒），由应用生命周期定时执行；0 表示不检查
+    health_check_interval: float = 10
+    # 读己之写：请求内已在主库写入后，后续从库读取改用主库会话
+    read_your_writes: bool = True
+    # 复制延迟超过该值（秒）的从库不参与选择，全部超过时读取主库；0 表示不检查
+    max_replication_lag: float = 0
+    # 复制延迟采样间隔（秒）
+    lag_check_interval: float = 5
+    # 查询复制延迟（秒）的语句，为空时 PostgreSQL / Kingbase 使用内置语句
+    replication_lag_query: str = None
 
     def __post_init__(self):
         """
@@ -128,7 +144,18 @@ class DatabasesConfig:
                     slave["master"] = False
                     slaves.append(DatabaseConfig(**slave))
                 self.__databases[key] = DatabaseClusterConfig(
-                    master, slaves, sync_driver, async_driver
+                    master,
+                    slaves,
+                    sync_driver,
+                    async_driver,
+                    balance_policy=value.get("balance_policy", "least_in_flight"),
+                    eject_failures=value.get("eject_failures", 3),
+                    eject_seconds=value.get("eject_seconds", 30),
+                    health_check_interval=value.get("health_check_interval", 10),
+                    read_your_writes=value.get("read_your_writes", True),
+                    max_replication_lag=value.get("max_replication_lag", 0),
+                    lag_check_interval=value.get("lag_check_interval", 5),
+                    replication_lag_query=value.get("replication_lag_query"),
                 )
             else:
                 raise ValueError(
@@ -1,13 +1,75 @@
+import time
+
+from sqlalchemy.exc import DisconnectionError, OperationalError
+
+
 class SlaveMetrics:
-    def __init__(self, session_factory):
+    def __init__(self, session_factory=None, name: str = None, alpha: float = 0.2):
+        """
+        单个数据库实例的负载与健康指标
+        :param session_factory: 会话工厂
+        :param name: 实例标识
+        :param alpha: 延迟指数加权移动平均的平滑系数
+        """
         self.session_factory = session_factory
+        self.name = name
+        self.alpha = alpha
+        # 已分配且尚未释放的会话数
         self.connection_count = 0
-        self.average_response_time = 0
+        # SQL 语句耗时的指数加权移动平均（秒），未有样本时为 0
+        self.average_response_time = 0.0
+        self.samples = 0
+        self.consecutive_failures = 0
+        # 被摘除直到该时间（time.monotonic），0 表示正常
+        self.ejected_until = 0.0
+        # 最近一次采样的复制延迟（秒），未采样或不支持时为 0
+        self.replication_lag = 0.0
 
     def update_metrics(self, response_time):
-        # 调用此方法来更新每次请求的响应时间
-        # 这里简单使用移动平均来计算平均响应时间
-        self.average_response_time = (self.average_response_time + response_time) / 2
+        """
+        更新延迟的指数加权移动平均，由引擎的游标事件调用
+        :param response_time: 耗时（秒）
+        """
+        if self.samples == 0:
+            self.average_response_time = response_time
+        else:
+            self.average_response_time += self.alpha * (response_time - self.average_response_time)
+        self.samples += 1
+
+    def record_latency(self, elapsed: float):
+        """
+        记录执行成功的语句耗时，试探期内的实例执行成功后恢复正常
+        :param elapsed: 耗时（秒）
+        """
+        self.update_metrics(elapsed)
+        self.consecutive_failures = 0
+        if self.ejected_until and self.available:
+            self.readmit()
+
+    def record_error(self, exception: BaseException):
+        """
+        记录执行错误，只有连接类错误计为实例故障
+        :param exception: 异常
+        """
+        if isinstance(exception, (OperationalError, DisconnectionError)) or getattr(
+            exception, "connection_invalidated", False
+        ):
+            self.consecutive_failures += 1
+
+    def eject(self, seconds: float):
+        self.ejected_until = time.monotonic() + seconds
+        self.consecutive_failures = 0
+
+    def readmit(self):
+        self.ejected_until = 0.0
+        self.consecutive_failures = 0
+
+    @property
+    def available(self) -> bool:
+        """
+        未被摘除，或摘除时间已到（此时作为试探重新参与选择，再次失败会被重新摘除）
+        """
+        return self.ejected_until <= time.monotonic()
 
     def increment_connections(self):
         self.connection_count += 1
@@ -1,3 +1,5 @@
+import asyncio
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from mini_framework.design_patterns.singleton import singleton
@@ -13,9 +15,19 @@ class DBConnectionManager:
         )
 
         self.tenants: dict[str, TenantDBConnectionManager] = dict()
+        self.__health_check_tasks: dict[str, asyncio.Task] = {}
         for key, db_cluster in db_config.databases.items():
             self.tenants[key] = TenantDBConnectionManager(
-                db_cluster.master, db_cluster.slaves
+                db_cluster.master,
+                db_cluster.slaves,
+                balance_policy=db_cluster.balance_policy,
+                eject_failures=db_cluster.eject_failures,
+                eject_seconds=db_cluster.eject_seconds,
+                health_check_interval=db_cluster.health_check_interval,
+                read_your_writes=db_cluster.read_your_writes,
+                max_replication_lag=db_cluster.max_replication_lag,
+                lag_check_interval=db_cluster.lag_check_interval,
+                replication_lag_query=db_cluster.replication_lag_query,
             )
 
     async def get_async_session(self, db_key: str, master: bool) -> AsyncSession:
@@ -28,24 +40,79 @@ class DBConnectionManager:
         session = await self.tenants[db_key].get_async_session(master)
         return session
 
+    @staticmethod
+    def __used_tenants():
+        """
+        当前事务 ID 范围内打开过会话的租户连接管理器
+        """
+        from mini_framework.databases.conn_managers.utilities import get_session_scope
+
+        scope = get_session_scope(create=False)
+        return scope.owners() if scope is not None else []
+
     async def clear_async_session(self, all_down: bool = False):
         """
-        清除异步会话
+        清除异步会话，只处理当前请求实际使用过的数据库
         :param all_down: 是否关闭所有连接
         :return:
         """
-        for tenant in self.tenants.values():
-            await tenant.close_async_session()
+        for tenant in self.__used_tenants():
             if all_down:
                 await tenant.dispose_engine()
+            await tenant.close_async_session()
 
     async def exception_clear_async_session(self):
         """
         报错后清除异步会话
         """
-        for tenant in self.tenants.values():
+        for tenant in self.__used_tenants():
             await tenant.exception_close_async_session()
 
+    async def health_check(self) -> dict[str, dict[str, bool]]:
+        """
+        检查各数据库的从库，失败的从库被摘除，恢复的从库重新参与选择
+        同步模式下检查在线程中执行，不阻塞事件循环
+        :return: 数据库 Key 到从库检查结果的映射
+        """
+        return {key: await self.__check_tenant(tenant) for key, tenant in self.tenants.items()}
+
+    @staticmethod
+    async def __check_tenant(tenant) -> dict[str, bool]:
+        from mini_framework.context import env
+
+        if env.sync_type == "sync":
+            # 同步会话的查询会阻塞，放到线程中执行
+            return await asyncio.get_running_loop().run_in_executor(None, asyncio.run, tenant.health_check())
+        return await tenant.health_check()
+
+    async def start_health_check(self):
+        """
+        为配置了从库与检查间隔的数据库启动定时健康检查任务
+        """
+        for key, tenant in self.tenants.items():
+            if tenant.health_check_interval > 0 and key not in self.__health_check_tasks:
+                self.__health_check_tasks[key] = asyncio.create_task(self.__health_check_loop(key, tenant))
+
+    async def stop_health_check(self):
+        tasks, self.__health_check_tasks = self.__health_check_tasks, {}
+        for task in tasks.values():
+            task.cancel()
+        for task in tasks.values():
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def __health_check_loop(self, key: str, tenant):
+        from mini_framework.utils.log import logger
+
+        while True:
+            await asyncio.sleep(tenant.health_check_interval)
+            try:
+                await self.__check_tenant(tenant)
+            except Exception as e:
+                logger.warning(f"Database health check failed: {key}, {e}")
+
     def get_sync_session(self, db_key: str, master: bool) -> Session:
         """
         获取同步会话
@@ -56,7 +123,7 @@ class DBConnectionManager:
         return self.tenants[db_key].get_sync_session(master)
 
     def clear_sync_session(self):
-        for tenant in self.tenants.values():
+        for tenant in self.__used_tenants():
             tenant.close_sync_session()
 
 
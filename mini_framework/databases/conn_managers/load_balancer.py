@@ -1,39 +1,272 @@
+import asyncio
+import contextvars
+import inspect
+import itertools
+import random
 import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Optional, Type
 
+from mini_framework.context import env
 from mini_framework.databases.config import DatabaseConfig
 from mini_framework.databases.conn_managers.conn_metrics import SlaveMetrics
 from mini_framework.databases.conn_managers.utilities import create_db_session_factory
 
+# 会话 info 中记录所属实例的键
+_REPLICA_INFO_KEY = "mini_replica"
+# PostgreSQL / Kingbase 从库的复制延迟（秒）；已回放到接收位置时为 0，非从库时函数返回空值也视为 0
+REPLICATION_LAG_QUERY = (
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+# 支持默认复制延迟查询的驱动
+_LAG_QUERY_DRIVERS = ("postgres", "psycopg", "asyncpg", "kingbase")
+
+
+def _supports_lag_query(config: DatabaseConfig) -> bool:
+    driver = (config.sync_driver if env.sync_type == "sync" else config.async_driver) or ""
+    return any(name in driver.lower() for name in _LAG_QUERY_DRIVERS)
+
+
+class BalancePolicy(ABC):
+    """
+    实例选择策略，调用时已持有负载均衡器的锁
+    """
+
+    @abstractmethod
+    def choose(self, replicas: list[SlaveMetrics]) -> SlaveMetrics:
+        pass
+
+
+class RoundRobinPolicy(BalancePolicy):
+    def __init__(self):
+        self.__counter = itertools.count()
+
+    def choose(self, replicas: list[SlaveMetrics]) -> SlaveMetrics:
+        return replicas[next(self.__counter) % len(replicas)]
+
+
+class LeastInFlightPolicy(BalancePolicy):
+    def choose(self, replicas: list[SlaveMetrics]) -> SlaveMetrics:
+        # 并列时随机选择，避免总是落在第一个实例上
+        least = min(replica.connection_count for replica in replicas)
+        return random.choice([replica for replica in replicas if replica.connection_count == least])
+
+
+class PowerOfTwoChoicesPolicy(BalancePolicy):
+    def choose(self, replicas: list[SlaveMetrics]) -> SlaveMetrics:
+        if len(replicas) == 1:
+            return replicas[0]
+        first, second = random.sample(replicas, 2)
+        return first if first.connection_count <= second.connection_count else second
+
+
+class LatencyWeightedPolicy(BalancePolicy):
+    def choose(self, replicas: list[SlaveMetrics]) -> SlaveMetrics:
+        # 得分为预计排队耗时：(使用中会话数 + 1) * 平均延迟；尚无延迟样本的实例优先获得样本
+        for replica in replicas:
+            if replica.samples == 0:
+                return replica
+        return min(replicas, key=lambda replica: (replica.connection_count + 1) * replica.average_response_time)
+
+
+balance_policies: dict[str, Type[BalancePolicy]] = {
+    "round_robin": RoundRobinPolicy,
+    "least_in_flight": LeastInFlightPolicy,
+    "power_of_two": PowerOfTwoChoicesPolicy,
+    "latency_weighted": LatencyWeightedPolicy,
+}
+
+
+def register_balance_policy(name: str, policy_cls: Type[BalancePolicy]):
+    """
+    注册自定义实例选择策略，配置中以 balance_policy 指定名称
+    :param name: 策略名称
+    :param policy_cls: 策略类
+    """
+    balance_policies[name] = policy_cls
+
 
 class LoadBalancer:
-    def __init__(self, slaves_dbs_config: list[DatabaseConfig]):
+    def __init__(
+        self,
+        slaves_dbs_config: list[DatabaseConfig],
+        policy: str = "least_in_flight",
+        eject_failures: int = 3,
+        eject_seconds: float = 30,
+        max_replication_lag: float = 0,
+        lag_check_interval: float = 5,
+        lag_query: str = None,
+    ):
         """
-        Initialize the load balancer with a list of slave sessions.
+        数据库实例负载均衡
+        :param slaves_dbs_config: 实例配置
+        :param policy: 选择策略名称，见 balance_policies
+        :param eject_failures: 连续连接错误达到该次数时摘除实例
+        :param eject_seconds: 摘除时长（秒），到期后重新参与选择
+        :param max_replication_lag: 复制延迟超过该值（秒）的实例不参与选择，0 表示不检查
+        :param lag_check_interval: 复制延迟采样间隔（秒）
+        :param lag_query: 查询复制延迟（秒）的语句，为空时 PostgreSQL / Kingbase 使用 REPLICATION_LAG_QUERY，其他数据库不检查
         """
-        self._slaves = []
+        if policy not in balance_policies:
+            raise ValueError(f"Unknown balance policy: {policy}")
+        self._policy: BalancePolicy = balance_policies[policy]()
+        self._eject_failures = eject_failures
+        self._eject_seconds = eject_seconds
+        self._slaves: list[SlaveMetrics] = []
         for slave_db_config in slaves_dbs_config:
-            db_session_factory = create_db_session_factory(slave_db_config)
-            self._slaves.append(SlaveMetrics(db_session_factory))
+            replica = SlaveMetrics(name=f"{slave_db_config.host}:{slave_db_config.port}/{slave_db_config.database}")
+            # 单个实例时无需按延迟与错误选择，不接收游标事件
+            listener = replica if len(slaves_dbs_config) > 1 else None
+            replica.session_factory = create_db_session_factory(slave_db_config, listener)
+            self._slaves.append(replica)
         self._lock = threading.Lock()
+        if lag_query is None and slaves_dbs_config and _supports_lag_query(slaves_dbs_config[0]):
+            lag_query = REPLICATION_LAG_QUERY
+        self._lag_query = lag_query if max_replication_lag > 0 else None
+        self._max_lag = max_replication_lag
+        self._lag_check_interval = lag_check_interval
+        self._lag_sampled_at = 0.0
+        self._lag_sampling = False
+        self._lag_task: Optional[asyncio.Task] = None
+
+    @property
+    def replicas(self) -> list[SlaveMetrics]:
+        return list(self._slaves)
+
+    def __choose(self, fresh_only: bool = False) -> Optional[SlaveMetrics]:
+        for replica in self._slaves:
+            if replica.ejected_until:
+                # 试探期内再次出现连接错误，重新摘除
+                if replica.available and replica.consecutive_failures > 0:
+                    replica.eject(self._eject_seconds)
+            elif replica.consecutive_failures >= self._eject_failures:
+                replica.eject(self._eject_seconds)
+        candidates = [replica for replica in self._slaves if replica.available]
+        if self._lag_query is not None:
+            self.__schedule_lag_sample()
+            fresh = [replica for replica in candidates if replica.replication_lag <= self._max_lag]
+            if not fresh and fresh_only:
+                return None
+            candidates = fresh or candidates
+        # 全部被摘除时仍需返回实例
+        return self._policy.choose(candidates or self._slaves)
+
+    def __schedule_lag_sample(self):
+        # 持锁调用；采样在后台执行，选择实例时只读取上一次的结果
+        if self._lag_sampling or time.monotonic() - self._lag_sampled_at < self._lag_check_interval:
+            return
+        if env.sync_type == "sync":
+            # 同步会话的查询会阻塞，即使有运行中的事件循环也在线程中执行
+            self._lag_sampling = True
+            thread = threading.Thread(
+                target=contextvars.Context().run,
+                args=(asyncio.run, self.sample_replication_lag()),
+                name="mini-replication-lag",
+                daemon=True,
+            )
+            thread.start()
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 异步引擎的连接绑定在事件循环上，没有运行中的事件循环时不采样
+            return
+        self._lag_sampling = True
+        # 在空上下文中创建任务，采样语句不计入当前请求的统计
+        self._lag_task = contextvars.Context().run(loop.create_task, self.sample_replication_lag())
 
     def get_session_factory(self):
         """
-        Select the slave session with the lowest current load.
+        按策略选择实例并返回其会话工厂，不计入使用中会话数，需要计数时使用 create_session
         """
         with self._lock:
-            # 选择当前负载最小的从库
-            # 可以根据连接数或响应时间来选择
-            least_loaded_slave = min(self._slaves, key=lambda x: x.connection_count)
-            least_loaded_slave.increment_connections()
-            return least_loaded_slave.session_factory
+            return self.__choose().session_factory
+
+    def create_session(self, fresh_only: bool = False):
+        """
+        按策略选择实例并创建会话，计入该实例的使用中会话数，用完后调用 release_session
+        :param fresh_only: 为 True 时所有可用实例的复制延迟都超过阈值则返回 None，由调用方改用主库
+        """
+        with self._lock:
+            replica = self.__choose(fresh_only)
+            if replica is None:
+                return None
+            replica.increment_connections()
+        session = replica.session_factory()
+        session.info[_REPLICA_INFO_KEY] = replica
+        return session
 
     def release_session(self, session):
         """
-        Release a session by decrementing its connection count.
+        释放 create_session 创建的会话，减少所属实例的使用中会话数
         """
+        replica = session.info.pop(_REPLICA_INFO_KEY, None)
+        if replica is None:
+            return
         with self._lock:
-            # 找到对应的会话并减少连接数
-            for slave in self._slaves:
-                if slave.session_factory == session:
-                    slave.decrement_connections()
-                    break
+            replica.decrement_connections()
+
+    async def health_check(self) -> dict[str, bool]:
+        """
+        对各实例执行 SELECT 1，失败的实例被摘除，成功的被摘除实例恢复
+        :return: 实例标识到检查结果的映射
+        """
+        from sqlalchemy import text
+
+        results = {}
+        for replica in self._slaves:
+            # 使用不受请求范围影响的独立会话，同步与异步会话都支持
+            session = replica.session_factory.session_factory()
+            try:
+                result = session.execute(text("SELECT 1"))
+                if inspect.isawaitable(result):
+                    await result
+                results[replica.name] = True
+            except Exception as e:
+                replica.record_error(e)
+                results[replica.name] = False
+            finally:
+                closed = session.close()
+                if inspect.isawaitable(closed):
+                    await closed
+            with self._lock:
+                if results[replica.name]:
+                    replica.readmit()
+                else:
+                    replica.eject(self._eject_seconds)
+        return results
+
+    async def sample_replication_lag(self) -> dict[str, float]:
+        """
+        查询各实例的复制延迟并记录到实例指标，查询失败的实例保留上一次的结果
+        :return: 实例标识到复制延迟（秒）的映射
+        """
+        from sqlalchemy import text
+
+        from mini_framework.utils.log import logger
+
+        lags = {}
+        try:
+            for replica in self._slaves:
+                if not replica.available:
+                    continue
+                session = replica.session_factory.session_factory()
+                try:
+                    result = session.execute(text(self._lag_query or REPLICATION_LAG_QUERY))
+                    if inspect.isawaitable(result):
+                        result = await result
+                    lag = max(0.0, float(result.scalar() or 0))
+                    replica.replication_lag = lags[replica.name] = lag
+                except Exception as e:
+                    replica.record_error(e)
+                    logger.warning(f"Sample replication lag failed: {replica.name}, {e}")
+                finally:
+                    closed = session.close()
+                    if inspect.isawaitable(closed):
+                        await closed
+        finally:
+            self._lag_sampled_at = time.monotonic()
+            self._lag_sampling = False
+        return lags
@@ -1,3 +1,4 @@
+import time
 from typing import Optional, Sequence, Any
 
 from sqlalchemy import event, Executable, util, Result, text
@@ -15,9 +16,39 @@ from tenacity import (
     retry,
 )
 
+from mini_framework.utils.timing import record_db_time, record_db_session, record_db_statement
+
+# 会话 info 中标记已执行写操作的键，读己之写路由据此把后续读请求留在主库
+WRITTEN_INFO_KEY = "written"
+# 以文本形式执行时视为写操作的语句
+_WRITE_KEYWORDS = ("insert", "update", "delete", "merge", "upsert", "create", "alter", "drop", "truncate")
+
+
+def is_write_statement(statement) -> bool:
+    """
+    判断语句是否为写操作
+    :param statement: SQLAlchemy 语句或 text() 语句
+    """
+    if getattr(statement, "is_dml", False) or getattr(statement, "is_ddl", False):
+        return True
+    sql = getattr(statement, "text", None)
+    if isinstance(sql, str):
+        parts = sql.lstrip().split(None, 1)
+        return bool(parts) and parts[0].lower() in _WRITE_KEYWORDS
+    return False
+
+
+def has_pending_writes(session) -> bool:
+    """
+    会话中是否有待刷新的新增、修改或删除对象
+    """
+    return bool(session.new or session.dirty or session.deleted)
+
 
 class MiniSyncSession(Session):
     def flush(self, objects: Optional[Sequence[Any]] = None) -> None:
+        if has_pending_writes(self):
+            self.info[WRITTEN_INFO_KEY] = True
         super().flush(objects)
         self.info["flushed"] = True
 
@@ -45,6 +76,8 @@ class MiniSyncSession(Session):
             _add_event=_add_event,
         )
         self.info["executed"] = True
+        if is_write_statement(statement):
+            self.info[WRITTEN_INFO_KEY] = True
         return result
 
     @retry(
@@ -53,13 +86,21 @@ class MiniSyncSession(Session):
         retry=retry_if_exception_type((OperationalError, DisconnectionError)),
     )
     def commit(self) -> None:
+        if has_pending_writes(self):
+            self.info[WRITTEN_INFO_KEY] = True
         super().commit()
         self.info["committed"] = True
 
 
 class MiniAsyncSession(AsyncSession):
     async def flush(self, objects: Optional[Sequence[Any]] = None) -> None:
-        await super().flush(objects)
+        if has_pending_writes(self):
+            self.info[WRITTEN_INFO_KEY] = True
+        start = time.perf_counter()
+        try:
+            await super().flush(objects)
+        finally:
+            record_db_time(time.perf_counter() - start)
         self.info["flushed"] = True
 
     async def execute(
@@ -72,25 +113,37 @@ class MiniAsyncSession(AsyncSession):
         _parent_execute_state: Optional[Any] = None,
         _add_event: Optional[Any] = None,
     ) -> Result[Any]:
-        result = await super().execute(
-            statement,
-            params,
-            execution_options=execution_options,
-            bind_arguments=bind_arguments,
-            _parent_execute_state=_parent_execute_state,
-            _add_event=_add_event,
-        )
+        start = time.perf_counter()
+        try:
+            result = await super().execute(
+                statement,
+                params,
+                execution_options=execution_options,
+                bind_arguments=bind_arguments,
+                _parent_execute_state=_parent_execute_state,
+                _add_event=_add_event,
+            )
+        finally:
+            record_db_time(time.perf_counter() - start)
         self.info["executed"] = True
+        if is_write_statement(statement):
+            self.info[WRITTEN_INFO_KEY] = True
         return result
 
     async def commit(self) -> None:
+        if has_pending_writes(self):
+            self.info[WRITTEN_INFO_KEY] = True
         async for attempt in AsyncRetrying(
             stop=stop_after_attempt(3),
             wait=wait_exponential(min=1, max=3),
             retry=retry_if_exception_type((OperationalError, DisconnectionError)),
         ):
             with attempt:
-                await super().commit()
+                start = time.perf_counter()
+                try:
+                    await super().commit()
+                finally:
+                    record_db_time(time.perf_counter() - start)
                 self.info["committed"] = True
 
     async def validate_sql(self, sql_query: str):
@@ -110,8 +163,53 @@ retry_strategy = retry(
 
 
 class SessionMaker(sessionmaker):
-    pass
+    def __call__(self, **local_kw):
+        record_db_session()
+        return super().__call__(**local_kw)
 
 
 class AsyncSessionMaker(async_sessionmaker):
-    pass
+    def __call__(self, **local_kw):
+        record_db_session()
+        return super().__call__(**local_kw)
+
+
+def instrument_engine(engine, db: str, listener=None):
+    """
+    通过 SQLAlchemy 游标事件统计语句数量与耗时
+    指标关闭且没有 listener 时不注册事件
+    :param engine: 同步或异步引擎
+    :param db: 数据库标识，作为指标标签
+    :param listener: 接收语句耗时与错误的对象，例如负载均衡的实例指标
+    """
+    from mini_framework.utils.metrics import metrics_registry
+
+    collect = metrics_registry.enabled
+    if not collect and listener is None:
+        return
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("mini_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("mini_query_start")
+        if starts:
+            elapsed = time.perf_counter() - starts.pop()
+            if collect:
+                record_db_statement(elapsed, db)
+            if listener is not None:
+                listener.record_latency(elapsed)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        starts = conn.info.get("mini_query_start") if conn is not None else None
+        if starts:
+            elapsed = time.perf_counter() - starts.pop()
+            if collect:
+                record_db_statement(elapsed, db)
+        if listener is not None:
+            listener.record_error(exception_context.sqlalchemy_exception or exception_context.original_exception)
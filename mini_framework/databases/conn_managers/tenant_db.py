@@ -1,34 +1,86 @@
-import asyncio
-
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from mini_framework.databases.config import DatabaseConfig
 from mini_framework.databases.conn_managers.load_balancer import LoadBalancer
-from mini_framework.databases.conn_managers.utilities import (
-    get_db_components,
-    database_transaction_id,
-)
+from mini_framework.databases.conn_managers.sessions import WRITTEN_INFO_KEY
+from mini_framework.databases.conn_managers.utilities import get_session_scope
 
 
 class TenantDBConnectionManager(object):
     def __init__(
-            self, master_db_config: DatabaseConfig, slaves_dbs_config: list[DatabaseConfig]
+            self,
+            master_db_config: DatabaseConfig,
+            slaves_dbs_config: list[DatabaseConfig],
+            balance_policy: str = "least_in_flight",
+            eject_failures: int = 3,
+            eject_seconds: float = 30,
+            health_check_interval: float = 10,
+            read_your_writes: bool = True,
+            max_replication_lag: float = 0,
+            lag_check_interval: float = 5,
+            replication_lag_query: str = None,
     ):
         """
         初始化租户数据库连接管理器
+        会话按数据库事务 ID 保存在 ContextVar 持有的 DatabaseSessionScope 中，获取会话时没有全局锁
         :param master_db_config: 主数据库配置
         :param slaves_dbs_config: 从数据库配置
+        :param balance_policy: 从库选择策略
+        :param eject_failures: 连续连接错误达到该次数时摘除从库
+        :param eject_seconds: 摘除时长（秒）
+        :param health_check_interval: 从库健康检查间隔（秒），0 表示不检查
+        :param read_your_writes: 同一事务 ID 范围内已在主库写入后，从库读取改用主库会话
+        :param max_replication_lag: 复制延迟超过该值（秒）的从库不参与选择，全部超过时读取主库；0 表示不检查
+        :param lag_check_interval: 复制延迟采样间隔（秒）
+        :param replication_lag_query: 查询复制延迟的语句，为空时 PostgreSQL / Kingbase 使用内置语句
         """
-        self.__session_local = None
-        _, _, session, _ = get_db_components()
-        self.__async_session_lock = asyncio.Lock()
-        self.__sessions: dict[str, dict[str, session]] = dict()
+        self.__read_your_writes = read_your_writes
+        self.__health_check_interval = health_check_interval
         self.__session_local: dict[str, LoadBalancer] = {
             "master": LoadBalancer([master_db_config])
         }
         if len(slaves_dbs_config) > 0:
-            self.__session_local["slave"] = LoadBalancer(slaves_dbs_config)
+            self.__session_local["slave"] = LoadBalancer(
+                slaves_dbs_config,
+                policy=balance_policy,
+                eject_failures=eject_failures,
+                eject_seconds=eject_seconds,
+                max_replication_lag=max_replication_lag,
+                lag_check_interval=lag_check_interval,
+                lag_query=replication_lag_query,
+            )
+
+    def __get_session(self, master: bool):
+        flag = "master" if master else "slave"
+        if flag not in self.__session_local:
+            # 从库配置为空，直接返回主库
+            flag = "master"
+        scope = get_session_scope()
+        if flag == "slave" and self.__read_your_writes:
+            # 已在主库写入时从库可能尚未同步，继续读取主库
+            master_session = scope.sessions.get((self, "master"))
+            if master_session is not None and master_session.info.get(WRITTEN_INFO_KEY):
+                return master_session
+        key = (self, flag)
+        session = scope.sessions.get(key)
+        if session is None:
+            # 检查与创建之间没有 await，同一请求内的并发任务不会重复创建
+            if flag == "slave":
+                session = self.__session_local[flag].create_session(fresh_only=True)
+                if session is None:
+                    # 所有从库的复制延迟都超过阈值
+                    return self.__get_session(True)
+            else:
+                session = self.__session_local[flag].create_session()
+            scope.sessions[key] = session
+        return session
+
+    def __pop_sessions(self) -> dict:
+        scope = get_session_scope(create=False)
+        if scope is None:
+            return {}
+        return scope.pop_sessions(self)
 
     async def get_async_session(self, master: bool) -> AsyncSession:
         """
@@ -36,34 +88,14 @@ class TenantDBConnectionManager(object):
         :param master: 是否主库
         :return:
         """
-        request_id = database_transaction_id.get()
-        flag = "master" if master else "slave"
-        if flag not in self.__session_local:
-            # 从库配置为空，直接返回主库
-            flag = "master"
-        async with self.__async_session_lock:
-            if request_id not in self.__sessions:
-                self.__sessions[request_id] = dict()
-                session_factory = self.__session_local[flag].get_session_factory()
-                self.__sessions[request_id][flag] = session_factory()
-            session_map = self.__sessions[request_id]
-            if flag not in session_map:
-                session_factory = self.__session_local[flag].get_session_factory()
-                session_map[flag] = session_factory()
-        return self.__sessions[request_id][flag]
+        return self.__get_session(master)
 
     async def close_async_session(self):
         """
         关闭异步会话
         :return:
         """
-        request_id = database_transaction_id.get()
-        if request_id is None or request_id not in self.__sessions:
-            return
-        async with self.__async_session_lock:
-            session_map = self.__sessions.pop(request_id, None)
-        if not session_map:
-            return
+        session_map = self.__pop_sessions()
         for flag, session in session_map.items():
             try:
                 # 检查是否存在未提交的事务
@@ -78,18 +110,10 @@ class TenantDBConnectionManager(object):
             finally:
                 await session.close()
                 self.__session_local[flag].release_session(session)
-        session_map.clear()
 
     async def exception_close_async_session(self):
         """报错后释放连接到连接池"""
-
-        request_id = database_transaction_id.get()
-        if request_id is None or request_id not in self.__sessions:
-            return
-        async with self.__async_session_lock:
-            session_map = self.__sessions.pop(request_id, None)
-        if not session_map:
-            return
+        session_map = self.__pop_sessions()
         for flag, session in session_map.items():
             await session.close()
             self.__session_local[flag].release_session(session)
@@ -100,32 +124,14 @@ class TenantDBConnectionManager(object):
         :param master: 是否主库
         :return:
         """
-        request_id = database_transaction_id.get()
-        flag = "master" if master else "slave"
-        if flag not in self.__session_local:
-            # 从库配置为空，直接返回主库
-            flag = "master"
-        if request_id not in self.__sessions:
-            self.__sessions[request_id] = dict()
-            session_factory = self.__session_local[flag].get_session_factory()
-            self.__sessions[request_id][flag] = session_factory()
-        session_map = self.__sessions[request_id]
-        if flag not in session_map:
-            session_factory = self.__session_local[flag].get_session_factory()
-            session_map[flag] = session_factory()
-        return self.__sessions[request_id][flag]
+        return self.__get_session(master)
 
     def close_sync_session(self):
         """
         关闭同步会话
         :return:
         """
-        request_id = database_transaction_id.get()
-        if request_id is None or request_id not in self.__sessions:
-            return
-        session_map = self.__sessions.pop(request_id, None)
-        if not session_map:
-            return
+        session_map = self.__pop_sessions()
         for flag, session in session_map.items():
             try:
                 # 检查是否存在未提交的事务
@@ -140,18 +146,31 @@ class TenantDBConnectionManager(object):
             finally:
                 session.close()
                 self.__session_local[flag].release_session(session)
-        session_map.clear()
+
+    @property
+    def health_check_interval(self) -> float:
+        """
+        从库健康检查间隔（秒），未配置从库时为 0
+        """
+        return self.__health_check_interval if "slave" in self.__session_local else 0
+
+    async def health_check(self) -> dict[str, bool]:
+        """
+        检查从库，未配置从库时返回空字典
+        """
+        balancer = self.__session_local.get("slave")
+        if balancer is None:
+            return {}
+        return await balancer.health_check()
 
     async def dispose_engine(self):
         """
         释放引擎
         :return:
         """
-        for session_map in self.__sessions.values():
-            for session in session_map.values():
+        scope = get_session_scope(create=False)
+        if scope is None:
+            return
+        for (owner, _), session in list(scope.sessions.items()):
+            if owner is self:
                 await session.engine.dispose()
-        # self.__sessions.clear()
-        # self.__session_local.clear()
-        # self.__async_session_lock.release()
-        # self.__async_session_lock = None
-        # self.__sessions
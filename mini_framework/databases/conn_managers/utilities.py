@@ -1,5 +1,5 @@
-from contextvars import ContextVar
-from typing import Optional
+from contextvars import ContextVar, Token
+from typing import Any, Optional
 
 from mini_framework.context import env
 
@@ -9,6 +9,85 @@ database_transaction_id: ContextVar[Optional[str]] = ContextVar(
 )
 
 
+class DatabaseSessionScope(object):
+    """
+    一个数据库事务 ID 范围内打开的会话
+    对象保存在 ContextVar 中，子任务复制上下文后共享同一个对象，无需全局字典与锁
+    """
+
+    __slots__ = ("transaction_id", "sessions")
+
+    def __init__(self, transaction_id: Optional[str]):
+        self.transaction_id = transaction_id
+        # (连接管理器, 主从标识) -> 会话
+        self.sessions: dict[tuple[Any, str], Any] = {}
+
+    def owners(self) -> list:
+        """
+        本范围内打开过会话的连接管理器
+        """
+        owners = []
+        for owner, _ in self.sessions:
+            if owner not in owners:
+                owners.append(owner)
+        return owners
+
+    def pop_sessions(self, owner) -> dict[str, Any]:
+        """
+        取出连接管理器在本范围内打开的会话
+        :param owner: 连接管理器
+        :return: 主从标识到会话的映射
+        """
+        popped = {}
+        for key in [key for key in self.sessions if key[0] is owner]:
+            popped[key[1]] = self.sessions.pop(key)
+        return popped
+
+
+database_session_scope: ContextVar[Optional[DatabaseSessionScope]] = ContextVar(
+    "database_session_scope", default=None
+)
+
+
+def set_database_transaction_id(transaction_id: str) -> tuple[Token, Token]:
+    """
+    设置数据库事务 ID 并创建对应的会话范围
+    在子任务（例如 BaseHTTPMiddleware 模式下的路由处理）打开会话之前调用，父任务才能看到并关闭这些会话
+    :param transaction_id: 事务 ID
+    :return: 用于 reset_database_transaction_id 的令牌
+    """
+    return (
+        database_transaction_id.set(transaction_id),
+        database_session_scope.set(DatabaseSessionScope(transaction_id)),
+    )
+
+
+def reset_database_transaction_id(tokens: tuple[Token, Token]):
+    """
+    恢复 set_database_transaction_id 之前的事务 ID 与会话范围
+    :param tokens: set_database_transaction_id 返回的令牌
+    """
+    id_token, scope_token = tokens
+    database_session_scope.reset(scope_token)
+    database_transaction_id.reset(id_token)
+
+
+def get_session_scope(create: bool = True) -> Optional[DatabaseSessionScope]:
+    """
+    获取当前事务 ID 的会话范围，事务 ID 已变化时视为新的范围
+    :param create: 不存在时是否创建
+    :return: 会话范围
+    """
+    transaction_id = database_transaction_id.get()
+    scope = database_session_scope.get()
+    if scope is None or scope.transaction_id != transaction_id:
+        if not create:
+            return None
+        scope = DatabaseSessionScope(transaction_id)
+        database_session_scope.set(scope)
+    return scope
+
+
 def get_db_components():
     if env.sync_type == "sync":
         from .sessions import MiniSyncSession, SessionMaker
@@ -35,10 +114,11 @@ def scoped_session_func():
     return database_transaction_id.get()
 
 
-def create_db_session_factory(db):
+def create_db_session_factory(db, listener=None):
     """
     创建数据库会话工厂
     :param db: 数据库配置
+    :param listener: 接收语句耗时与错误的对象，需实现 record_latency(elapsed) 与 record_error(exception)
     :return: 数据库会话工厂
     """
     create_engine_func, session_maker_func, session_cls, scoped_session = (
@@ -57,6 +137,9 @@ def create_db_session_factory(db):
         pool_pre_ping=db.pool_pre_ping,
         **extra_params
     )
+    from .sessions import instrument_engine
+
+    instrument_engine(slave_engine, f"{db.host}:{db.port}/{db.database}", listener)
     # 创建会话工厂
     local_session = session_maker_func(
         autocommit=False, autoflush=False, bind=slave_engine, class_=session_cls
@@ -1,12 +1,22 @@
-from typing import Callable
+import hashlib
+import json
+from typing import Callable, Optional, Sequence
 
-from sqlalchemy import select, func, update
+from sqlalchemy import select, func, update, and_, or_, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
 
 
 from mini_framework.databases.entities import BaseDBModel
-from mini_framework.databases.queries.pages import Pagination, Paging
-from mini_framework.web.std_models.page import PageRequest
+from mini_framework.databases.queries.pages import (
+    CursorPaging,
+    Pagination,
+    Paging,
+    decode_cursor,
+    encode_cursor,
+)
+from mini_framework.web.std_models.page import CursorPageRequest, PageRequest
 
 
 def get_update_contents(model_inst: BaseDBModel, *args) -> dict:
@@ -23,7 +33,75 @@ def _get_db_model_primary_keys(model_inst: BaseDBModel):
     return primary_keys
 
 
+def _rows_to_items(rows, column_names) -> list:
+    items = []
+    for item in rows:
+        if issubclass(item[0].__class__, BaseDBModel):
+            items.append(item[0])
+        else:
+            item_dict = dict(zip(column_names, item))
+            items.append(item_dict)
+    return items
+
+
+def _parse_order_key(key) -> tuple:
+    """
+    解析排序键
+    :param key: 列或 column.desc() / column.asc()
+    :return: (列, 是否降序)
+    """
+    if isinstance(key, UnaryExpression) and key.modifier in (operators.desc_op, operators.asc_op):
+        return key.element, key.modifier is operators.desc_op
+    return key, False
+
+
+def _keyset_condition(keys: list[tuple], values: list):
+    """
+    生成从游标位置之后开始的条件
+    排序方向一致时使用行值比较 (a, b) > (x, y)，可以直接利用联合索引；方向不一致时展开为 OR 条件
+    """
+    descending = {desc for _, desc in keys}
+    if len(descending) == 1:
+        desc = descending.pop()
+        if len(keys) == 1:
+            column = keys[0][0]
+            return column < values[0] if desc else column > values[0]
+        row = tuple_(*[column for column, _ in keys])
+        return row < tuple(values) if desc else row > tuple(values)
+    clauses = []
+    for index, (column, desc) in enumerate(keys):
+        conditions = [keys[i][0] == values[i] for i in range(index)]
+        conditions.append(column < values[index] if desc else column > values[index])
+        clauses.append(and_(*conditions))
+    return or_(*clauses)
+
+
+def _get_key_value(item, column):
+    name = column.key
+    try:
+        if isinstance(item, dict):
+            return item[name]
+        return getattr(item, name)
+    except (KeyError, AttributeError):
+        raise ValueError(f"Cursor key '{name}' is not present in the query result") from None
+
+
+def _count_cache_key(query, dialect) -> str:
+    # 以编译后的语句与参数作为规范化的查询，参数名由语句结构决定
+    compiled = query.compile(dialect=dialect)
+    params = sorted((key, repr(value)) for key, value in compiled.params.items())
+    return hashlib.sha256(f"{compiled.string}|{params}".encode("utf-8")).hexdigest()
+
+
+# 已提示过缺少配置的总数缓存 Redis 数据库 Key，每个 Key 只提示一次
+_missing_count_cache_configs: set[str] = set()
+
+
 class DAOBase:
+    # count_mode 为 cached 时总数缓存所在的 Redis 数据库 Key 与缓存时间（秒）
+    count_cache_db_key: str = "page_count"
+    count_cache_ttl: int = 60
+
     def __init__(self):
         from mini_framework.databases.conn_managers.db_manager import (
             db_connection_manager,
@@ -114,40 +192,47 @@ class DAOBase:
     ) -> Paging:
         """
         通用分页查询方法。
+        总数按 page_request.count_mode 统计：exact 精确统计；none 不统计；
+        estimated 使用执行计划的估算行数（PostgreSQL / Kingbase，其他数据库不统计）；
+        cached 精确统计后缓存 count_cache_ttl 秒。非 exact 模式多取一条记录判断是否有下一页。
 
         Args:
             query (sqlalchemy.sql.selectable.Select): 未执行的查询对象。
-            page_request (PageRequest): 分页请求对象，包含页码和每页记录数。
+            page_request (PageRequest): 分页请求对象，包含页码、每页记录数和总数统计方式。
             to_dicts_func (Callable): 可选，将结果转换为字典的函数。
 
         Returns:
-            Paging: 包含分页信息和当前页数据的对象。
+            Paging: 包含分页信息和当前页数据的对象，总数未统计时 total 与 page_count 为 None。
         """
-        # 首先，计算总记录数
         session = await self.slave_db()
         column_names = query.columns.keys()
-        count_query = select(func.count()).select_from(query.subquery())
-        result_count = await session.execute(count_query)
-        total_items = result_count.scalar()
+        per_page = page_request.per_page
+        count_mode = page_request.count_mode
+
+        # 精确统计时先计算总记录数
+        total_items = None
+        if count_mode == "exact":
+            total_items = await self.__exact_count(session, query)
 
         # 计算需要跳过的记录数
-        offset = (page_request.page - 1) * page_request.per_page
+        offset = (page_request.page - 1) * per_page
 
-        # 执行查询，获取当前页的数据
-        result_list = await session.execute(
-            query.offset(offset).limit(page_request.per_page)
-        )
-        result_items = list(result_list.fetchall())
-        items = []
-        for item in result_items:
-            if issubclass(item[0].__class__, BaseDBModel):
-                items.append(item[0])
-            else:
-                item_dict = dict(zip(column_names, item))
-                items.append(item_dict)
+        # 执行查询，获取当前页的数据，不精确统计时多取一条判断是否有下一页
+        limit = per_page if count_mode == "exact" else per_page + 1
+        result_list = await session.execute(query.offset(offset).limit(limit))
+        rows = result_list.fetchall()
+        has_next = None
+        if count_mode != "exact":
+            has_next = len(rows) > per_page
+            rows = rows[:per_page]
+            if count_mode == "estimated":
+                total_items = await self.__estimated_count(session, query)
+            elif count_mode == "cached":
+                total_items = await self.__cached_count(session, query)
+        items = _rows_to_items(rows, column_names)
 
         # 创建Pagination对象
-        pagination = Pagination(page_request.page, page_request.per_page, total_items)
+        pagination = Pagination(page_request.page, per_page, total_items, has_next)
 
         # 使用自定义的to_dicts_func，如果提供
         if to_dicts_func:
@@ -156,3 +241,101 @@ class DAOBase:
         # 创建并返回Paging对象
         paging = Paging(pagination, items)
         return paging
+
+    @staticmethod
+    async def __exact_count(session, query) -> int:
+        count_query = select(func.count()).select_from(query.subquery())
+        result_count = await session.execute(count_query)
+        return result_count.scalar()
+
+    @staticmethod
+    async def __estimated_count(session, query) -> Optional[int]:
+        from mini_framework.utils.log import logger
+
+        dialect = session.bind.dialect
+        if dialect.name not in ("postgresql", "kingbase"):
+            return None
+        try:
+            sql = query.compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+            # 不经过 text() 解析，避免语句中的冒号被当作参数
+            connection = await session.connection()
+            result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except Exception as e:
+            logger.warning(f"Estimate page count failed: {e}")
+            return None
+
+    async def __cached_count(self, session, query) -> int:
+        from mini_framework.cache.config import redis_config
+        from mini_framework.cache.manager import redis_client_manager
+        from mini_framework.utils.log import logger
+
+        db_config = redis_config.dbs.get(self.count_cache_db_key, None)
+        if not db_config:
+            # 未配置时退化为精确统计，只在首次提示
+            if self.count_cache_db_key not in _missing_count_cache_configs:
+                _missing_count_cache_configs.add(self.count_cache_db_key)
+                logger.warning(f"Redis db config not found: {self.count_cache_db_key}, count without cache")
+            return await self.__exact_count(session, query)
+        cache_key = f"{db_config.prefix}:page_count:{self.__db_key}:{_count_cache_key(query, session.bind.dialect)}"
+        client = redis_client_manager.get_client_async(self.count_cache_db_key)
+        try:
+            cached = await client.get(cache_key)
+            if cached is not None:
+                return int(cached)
+        except Exception as e:
+            logger.warning(f"Read cached page count failed: {e}")
+        total_items = await self.__exact_count(session, query)
+        try:
+            await client.set(cache_key, str(total_items), ex=self.count_cache_ttl)
+        except Exception as e:
+            logger.warning(f"Write cached page count failed: {e}")
+        return total_items
+
+    async def query_cursor_page(
+        self,
+        query,
+        page_request: CursorPageRequest,
+        order_by: Sequence,
+        to_dicts_func: Callable = None,
+    ) -> CursorPaging:
+        """
+        游标（keyset）分页查询，按排序键的位置取下一页，不使用 OFFSET，也不统计总数，
+        每页耗时与页码无关，适合深度翻页与导出。
+
+        Args:
+            query (sqlalchemy.sql.selectable.Select): 未执行的查询对象，原有排序会被 order_by 替换。
+            page_request (CursorPageRequest): 分页请求对象，包含游标和每页记录数。
+            order_by (Sequence): 排序键，列或 column.desc()；组合起来必须唯一且不为空（通常以主键结尾），
+                并且能从查询结果中按列名取值。
+            to_dicts_func (Callable): 可选，将结果转换为字典的函数。
+
+        Returns:
+            CursorPaging: 包含当前页数据与下一页游标的对象。
+        """
+        session = await self.slave_db()
+        column_names = query.columns.keys()
+        keys = [_parse_order_key(key) for key in order_by]
+        if page_request.cursor:
+            values = decode_cursor(page_request.cursor, len(keys))
+            query = query.where(_keyset_condition(keys, values))
+
+        # 多取一条判断是否有下一页
+        per_page = page_request.per_page
+        result_list = await session.execute(
+            query.order_by(None).order_by(*order_by).limit(per_page + 1)
+        )
+        rows = result_list.fetchall()
+        has_next = len(rows) > per_page
+        items = _rows_to_items(rows[:per_page], column_names)
+
+        next_cursor = None
+        if has_next:
+            next_cursor = encode_cursor([_get_key_value(items[-1], column) for column, _ in keys])
+
+        if to_dicts_func:
+            items = to_dicts_func(items)
+        return CursorPaging(items, per_page, has_next, next_cursor, page_request.cursor)
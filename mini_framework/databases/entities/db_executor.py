@@ -3,12 +3,13 @@ import shortuuid
 
 def db_transaction(func):
     async def inner(*args, **kwargs):
-        try:
-            from mini_framework.databases.conn_managers.utilities import (
-                database_transaction_id,
-            )
+        from mini_framework.databases.conn_managers.utilities import (
+            reset_database_transaction_id,
+            set_database_transaction_id,
+        )
 
-            database_transaction_id.set(shortuuid.uuid())
+        tokens = set_database_transaction_id(shortuuid.uuid())
+        try:
             result = await func(*args, **kwargs)
 
             return result
@@ -17,6 +18,10 @@ def db_transaction(func):
                 db_connection_manager,
             )
 
-            await db_connection_manager.clear_async_session()
+            try:
+                await db_connection_manager.clear_async_session()
+            finally:
+                # 恢复调用方（例如请求）的事务 ID 与会话范围，调用方打开的会话仍由其自行关闭
+                reset_database_transaction_id(tokens)
 
     return inner
@@ -1,2 +1,8 @@
 class PageNotFoundError(Exception):
     pass
+
+
+class InvalidCursorError(ValueError):
+    """
+    游标无法解析或与排序键不匹配
+    """
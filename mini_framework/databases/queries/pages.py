@@ -1,7 +1,13 @@
+import base64
+import datetime
+import decimal
+import json
+import uuid
 from abc import ABC, abstractmethod
 from math import ceil
-from typing import List, Callable
+from typing import List, Callable, Optional, Sequence
 
+from .errors import InvalidCursorError
 from ..entities import to_dicts
 
 
@@ -13,21 +19,26 @@ class Pagination(object):
     no longer work.
     """
 
-    def __init__(self, page, per_page, total):
+    def __init__(self, page, per_page, total, has_next=None):
         #: the unlimited query object that was used to create this
         #: pagination object.
         #: the current page number (1 indexed)
         self.page = page
         #: the number of items to be displayed on a page.
         self.per_page = per_page
-        #: the total number of items matching the query
+        #: the total number of items matching the query, None if unknown
         self.total = total
+        #: whether a next page exists, determined by the query itself
+        #: instead of the total (None to derive it from the total)
+        self._has_next = has_next
         #: the items for the current page
         # self.items = items
 
     @property
     def pages(self):
-        """The total number of pages"""
+        """The total number of pages, None if the total is unknown"""
+        if self.total is None:
+            return None
         if self.per_page == 0:
             pages = 0
         else:
@@ -49,6 +60,10 @@ class Pagination(object):
     @property
     def has_next(self):
         """True if a next page exists."""
+        if self._has_next is not None:
+            return self._has_next
+        if self.pages is None:
+            return False
         return self.page < self.pages
 
     @property
@@ -61,7 +76,7 @@ class Pagination(object):
     def iter_pages(self, left_edge=2, left_current=2,
                    right_current=5, right_edge=2):
         last = 0
-        for num in range(1, self.pages + 1):
+        for num in range(1, (self.pages or 0) + 1):
             page_num = self.page - left_current - 1 < num < self.page + right_current
             if num <= left_edge or page_num or num > self.pages - right_edge:
                 if last + 1 != num:
@@ -70,6 +85,65 @@ class Pagination(object):
                 last = num
 
 
+# 游标中非 JSON 原生类型的标记与还原方式
+_CURSOR_DECODERS = {
+    "dt": datetime.datetime.fromisoformat,
+    "d": datetime.date.fromisoformat,
+    "t": datetime.time.fromisoformat,
+    "dec": decimal.Decimal,
+    "uuid": uuid.UUID,
+}
+
+
+def _encode_cursor_value(value):
+    if isinstance(value, datetime.datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"d": value.isoformat()}
+    if isinstance(value, datetime.time):
+        return {"t": value.isoformat()}
+    if isinstance(value, decimal.Decimal):
+        return {"dec": str(value)}
+    if isinstance(value, uuid.UUID):
+        return {"uuid": str(value)}
+    return value
+
+
+def encode_cursor(values: Sequence) -> str:
+    """
+    将排序键的值编码为不透明的游标
+    :param values: 当前页最后一条记录的排序键值
+    :return: URL 安全的 base64 字符串
+    """
+    data = json.dumps([_encode_cursor_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, size: int = None) -> list:
+    """
+    还原 encode_cursor 编码的排序键值
+    :param cursor: 游标
+    :param size: 排序键数量，不为空时校验值的个数
+    :return: 排序键值
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        raw_values = json.loads(data)
+        if not isinstance(raw_values, list):
+            raise ValueError("cursor must encode a list")
+        values = []
+        for value in raw_values:
+            if isinstance(value, dict):
+                (tag, text), = value.items()
+                value = _CURSOR_DECODERS[tag](text)
+            values.append(value)
+    except (ValueError, TypeError, KeyError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+    if size is not None and len(values) != size:
+        raise InvalidCursorError(f"Invalid cursor: expected {size} values, got {len(values)}")
+    return values
+
+
 class PagingItemsSerializer(ABC):
     @abstractmethod
     def to_dicts(self, items):
@@ -88,9 +162,9 @@ class Paging(object):
         self.has_next: bool = db_paging.has_next  # 是否有下一页
         self.has_prev: bool = db_paging.has_prev  # 是否有上一页
         self.page: int = db_paging.page  # 当前页页码
-        self.page_count: int = db_paging.pages  # 总页数
+        self.page_count: Optional[int] = db_paging.pages  # 总页数，总数未知时为 None
         self.page_size: int = db_paging.per_page  # 单页记录数
-        self.total: int = db_paging.total  # 总记录数
+        self.total: Optional[int] = db_paging.total  # 总记录数，未统计时为 None
         self.items: List = items  # 记录列表
         self.items_to_dict: Callable = to_dicts
         self.to_dicts_kwargs: dict = dict()
@@ -114,7 +188,7 @@ class Paging(object):
         page_count = self.page_count
         return dict(
             total=total,
-            page_count=int(page_count),
+            page_count=int(page_count) if page_count is not None else None,
             current_page=page,
             page_size=page_size,
             has_next=self.has_next,
@@ -132,3 +206,37 @@ class Paging(object):
             items=self.items_to_dict(self.items, **self.to_dicts_kwargs)
         )
         return result
+
+
+class CursorPaging(object):
+    """
+    游标分页结果，不统计总数，取下一页时传入 next_cursor
+    """
+
+    def __init__(self, items: List, page_size: int, has_next: bool, next_cursor: Optional[str], cursor: str = None):
+        self.items: List = items  # 记录列表
+        self.page_size: int = page_size  # 单页记录数
+        self.has_next: bool = has_next  # 是否有下一页
+        self.next_cursor: Optional[str] = next_cursor  # 下一页的游标
+        self.has_prev: bool = cursor is not None  # 是否从游标位置开始
+        self.items_to_dict: Callable = to_dicts
+        self.to_dicts_kwargs: dict = dict()
+
+    def set_serialize_func(self, to_dicts_func: Callable, **kwargs):
+        self.items_to_dict = to_dicts_func
+        self.to_dicts_kwargs.update(**kwargs)
+
+    @property
+    def items_dict(self):
+        if len(self.items) > 0:
+            return self.items_to_dict(self.items, **self.to_dicts_kwargs)
+        return []
+
+    def to_dict(self):
+        return dict(
+            has_next=self.has_next,
+            has_prev=self.has_prev,
+            next_cursor=self.next_cursor,
+            per_page=self.page_size,
+            items=self.items_to_dict(self.items, **self.to_dicts_kwargs)
+        )
@@ -9,6 +9,7 @@ from typing_extensions import deprecated
 
 from mini_framework.design_patterns.singleton import singleton
 from mini_framework.utils.json import JsonUtils
+from mini_framework.utils.metrics import kafka_messages_consumed, kafka_messages_sent
 
 
 @singleton
@@ -149,6 +150,7 @@ def consume(
                 max_poll_interval_ms=max_poll_interval_ms,
             )
             async for msg in consumer:
+                kafka_messages_consumed.inc(1, msg.topic)
                 # 将消息内容转换为json对象
                 msg_value = msg.value.decode("utf-8")
                 msg_value = JsonUtils.json_str_to_dict(msg_value)
@@ -173,6 +175,7 @@ async def publish(topic: str, msg_value: dict):
     producer = KafkaUtils().get_producer()
     msg_bytes_value = msg_value.encode("utf-8")
     await producer.send_and_wait(topic, msg_bytes_value)
+    kafka_messages_sent.inc(1, topic)
 
 
 @singleton
@@ -201,6 +204,7 @@ class KFKProducer:
 
         msg_bytes_value = msg_value.encode("utf-8")
         await self.__producer.send_and_wait(topic, msg_bytes_value)
+        kafka_messages_sent.inc(1, topic)
 
     async def stop(self):
         """
@@ -4,6 +4,7 @@ from .config import kafka_config
 from ..message_queue.kafka_utils import KafkaUtils
 from ..utils.json import JsonUtils
 from ..utils.log import logger
+from ..utils.metrics import kafka_messages_consumed, kafka_messages_sent
 
 
 def _topic_name_exists(topic_names: list[str], topic_list: list[str]):
@@ -125,6 +126,7 @@ class Topic:
         await self.start_producer()
         await self.__producer.send_and_wait(topic, message)
         await self.__producer.flush()
+        kafka_messages_sent.inc(1, topic)
         logger.info(f"Sent message to topic {topic}: {message}")
 
     async def start_producer(self):
@@ -156,6 +158,8 @@ class Topic:
             partition = random.choice(tuple(partitions))
             await self.__producer.send_batch(batch, topic, partition=partition)
         await self.__producer.flush()
+        for topic, values in messages.items():
+            kafka_messages_sent.inc(len(values), topic)
         logger.info(f"Sent batch messages to topics: {messages}")
 
     async def stream(self):
@@ -172,8 +176,9 @@ class Topic:
         await consumer.start()
         try:
             async for message in consumer:
+                kafka_messages_consumed.inc(1, message.topic)
                 msg_value = message.value.decode("utf-8")
-                logger.info(f"Received message: {msg_value}")
+                logger.debug("Received message: %s", msg_value)
                 message_dict = JsonUtils.json_str_to_dict(msg_value)
                 yield message_dict
         finally:
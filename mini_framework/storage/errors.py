@@ -2,6 +2,8 @@ from mini_framework.web.std_models.errors import MiniHTTPException
 
 
 class BucketNotFoundError(MiniHTTPException):
+    capture_stack = False
+
     def __init__(self, bucket_name: str):
         super().__init__(
             404,
@@ -127,7 +127,7 @@ class StorageManager:
         :return:
         """
         file_storage_db = FileStorage()
-        file_storage_db.file_id = SnowflakeIdGenerator().generate_id()
+        file_storage_db.file_id = await SnowflakeIdGenerator().generate_id_async()
         file_storage_db.virtual_bucket_name = file_storage.virtual_bucket_name
         file_storage_db.file_path = file_storage.file_path
         file_storage_db.file_name = file_storage.file_name
@@ -2,7 +2,7 @@ from sqlalchemy import select
 
 from mini_framework.databases.entities.dao_base import DAOBase
 from mini_framework.storage.persistent.models import FileStorage
-from mini_framework.web.std_models.page import PageRequest
+from mini_framework.web.std_models.page import CursorPageRequest, PageRequest
 
 
 class FileStorageDAO(DAOBase):
@@ -46,8 +46,8 @@ class FileStorageDAO(DAOBase):
         )
         return result.first()
 
-    async def query_file_list_page(
-        self,
+    @staticmethod
+    def __file_list_query(
         virtual_bucket: str,
         file_path: str,
         file_name: str,
@@ -56,21 +56,7 @@ class FileStorageDAO(DAOBase):
         file_size_max: int,
         created_at_start: str,
         created_at_end: str,
-        page_request: PageRequest,
     ):
-        """
-        分页查询文件列表
-        :param page_request: 分页请求
-        :param virtual_bucket:  存储桶名称
-        :param file_path:  文件路径
-        :param file_name: 文件名
-        :param file_type: 文件类型
-        :param file_size_min: 文件大小最小值
-        :param file_size_max: 文件大小最大值
-        :param created_at_start: 创建时间起始
-        :param created_at_end: 创建时间结束
-        :return:
-        """
         query = select(FileStorage)
         if virtual_bucket:
             query = query.filter(FileStorage.virtual_bucket_name == virtual_bucket)
@@ -88,5 +74,72 @@ class FileStorageDAO(DAOBase):
             query = query.filter(FileStorage.created_at >= created_at_start)
         if created_at_end:
             query = query.filter(FileStorage.created_at <= created_at_end)
+        return query
+
+    async def query_file_list_page(
+        self,
+        virtual_bucket: str,
+        file_path: str,
+        file_name: str,
+        file_type: str,
+        file_size_min: int,
+        file_size_max: int,
+        created_at_start: str,
+        created_at_end: str,
+        page_request: PageRequest,
+    ):
+        """
+        分页查询文件列表
+        :param page_request: 分页请求
+        :param virtual_bucket:  存储桶名称
+        :param file_path:  文件路径
+        :param file_name: 文件名
+        :param file_type: 文件类型
+        :param file_size_min: 文件大小最小值
+        :param file_size_max: 文件大小最大值
+        :param created_at_start: 创建时间起始
+        :param created_at_end: 创建时间结束
+        :return:
+        """
+        query = self.__file_list_query(
+            virtual_bucket, file_path, file_name, file_type,
+            file_size_min, file_size_max, created_at_start, created_at_end,
+        )
         query = query.order_by(FileStorage.created_at.desc())
         return await self.query_page(query, page_request)
+
+    async def query_file_list_cursor_page(
+        self,
+        virtual_bucket: str,
+        file_path: str,
+        file_name: str,
+        file_type: str,
+        file_size_min: int,
+        file_size_max: int,
+        created_at_start: str,
+        created_at_end: str,
+        page_request: CursorPageRequest,
+    ):
+        """
+        按创建时间倒序游标分页查询文件列表，深度翻页与导出时使用
+        :param page_request: 游标分页请求
+        :param virtual_bucket:  存储桶名称
+        :param file_path:  文件路径
+        :param file_name: 文件名
+        :param file_type: 文件类型
+        :param file_size_min: 文件大小最小值
+        :param file_size_max: 文件大小最大值
+        :param created_at_start: 创建时间起始
+        :param created_at_end: 创建时间结束
+        :return:
+        """
+        query = self.__file_list_query(
+            virtual_bucket, file_path, file_name, file_type,
+            file_size_min, file_size_max, created_at_start, created_at_end,
+        )
+        # 文件ID保证排序键唯一
+        return await self.query_cursor_page(
+            query,
+            page_request,
+            [FileStorage.created_at.desc(), FileStorage.file_id.desc()],
+        )
@@ -0,0 +1,80 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    布隆过滤器
+    判断结果为 False 时元素一定不存在，为 True 时元素可能存在（存在误判）
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        :param capacity: 预计容纳的元素数量
+        :param error_rate: 期望的误判率
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.__capacity = capacity
+        self.__size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.__hash_count = max(1, int(round(self.__size / capacity * math.log(2))))
+        self.__bits = bytearray((self.__size + 7) // 8)
+        self.__count = 0
+
+    def __positions(self, item: str):
+        digest = hashlib.sha256(item.encode("utf-8")).digest()
+        # 双重哈希: h(i) = h1 + i * h2
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        for i in range(self.__hash_count):
+            yield (h1 + i * h2) % self.__size
+
+    def add(self, item: str):
+        """
+        添加元素
+        :param item: 元素
+        """
+        for position in self.__positions(item):
+            self.__bits[position >> 3] |= 1 << (position & 7)
+        self.__count += 1
+
+    def compatible(self, other: "BloomFilter") -> bool:
+        """
+        判断两个过滤器的位数组长度与哈希函数数量是否一致
+        :param other: 另一个过滤器
+        """
+        return self.__size == other.__size and self.__hash_count == other.__hash_count
+
+    def update(self, other: "BloomFilter"):
+        """
+        合并另一个过滤器（按位或），两者参数必须一致
+        :param other: 另一个过滤器
+        """
+        if not self.compatible(other):
+            raise ValueError("bloom filters are not compatible")
+        for index, byte in enumerate(other.__bits):
+            self.__bits[index] |= byte
+        # 无法精确计算并集大小，取两者较大值作为下界
+        self.__count = max(self.__count, len(other))
+
+    def __contains__(self, item: str) -> bool:
+        for position in self.__positions(item):
+            if not self.__bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def __len__(self):
+        return self.__count
+
+    @property
+    def capacity(self) -> int:
+        return self.__capacity
+
+    @property
+    def saturated(self) -> bool:
+        """
+        元素数量超过预计容量，误判率将高于期望值
+        """
+        return self.__count > self.__capacity
@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+import atexit
+import copy
 import importlib
 import logging
+import queue
+import random
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from types import TracebackType
 from typing import Mapping, Type
 
@@ -10,16 +16,220 @@ from mini_framework.design_patterns.singleton import singleton
 from mini_framework.web.std_models.base_model import BaseViewModel
 
 
+# Sentry 上报模式
+SENTRY_MODE_ERRORS = "errors"  # 只上报 error 及以上级别的事件，低级别日志按采样记为面包屑
+SENTRY_MODE_ALL = "all"  # 每条日志都上报为事件
+
+
 class SentryConfig(BaseViewModel):
     dsn: str
     level: str="info" # 日志级别, "fatal", "critical", "error", "warning", "info", "debug"
     environment: str
+    mode: str = SENTRY_MODE_ERRORS
+    breadcrumb_sample_rate: float = 1.0  # 低于 error 级别日志记为面包屑的采样率
+    traces_sample_rate: float = 1.0
+
+class DropCountingQueueHandler(QueueHandler):
+    """
+    有界队列日志处理器
+    调用方只负责入队，格式化与输出在监听线程执行；队列满时丢弃记录并计数，不阻塞调用方
+    """
+
+    def __init__(self, maxsize: int):
+        super().__init__(queue.Queue(maxsize))
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 与标准库一致在入队前合并 msg % args，避免参数中的可变对象在监听线程格式化前被修改；
+        # 同一进程内的队列不需要序列化，完整格式化仍延迟到监听线程中的处理器
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchingQueueListener(QueueListener):
+    """
+    批量日志监听器
+    每次从队列取出至多 batch_size 条记录或等待至 flush_interval，
+    对普通的流与文件处理器一次写入整批并只 flush 一次，其他处理器逐条处理
+    """
+
+    def __init__(self, queue, *handlers, respect_handler_level=False, batch_size=100, flush_interval=1.0):
+        super().__init__(queue, *handlers, respect_handler_level=respect_handler_level)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+    def _monitor(self):
+        q = self.queue
+        has_task_done = hasattr(q, "task_done")
+        stopped = False
+        while not stopped:
+            batch = []
+            try:
+                record = self.dequeue(True)
+            except queue.Empty:
+                continue
+            if record is self._sentinel:
+                stopped = True
+            else:
+                batch.append(record)
+            deadline = time.monotonic() + self.flush_interval
+            while not stopped and len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    record = q.get(True, timeout)
+                except queue.Empty:
+                    break
+                if record is self._sentinel:
+                    stopped = True
+                else:
+                    batch.append(record)
+            if batch:
+                self.handle_batch(batch)
+            if has_task_done:
+                for _ in range(len(batch) + (1 if stopped else 0)):
+                    q.task_done()
+
+    def handle_batch(self, records: list[logging.LogRecord]):
+        """
+        输出一批记录
+        :param records: 日志记录
+        """
+        records = [self.prepare(record) for record in records]
+        for handler in self.handlers:
+            accepted = [
+                record
+                for record in records
+                if not self.respect_handler_level or record.levelno >= handler.level
+            ]
+            if not accepted:
+                continue
+            # 滚动文件处理器在 emit 中判断滚动，不能合并写入
+            if type(handler) in (logging.StreamHandler, logging.FileHandler):
+                self.__write_batch(handler, accepted)
+            else:
+                for record in accepted:
+                    handler.handle(record)
+
+    @staticmethod
+    def __write_batch(handler: logging.StreamHandler, records: list[logging.LogRecord]):
+        lines = []
+        for record in records:
+            if not handler.filter(record):
+                continue
+            try:
+                lines.append(handler.format(record) + handler.terminator)
+            except Exception:
+                handler.handleError(record)
+        if not lines:
+            return
+        handler.acquire()
+        try:
+            if handler.stream is None and isinstance(handler, logging.FileHandler):
+                handler.stream = handler._open()
+            handler.stream.write("".join(lines))
+            handler.flush()
+        except Exception:
+            handler.handleError(records[-1])
+        finally:
+            handler.release()
+
+
+class QueueLogPipeline(object):
+    """
+    队列日志管道，QueueHandler 入队，QueueListener 在后台线程中调用实际的处理器
+    """
+
+    def __init__(
+        self,
+        handlers: list[logging.Handler],
+        maxsize: int = 10000,
+        batch_size: int = 1,
+        flush_interval: float = 1.0,
+    ):
+        """
+        :param handlers: 实际输出日志的处理器
+        :param maxsize: 队列容量
+        :param batch_size: 每批写入的最大记录数，大于 1 时批量写入
+        :param flush_interval: 批量写入的最长等待时间（秒）
+        """
+        self.handler = DropCountingQueueHandler(maxsize)
+        if batch_size > 1:
+            self.listener = BatchingQueueListener(
+                self.handler.queue,
+                *handlers,
+                respect_handler_level=True,
+                batch_size=batch_size,
+                flush_interval=flush_interval,
+            )
+        else:
+            self.listener = QueueListener(self.handler.queue, *handlers, respect_handler_level=True)
+        self.__started = False
+
+    @property
+    def dropped(self) -> int:
+        """
+        因队列已满丢弃的记录数
+        """
+        return self.handler.dropped
+
+    def start(self):
+        if self.__started:
+            return
+        self.__started = True
+        self.listener.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """
+        停止监听线程，队列中剩余的记录会先输出
+        """
+        if not self.__started:
+            return
+        self.__started = False
+        self.listener.stop()
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    JSON 日志格式，记录的 fields 属性（字典）合并到输出中
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        from mini_framework.utils.json import JsonUtils
+
+        data = dict(
+            time=self.formatTime(record),
+            level=record.levelname,
+            logger=record.name,
+            message=record.getMessage(),
+        )
+        fields = getattr(record, "fields", None)
+        if fields:
+            data.update(fields)
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return JsonUtils.dict_to_json_str(data, ensure_ascii=False)
+
 
 @singleton
 class MiniLogger:
+    DEFAULT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
     def __init__(self):
         self.__logger = logging.getLogger(env.app_name)
         self.__sentry = None
+        self.__pipeline: QueueLogPipeline | None = None
+        self.__sentry_capture_all = False
         self.__load_config()
 
     def __init_default_logger(self):
@@ -29,7 +239,7 @@ class MiniLogger:
         """
         handler = logging.StreamHandler()
         handler.setLevel(logging.INFO)
-        formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+        formatter = logging.Formatter(self.DEFAULT_FORMAT)
         handler.setFormatter(formatter)
         self.__logger.addHandler(handler)
         self.__logger.setLevel(logging.INFO)
@@ -42,10 +252,15 @@ class MiniLogger:
             "log":{
                 "sentry": {
                     "dsn": "https://xxxxx@xxxxx/xxxxx",
-                    "environment": "production"
+                    "environment": "production",
+                    "mode": "errors",
+                    "breadcrumb_sample_rate": 0.1
                 },
                 "level": "DEBUG",
-                "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+                "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+                "queue_size": 10000,
+                "batch_size": 100,
+                "flush_interval": 1.0,
                 "handlers": [
                     {
                         "type": "stream",
@@ -70,20 +285,77 @@ class MiniLogger:
             self.__init_default_logger()
             self.warning("No log configuration found, use default configuration")
             return
-        log_level = log_config.get("level")
-        if log_level:
-            self.__logger.setLevel(log_level)
-        log_format = log_config.get("format")
-        if log_format:
-            formatter = logging.Formatter(log_format)
-            for handler in self.__logger.handlers:
-                handler.setFormatter(formatter)
+        self.__logger.setLevel(log_config.get("level") or logging.INFO)
+        self.__init_handlers(log_config.get("handlers"), log_config.get("format"))
+
+        queue_size = log_config.get("queue_size", 0)
+        if queue_size:
+            self.__init_queue(
+                queue_size,
+                log_config.get("batch_size", 1),
+                log_config.get("flush_interval", 1.0),
+            )
 
         sentry_config = log_config.get("sentry")
         if sentry_config:
             sentry = SentryConfig(**sentry_config)
             self.__init_sentry(sentry)
 
+    def __init_handlers(self, handler_configs: list[dict] | None, log_format: str | None):
+        """
+        按配置创建处理器，未配置 handlers 时使用标准输出
+        :param handler_configs: 处理器配置列表，type 为 stream 或 file
+        :param log_format: 处理器未配置 format 时使用的格式
+        """
+        default_formatter = logging.Formatter(log_format or self.DEFAULT_FORMAT)
+        for handler_config in handler_configs or [dict(type="stream")]:
+            handler_type = handler_config.get("type", "stream")
+            if handler_type == "file":
+                filename = handler_config["filename"]
+                if handler_config.get("maxBytes"):
+                    handler = RotatingFileHandler(
+                        filename,
+                        maxBytes=handler_config["maxBytes"],
+                        backupCount=handler_config.get("backupCount", 0),
+                        encoding="utf-8",
+                    )
+                else:
+                    handler = logging.FileHandler(filename, encoding="utf-8")
+            elif handler_type == "stream":
+                handler = logging.StreamHandler()
+            else:
+                raise ValueError(f"Unknown log handler type: {handler_type}")
+            handler_level = handler_config.get("level")
+            if handler_level:
+                handler.setLevel(handler_level)
+            handler_format = handler_config.get("format")
+            handler.setFormatter(logging.Formatter(handler_format) if handler_format else default_formatter)
+            self.__logger.addHandler(handler)
+
+    def __init_queue(self, queue_size: int, batch_size: int = 1, flush_interval: float = 1.0):
+        """
+        将处理器移到后台线程，调用方只入队，避免在事件循环中格式化与写入
+        :param queue_size: 队列容量，队列满时丢弃日志
+        :param batch_size: 每批写入的最大记录数
+        :param flush_interval: 批量写入的最长等待时间（秒）
+        """
+        handlers = list(self.__logger.handlers)
+        if not handlers:
+            self.warning("Log queue_size is set but no log handlers are configured, log queue disabled")
+            return
+        for handler in handlers:
+            self.__logger.removeHandler(handler)
+        self.__pipeline = QueueLogPipeline(handlers, queue_size, batch_size, flush_interval)
+        self.__logger.addHandler(self.__pipeline.handler)
+        self.__pipeline.start()
+
+    @property
+    def dropped(self) -> int:
+        """
+        日志队列已满时丢弃的记录数
+        """
+        return self.__pipeline.dropped if self.__pipeline is not None else 0
+
     def __init_sentry(self, sentry_config: SentryConfig):
         """
         初始化sentry
@@ -98,16 +370,41 @@ class MiniLogger:
             return
         import sentry_sdk
         from sentry_sdk.integrations.logging import LoggingIntegration
-        integration = LoggingIntegration(level=self.__logger.level, event_level=self.__logger.level)
-        sentry_sdk.init(
+        options = dict(
             dsn=sentry_config.dsn,
-            integrations=[integration],
-            traces_sample_rate=1.0,
+            traces_sample_rate=sentry_config.traces_sample_rate,
             debug=env.debug,
             environment=sentry_config.environment
         )
-        msg = sentry_sdk.capture_message("Sentry initialized", level="info")
+        if sentry_config.mode == SENTRY_MODE_ALL:
+            integration = LoggingIntegration(level=self.__logger.level, event_level=self.__logger.level)
+        else:
+            # 事件只由 LoggingIntegration 在 error 及以上级别上报，低级别日志作为面包屑附加到后续事件
+            integration = LoggingIntegration(level=self.__logger.level, event_level=logging.ERROR)
+            sample_rate = sentry_config.breadcrumb_sample_rate
+            if sample_rate < 1:
+                options["before_breadcrumb"] = self.__sample_breadcrumb(sample_rate)
+        sentry_sdk.init(integrations=[integration], **options)
+        sentry_sdk.capture_message("Sentry initialized", level="info")
         self.__sentry = sentry_sdk
+        self.__sentry_capture_all = sentry_config.mode == SENTRY_MODE_ALL
+
+    @staticmethod
+    def __sample_breadcrumb(sample_rate: float):
+        def before_breadcrumb(crumb, hint):
+            if crumb.get("category") == "log" or "log_record" in (hint or {}):
+                if crumb.get("level") not in ("error", "fatal", "critical") and random.random() >= sample_rate:
+                    return None
+            return crumb
+
+        return before_breadcrumb
+
+    def __capture(self, msg, level: str):
+        """
+        all 模式下将日志上报为 Sentry 事件，errors 模式由 LoggingIntegration 处理
+        """
+        if self.__sentry and self.__sentry_capture_all:
+            self.__sentry.capture_message(msg, level=level)
 
     def get_logger(self):
         return self.__logger
@@ -130,9 +427,7 @@ class MiniLogger:
         :return:
         """
         self.__logger.info(msg, *args, **kwargs)
-        if not self.__sentry:
-            return
-        self.__sentry.capture_message(msg, level="info")
+        self.__capture(msg, "info")
 
     def debug(self, msg, *args, **kwargs):
         """
@@ -143,9 +438,7 @@ class MiniLogger:
         :return:
         """
         self.__logger.debug(msg, *args, **kwargs)
-        if not self.__sentry:
-            return
-        self.__sentry.capture_message(msg, level="debug")
+        self.__capture(msg, "debug")
 
     def warning(self, msg, *args, **kwargs):
         """
@@ -156,9 +449,7 @@ class MiniLogger:
         :return:
         """
         self.__logger.warning(msg, *args, **kwargs)
-        if not self.__sentry:
-            return
-        self.__sentry.capture_message(msg, level="warning")
+        self.__capture(msg, "warning")
 
     def error(self, msg, *args, **kwargs):
         """
@@ -169,9 +460,7 @@ class MiniLogger:
         :return:
         """
         self.__logger.error(msg, *args, **kwargs)
-        if not self.__sentry:
-            return
-        self.__sentry.capture_message(msg, level="error")
+        self.__capture(msg, "error")
 
     def critical(self, msg, *args, **kwargs):
         """
@@ -182,9 +471,7 @@ class MiniLogger:
         :return:
         """
         self.__logger.critical(msg, *args, **kwargs)
-        if not self.__sentry:
-            return
-        self.__sentry.capture_message(msg, level="critical")
+        self.__capture(msg, "critical")
 
     def exception(
             self, msg, *args,
@@ -206,9 +493,7 @@ class MiniLogger:
         self.__logger.exception(
             msg, *args, exc_info=exc_info, stack_info=stack_info, stacklevel=stack_level, extra=extra
         )
-        if not self.__sentry:
-            return
-        self.__sentry.capture_message(msg, level="error")
+        self.__capture(msg, "error")
 
 
 logger = MiniLogger() #.get_logger()
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from pydantic import Field
+
+from mini_framework.design_patterns.singleton import singleton
+from mini_framework.utils.log import logger
+from mini_framework.utils.metrics import metrics_registry
+from mini_framework.web.std_models.base_model import BaseViewModel
+
+loop_lag = metrics_registry.histogram(
+    "mini_event_loop_lag_seconds",
+    "Delay between scheduled and actual wake-up of the event loop heartbeat",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+loop_blocked = metrics_registry.counter(
+    "mini_event_loop_blocked",
+    "Times the event loop was blocked longer than the threshold",
+)
+
+
+class LoopMonitorConfig(BaseViewModel):
+    """
+    事件循环监控配置，位于 loop_monitor
+    """
+
+    enabled: bool = Field(True, title="Enabled", description="是否监控事件循环延迟")
+    interval: float = Field(0.5, title="Interval", description="心跳间隔（秒）")
+    block_threshold: float = Field(0.1, title="Block Threshold", description="心跳超时超过该值（秒）视为阻塞")
+    capture_stack: bool = Field(
+        None, title="Capture Stack", description="阻塞时是否记录事件循环线程的栈，为空时跟随调试模式"
+    )
+
+
+@singleton
+class LoopMonitor(object):
+    """
+    事件循环监控
+    心跳任务按固定间隔休眠并记录实际唤醒延迟；
+    看门狗线程发现心跳超时超过阈值时计数，开启栈记录时输出事件循环线程当前的栈，即正在阻塞事件循环的调用
+    """
+
+    def __init__(self):
+        from mini_framework.configurations import config_injection
+        from mini_framework.context import env
+
+        manager = config_injection.get_config_manager()
+        self.__config = LoopMonitorConfig(**(manager.get_domain_config("loop_monitor") or {}))
+        capture_stack = self.__config.capture_stack
+        self.__capture_stack = env.debug if capture_stack is None else capture_stack
+        self.__task: Optional[asyncio.Task] = None
+        self.__watchdog: Optional[threading.Thread] = None
+        self.__stopped = threading.Event()
+        self.__loop_thread_id: Optional[int] = None
+        # 心跳计划唤醒的时间（time.monotonic）
+        self.__deadline = 0.0
+        self.__reported_deadline = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.__config.enabled
+
+    async def start(self):
+        """
+        在事件循环中启动心跳任务与看门狗线程
+        """
+        if not self.enabled or self.__task is not None:
+            return
+        self.__loop_thread_id = threading.get_ident()
+        self.__stopped.clear()
+        self.__deadline = time.monotonic() + self.__config.interval
+        self.__task = asyncio.create_task(self.__heartbeat())
+        self.__watchdog = threading.Thread(target=self.__watch, name="mini-loop-monitor", daemon=True)
+        self.__watchdog.start()
+
+    async def stop(self):
+        self.__stopped.set()
+        task, self.__task = self.__task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        watchdog, self.__watchdog = self.__watchdog, None
+        if watchdog is not None:
+            watchdog.join(timeout=1)
+
+    async def __heartbeat(self):
+        interval = self.__config.interval
+        while True:
+            self.__deadline = time.monotonic() + interval
+            await asyncio.sleep(interval)
+            loop_lag.observe(max(0.0, time.monotonic() - self.__deadline))
+
+    def __watch(self):
+        threshold = self.__config.block_threshold
+        check_interval = max(0.01, min(threshold, self.__config.interval) / 2)
+        while not self.__stopped.wait(check_interval):
+            deadline = self.__deadline
+            overdue = time.monotonic() - deadline
+            if overdue < threshold or deadline == self.__reported_deadline:
+                continue
+            # 同一次阻塞只报告一次
+            self.__reported_deadline = deadline
+            loop_blocked.inc()
+            if self.__capture_stack:
+                self.__report_stack(overdue)
+            else:
+                logger.warning(f"Event loop blocked for more than {overdue:.3f}s")
+
+    def __report_stack(self, overdue: float):
+        frame = sys._current_frames().get(self.__loop_thread_id)
+        if frame is None:
+            return
+        stack = "".join(traceback.format_stack(frame))
+        logger.warning(f"Event loop blocked for more than {overdue:.3f}s, current stack:\n{stack}")
+
+
+loop_monitor = LoopMonitor()
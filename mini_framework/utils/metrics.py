@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+from typing import Callable, Iterable, Optional
+
+from mini_framework.design_patterns.singleton import singleton
+
+# 默认耗时分桶（秒）
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 单次请求内计数的分桶
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _counter_name(name: str) -> str:
+    return name[: -len("_total")] if name.endswith("_total") else name
+
+
+class Metric(object):
+    """
+    指标基类，按标签值元组保存样本
+    """
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), enabled: bool = True):
+        """
+        :param name: 指标名称
+        :param documentation: 指标说明
+        :param labelnames: 标签名称
+        :param enabled: 关闭时记录方法直接返回
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        """
+        :return: (指标名后缀, 标签字符串, 值) 列表
+        """
+        raise NotImplementedError
+
+    @property
+    def exposed_name(self) -> str:
+        """
+        输出时 HELP/TYPE 行使用的名称
+        """
+        return self.name
+
+    def render(self) -> str:
+        name = self.exposed_name
+        lines = [
+            f"# HELP {name} {self.documentation}",
+            f"# TYPE {name} {self.type_name}",
+        ]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{name}{suffix}{labels} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """
+    计数器，名称不含 _total 后缀，输出时 HELP/TYPE 行与样本统一使用 <name>_total
+    """
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), enabled: bool = True):
+        super().__init__(_counter_name(name), documentation, labelnames, enabled)
+        self.__values: dict[tuple, float] = {}
+
+    @property
+    def exposed_name(self) -> str:
+        return f"{self.name}_total"
+
+    def inc(self, amount: float = 1, *labelvalues):
+        """
+        增加计数
+        :param amount: 增量
+        :param labelvalues: 标签值，顺序与 labelnames 一致
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self.__values[labelvalues] = self.__values.get(labelvalues, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self.__values.items())
+        return [("", _format_labels(self.labelnames, key), value) for key, value in items]
+
+
+class Histogram(Metric):
+    """
+    直方图
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+        enabled: bool = True,
+    ):
+        super().__init__(name, documentation, labelnames, enabled)
+        self.buckets = tuple(sorted(buckets))
+        # 标签值元组 -> [各分桶计数..., 总和, 总数]
+        self.__values: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labelvalues):
+        """
+        记录观测值
+        :param value: 观测值
+        :param labelvalues: 标签值，顺序与 labelnames 一致
+        """
+        if not self.enabled:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self.__values.get(labelvalues)
+            if state is None:
+                state = self.__values[labelvalues] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(state)) for key, state in self.__values.items()]
+        samples = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(float(bound))}"')
+                samples.append(("_bucket", labels, cumulative))
+            samples.append(("_bucket", _format_labels(self.labelnames, key, 'le="+Inf"'), state[-1]))
+            samples.append(("_sum", _format_labels(self.labelnames, key), state[-2]))
+            samples.append(("_count", _format_labels(self.labelnames, key), state[-1]))
+        return samples
+
+
+class CallbackGauge(Metric):
+    """
+    采集时回调取值的仪表
+    """
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], dict[tuple, float] | float],
+        labelnames: Iterable[str] = (),
+    ):
+        """
+        :param callback: 返回数值，或以标签值元组为键的数值字典
+        """
+        super().__init__(name, documentation, labelnames)
+        self.__callback = callback
+
+    def samples(self):
+        values = self.__callback()
+        if values is None:
+            return []
+        if not isinstance(values, dict):
+            return [("", "", values)]
+        return [("", _format_labels(self.labelnames, key), value) for key, value in values.items()]
+
+
+@singleton
+class MetricsRegistry(object):
+    """
+    进程内指标注册表，以 Prometheus 文本格式输出
+    """
+
+    def __init__(self):
+        from mini_framework.configurations import config_injection
+
+        self.__metrics: dict[str, Metric] = {}
+        self.__lock = threading.Lock()
+        # 与 web_server.metrics_enabled 相同的开关，关闭时计数器与直方图不记录，计时与游标事件等采集点直接跳过
+        web_settings = config_injection.get_config_manager().get_domain_config("web_server") or {}
+        self.__enabled = bool(web_settings.get("metrics_enabled", True))
+
+    @property
+    def enabled(self) -> bool:
+        return self.__enabled
+
+    def __get_or_create(self, name: str, factory: Callable[[], Metric]) -> Metric:
+        metric = self.__metrics.get(name)
+        if metric is not None:
+            return metric
+        with self.__lock:
+            metric = self.__metrics.get(name)
+            if metric is None:
+                metric = self.__metrics[name] = factory()
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.__get_or_create(_counter_name(name), lambda: Counter(name, documentation, labelnames, self.__enabled))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.__get_or_create(name, lambda: Histogram(name, documentation, labelnames, buckets, self.__enabled))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], dict[tuple, float] | float],
+        labelnames: Iterable[str] = (),
+    ) -> CallbackGauge:
+        return self.__get_or_create(name, lambda: CallbackGauge(name, documentation, callback, labelnames))
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self.__metrics.get(name)
+
+    def render(self) -> str:
+        """
+        输出 Prometheus 文本格式
+        """
+        chunks = []
+        for metric in list(self.__metrics.values()):
+            try:
+                chunks.append(metric.render())
+            except Exception as e:
+                # 回调失败的指标跳过，不影响其余指标输出
+                chunks.append(f"# {metric.name} collect failed: {_escape(e)}")
+        return "\n".join(chunks) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+# 框架内置指标
+request_duration = metrics_registry.histogram(
+    "mini_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+)
+middleware_hook_duration = metrics_registry.histogram(
+    "mini_middleware_hook_duration_seconds",
+    "Time spent in middleware hooks",
+    ("middleware", "hook"),
+)
+request_db_sessions = metrics_registry.histogram(
+    "mini_request_db_sessions",
+    "DB sessions opened per request",
+    buckets=COUNT_BUCKETS,
+)
+request_db_statements = metrics_registry.histogram(
+    "mini_request_db_statements",
+    "DB statements executed per request",
+    buckets=COUNT_BUCKETS,
+)
+db_sessions_opened = metrics_registry.counter(
+    "mini_db_sessions_opened",
+    "DB sessions opened",
+)
+db_statement_duration = metrics_registry.histogram(
+    "mini_db_statement_duration_seconds",
+    "DB statement execution time",
+    ("db",),
+)
+redis_command_duration = metrics_registry.histogram(
+    "mini_redis_command_duration_seconds",
+    "Redis command time",
+    ("command",),
+)
+kafka_messages_sent = metrics_registry.counter(
+    "mini_kafka_messages_sent",
+    "Kafka messages sent",
+    ("topic",),
+)
+kafka_messages_consumed = metrics_registry.counter(
+    "mini_kafka_messages_consumed",
+    "Kafka messages consumed",
+    ("topic",),
+)
@@ -111,6 +111,7 @@ class SnowflakeIdGenerator:
         初始化雪花ID生成器
         """
         self.redis_client = None
+        self.async_script = None
 
     def __initialize(self):
         from mini_framework.cache.manager import redis_client_manager
@@ -150,7 +151,24 @@ class SnowflakeIdGenerator:
         timestamp = int(time.time() * 1000)
         result = self.script(keys=[f"snowflake:{self.data_center_id}:{self.worker_id}"],
                              args=[timestamp, self.tw_epoch, self.sequence_bits, self.sequence_mask])
+        return self.__compose_id(result)
 
+    async def generate_id_async(self):
+        """
+        生成雪花ID（异步），通过 Redis 异步客户端执行脚本，不阻塞事件循环
+        """
+        if self.redis_client is None:
+            self.__initialize()
+        if self.async_script is None:
+            from mini_framework.cache.manager import redis_client_manager
+            async_client = redis_client_manager.get_client_async("snowflake")
+            self.async_script = async_client.register_script(self.lua_script)
+        timestamp = int(time.time() * 1000)
+        result = await self.async_script(keys=[f"snowflake:{self.data_center_id}:{self.worker_id}"],
+                                         args=[timestamp, self.tw_epoch, self.sequence_bits, self.sequence_mask])
+        return self.__compose_id(result)
+
+    def __compose_id(self, result):
         timestamp, sequence = result
         new_id = ((int(timestamp) - self.tw_epoch) << self.timestamp_left_shift) | \
                  (self.data_center_id << self.data_center_id_shift) | \
@@ -168,4 +186,15 @@ class SnowflakeIdGenerator:
             short_id = short_id.zfill(13)
         return short_id
 
+    async def generate_short_id_async(self):
+        """
+        生成短雪花ID（异步）
+        :return:
+        """
+        long_id = await self.generate_id_async()
+        short_id = decimal_to_base(long_id, 36)
+        if len(short_id) < 13:
+            short_id = short_id.zfill(13)
+        return short_id
+
 snowflake_id_generator = SnowflakeIdGenerator()
\ No newline at end of file
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from contextvars import ContextVar
+from typing import Optional
+
+from mini_framework.utils.metrics import (
+    db_sessions_opened,
+    db_statement_duration,
+    redis_command_duration,
+)
+
+
+class RequestTimings(object):
+    """
+    请求内 DB 与 Redis 调用的累计耗时
+    """
+
+    __slots__ = ("db_time", "db_count", "db_sessions", "db_statements", "redis_time", "redis_count")
+
+    def __init__(self):
+        self.db_time = 0.0
+        self.db_count = 0
+        self.db_sessions = 0
+        self.db_statements = 0
+        self.redis_time = 0.0
+        self.redis_count = 0
+
+
+# 由 MetricsMiddleware 或 LogMiddleware 在请求开始时设置，子任务复制上下文后共享同一对象
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_timings", default=None)
+
+# 请求上下文中保存 RequestTimings 的键
+REQUEST_TIMINGS_KEY = "timings"
+
+
+def start_request_timings(request_context) -> RequestTimings:
+    """
+    获取或创建当前请求的 RequestTimings，并设置到 current_timings
+    :param request_context: 请求上下文
+    :return: 请求耗时统计
+    """
+    timings = request_context.get(REQUEST_TIMINGS_KEY)
+    if timings is None:
+        timings = RequestTimings()
+        request_context[REQUEST_TIMINGS_KEY] = timings
+    current_timings.set(timings)
+    return timings
+
+
+def record_db_time(elapsed: float):
+    """
+    累计 DB 耗时
+    :param elapsed: 耗时（秒）
+    """
+    timings = current_timings.get()
+    if timings is not None:
+        timings.db_time += elapsed
+        timings.db_count += 1
+
+
+def record_db_session():
+    """
+    记录打开的 DB 会话
+    """
+    db_sessions_opened.inc()
+    timings = current_timings.get()
+    if timings is not None:
+        timings.db_sessions += 1
+
+
+def record_db_statement(elapsed: float, db: str):
+    """
+    记录执行的 SQL 语句
+    :param elapsed: 耗时（秒）
+    :param db: 数据库标识
+    """
+    db_statement_duration.observe(elapsed, db)
+    timings = current_timings.get()
+    if timings is not None:
+        timings.db_statements += 1
+
+
+def record_redis_time(elapsed: float, command=None):
+    """
+    累计 Redis 耗时
+    :param elapsed: 耗时（秒）
+    :param command: 命令名称
+    """
+    if command is not None:
+        redis_command_duration.observe(elapsed, command)
+    timings = current_timings.get()
+    if timings is not None:
+        timings.redis_time += elapsed
+        timings.redis_count += 1
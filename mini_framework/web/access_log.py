@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import logging
+import random
+import sys
+from logging.handlers import RotatingFileHandler
+
+from pydantic import Field
+
+from mini_framework.context import env
+from mini_framework.design_patterns.singleton import singleton
+from mini_framework.utils.log import JsonFormatter, QueueLogPipeline
+from mini_framework.web.std_models.base_model import BaseViewModel
+
+
+class AccessLogConfig(BaseViewModel):
+    """
+    访问日志配置，位于 log.access
+    """
+
+    enabled: bool = Field(True, title="Enabled", description="是否输出访问日志")
+    sample_rate: float = Field(
+        1.0, title="Sample Rate", description="状态码小于 400 的请求的采样率，错误与慢请求总是输出"
+    )
+    slow_threshold: float = Field(1.0, title="Slow Threshold", description="慢请求阈值（秒）")
+    queue_size: int = Field(10000, title="Queue Size", description="日志队列容量，队列满时丢弃并计数")
+    batch_size: int = Field(100, title="Batch Size", description="后台线程每批写入的最大记录数")
+    flush_interval: float = Field(1.0, title="Flush Interval", description="批量写入的最长等待时间（秒）")
+    filename: str = Field(None, title="Filename", description="日志文件，为空时输出到标准输出")
+    max_bytes: int = Field(100 * 1024 * 1024, title="Max Bytes", description="日志文件最大字节数")
+    backup_count: int = Field(5, title="Backup Count", description="日志文件保留个数")
+
+
+@singleton
+class AccessLogger(object):
+    """
+    结构化访问日志
+    记录以 JSON 行输出，请求线程只做采样判断与入队，格式化与写入在后台线程执行
+    """
+
+    def __init__(self):
+        from mini_framework.configurations import config_injection
+
+        manager = config_injection.get_config_manager()
+        log_config = manager.get_domain_config("log") or {}
+        self.__config = AccessLogConfig(**(log_config.get("access") or {}))
+        self.__logger = logging.getLogger(f"{env.app_name}.access")
+        self.__logger.propagate = False
+        self.__logger.setLevel(logging.INFO)
+        self.__pipeline: QueueLogPipeline | None = None
+        if self.__config.enabled:
+            self.__pipeline = QueueLogPipeline(
+                [self.__create_handler()],
+                self.__config.queue_size,
+                self.__config.batch_size,
+                self.__config.flush_interval,
+            )
+            self.__logger.addHandler(self.__pipeline.handler)
+            self.__pipeline.start()
+
+    def __create_handler(self) -> logging.Handler:
+        if self.__config.filename:
+            handler = RotatingFileHandler(
+                self.__config.filename,
+                maxBytes=self.__config.max_bytes,
+                backupCount=self.__config.backup_count,
+                encoding="utf-8",
+            )
+        else:
+            handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(JsonFormatter())
+        return handler
+
+    @property
+    def enabled(self) -> bool:
+        return self.__pipeline is not None
+
+    @property
+    def dropped(self) -> int:
+        """
+        因队列已满丢弃的记录数
+        """
+        return self.__pipeline.dropped if self.__pipeline is not None else 0
+
+    def should_log(self, status_code: int, duration: float) -> bool:
+        """
+        判断是否输出，错误与慢请求总是输出，其余按采样率输出
+        :param status_code: 响应状态码
+        :param duration: 请求耗时（秒）
+        """
+        if not self.enabled:
+            return False
+        if status_code >= 400 or duration >= self.__config.slow_threshold:
+            return True
+        sample_rate = self.__config.sample_rate
+        return sample_rate >= 1 or random.random() < sample_rate
+
+    def log(self, fields: dict, status_code: int):
+        """
+        输出访问记录
+        :param fields: 记录字段
+        :param status_code: 响应状态码
+        """
+        level = logging.ERROR if status_code >= 500 else logging.WARNING if status_code >= 400 else logging.INFO
+        self.__logger.log(level, "access", extra=dict(fields=fields))
+
+    def stop(self):
+        if self.__pipeline is not None:
+            self.__pipeline.stop()
+
+
+access_logger = AccessLogger()
@@ -1,20 +1,29 @@
+import sys
 from contextlib import asynccontextmanager
 
 import uvicorn
 
 from mini_framework.design_patterns.singleton import singleton
 from mini_framework.utils.http import HTTPRequest
+from mini_framework.utils.loop_monitor import loop_monitor
 from mini_framework.web.api_doc_manager import APIDocumentManager
-from mini_framework.web.middlewares.auth import AuthMiddleware
+from mini_framework.web.middlewares.auth import AuthMiddleware, build_route_auth_index
 from mini_framework.web.middlewares.base import (
     RequestProcessMiddleware,
+    BaseHTTPRequestProcessMiddleware,
     middleware_manager,
 )
 from mini_framework.web.middlewares.cache import CacheMiddleware
 from mini_framework.web.middlewares.database import DatabaseMiddleware
 from mini_framework.web.middlewares.limit import LimitMiddleware
 from mini_framework.web.middlewares.log import LogMiddleware
+from mini_framework.web.middlewares.metrics import MetricsMiddleware
+from mini_framework.web.middlewares.session import SessionMiddleware
 from mini_framework.web.mini_app import Application, app_config
+from mini_framework.web.profiler import sampling_profiler
+from mini_framework.web.rate_limit import rate_limiter
+from mini_framework.web.response_cache import response_cache_index
+from mini_framework.web.responses import MiniJSONResponse
 from mini_framework.web.router import root_router
 
 
@@ -22,8 +31,36 @@ from mini_framework.web.router import root_router
 async def lifespan(app: Application):
     http_req = HTTPRequest()
     http_req.startup()
+    await loop_monitor.start()
+    if app_config.need_auth:
+        from mini_framework.authentication.revocation import jwt_revocation_list
+
+        await jwt_revocation_list.start()
+    from mini_framework.databases.config import db_config
+
+    if db_config.databases:
+        from mini_framework.databases.conn_managers.db_manager import db_connection_manager
+
+        await db_connection_manager.start_health_check()
     yield
+    if app_config.need_auth:
+        jwt_revocation_list.stop()
+    if "mini_framework.databases.conn_managers.db_manager" in sys.modules:
+        from mini_framework.databases.conn_managers.db_manager import db_connection_manager
+
+        await db_connection_manager.stop_health_check()
     await http_req.shutdown()
+    await loop_monitor.stop()
+    sampling_profiler.stop()
+    if "mini_framework.cache.two_tier" in sys.modules:
+        from mini_framework.cache.two_tier import cache_invalidation_bus
+
+        cache_invalidation_bus.stop()
+    # Redis 客户端按需导入，未使用时不需要关闭
+    if "mini_framework.cache.manager" in sys.modules:
+        from mini_framework.cache.manager import redis_client_manager
+
+        await redis_client_manager.close_all()
     from mini_framework.message_queue.kafka_utils import kafka_producer
     await kafka_producer.stop()
 
@@ -38,21 +75,31 @@ class ApplicationContextManager(object):
             version=app_config.version,
             openapi_url=f"/api/{app_config.name}/openapi.json",
             lifespan=lifespan,
+            default_response_class=MiniJSONResponse,
         )
 
     def initialize(self):
+        if app_config.metrics_enabled:
+            middleware_manager.register(MetricsMiddleware)
         middleware_manager.register(LogMiddleware)
         middleware_manager.register(DatabaseMiddleware)
         middleware_manager.register(LimitMiddleware)
         middleware_manager.register(AuthMiddleware)
         middleware_manager.register(CacheMiddleware)
+        middleware_manager.register(SessionMiddleware)
         manager = APIDocumentManager()
         # self.app_config.update(manager.config)
         self.__app = Application(**self.app_config)
-        self.__app.add_middleware(RequestProcessMiddleware)
+        if app_config.middleware_mode == "base_http":
+            self.__app.add_middleware(BaseHTTPRequestProcessMiddleware)
+        else:
+            self.__app.add_middleware(RequestProcessMiddleware)
         router = root_router.get_router()
         self.__app.include_router(router)
         manager.register(self.__app)
+        build_route_auth_index(self.__app.routes)
+        response_cache_index.build(self.__app.routes)
+        rate_limiter.build(self.__app.routes)
 
     def run(self, host="127.0.0.1", port=8088):
         uvicorn.run(self.app, host=host, port=port)
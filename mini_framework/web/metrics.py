@@ -0,0 +1,50 @@
+import sys
+
+from starlette.responses import PlainTextResponse
+
+from mini_framework.utils.metrics import metrics_registry
+
+# Prometheus 文本格式的内容类型
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _redis_pool_metrics() -> dict:
+    # Redis 客户端按需导入，未使用时不输出
+    if "mini_framework.cache.manager" not in sys.modules:
+        return {}
+    from mini_framework.cache.manager import redis_client_manager
+
+    values = {}
+    for server_key, metrics in redis_client_manager.metrics().items():
+        for field, value in metrics.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                values[(server_key, field)] = value
+    return values
+
+
+def _log_dropped() -> dict:
+    from mini_framework.utils.log import logger
+    from mini_framework.web.access_log import access_logger
+
+    return {("app",): logger.dropped, ("access",): access_logger.dropped}
+
+
+metrics_registry.gauge(
+    "mini_redis_pool",
+    "Redis connection pool statistics",
+    _redis_pool_metrics,
+    ("server", "field"),
+)
+metrics_registry.gauge(
+    "mini_log_records_dropped",
+    "Log records dropped because the log queue was full",
+    _log_dropped,
+    ("logger",),
+)
+
+
+def metrics_endpoint():
+    """
+    以 Prometheus 文本格式输出进程内指标
+    """
+    return PlainTextResponse(metrics_registry.render(), media_type=CONTENT_TYPE)
@@ -12,6 +12,7 @@ from mini_framework.design_patterns.depend_inject import get_injector
 from mini_framework.multi_tenant.registry import tenant_registry
 from mini_framework.multi_tenant.tenant import Tenant
 from mini_framework.utils.log import logger
+from mini_framework.web.middlewares.auth_index import route_auth_index
 from mini_framework.web.middlewares.base import MiddlewareBase, ResponseManager
 from mini_framework.web.request_context import RequestContext, request_context_manager
 from mini_framework.web.std_models.account import AccountInfo, RenderAccount
@@ -123,13 +124,14 @@ async def auth_login_out():
 
 
 class HTTPInvalidTokenError(MiniHTTPException):
+    capture_stack = False
+
     def __init__(self, auth_uri: str):
         super().__init__(
             status_code=401,
             error_code="AUTH_FAILED",
             detail="Invalid token",
             user_message="当前账号未登录或登录状态已过期，请重新登录",
-            stack=None,
             headers={"authorize_uri": f"{auth_uri}"},
         )
 
@@ -141,40 +143,41 @@ def get_auth_url(request, tenant: Tenant | None):
     return auth_url
 
 
+def get_no_login_urls() -> list[str]:
+    """
+    获取不需要登录的 URL 前缀，包含配置项与框架内置的文档地址
+    :return:
+    """
+    from mini_framework.web.mini_app import app_config
+
+    return [
+        *authentication_config.oauth2.no_login_urls,
+        f"/favicon.ico",
+        f"/api/{app_config.name}/openapi.json",
+        f"/api/{app_config.name}/docs",
+        f"/api/{app_config.name}/re/docs",
+        f"/api/{app_config.name}/api-docs-assets",
+    ]
+
+
+def build_route_auth_index(routes):
+    """
+    构建路由认证索引
+    :param routes: 应用路由列表
+    :return:
+    """
+    route_auth_index.build(routes, get_no_login_urls())
+
+
 def check_authentication(request) -> bool:
     """
     检查是否需要进行认证
     :param request:
     :return:
     """
-    no_login_urls = authentication_config.oauth2.no_login_urls
-    from mini_framework.web.mini_app import app_config
-
-    no_login_urls.extend(
-        [
-            f"/favicon.ico",
-            f"/api/{app_config.name}/openapi.json",
-            f"/api/{app_config.name}/docs",
-            f"/api/{app_config.name}/re/docs",
-            f"/api/{app_config.name}/api-docs-assets",
-        ]
-    )
-    routes = request.app.routes
-    for no_login_url in no_login_urls:
-        if no_login_url in request.url.path:
-            return False
-
-    current_route = next(
-        (route for route in routes if route.path == request.url.path), None
-    )
-
-    if not current_route:
-        return True
-
-    if getattr(current_route.endpoint, "require_auth", True):
-        return True
-
-    return False
+    if not route_auth_index.built:
+        build_route_auth_index(request.app.routes)
+    return route_auth_index.require_auth(request.method, request.url.path)
 
 
 async def get_tenant(request) -> Tenant:
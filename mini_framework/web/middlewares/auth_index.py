@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import re
+from typing import Iterable, Optional, Pattern
+
+from mini_framework.design_patterns.singleton import singleton
+
+# 路径模板中的参数段, 例如 {id}、{id:int}、{file_path:path}
+_PARAM_SEGMENT = re.compile(r"^{(?P<name>[a-zA-Z_][a-zA-Z0-9_]*)(?::(?P<convertor>[a-zA-Z_][a-zA-Z0-9_]*))?}$")
+ANY_METHOD = "*"
+
+
+class PrefixTrie(object):
+    """
+    前缀树, 用于判断路径是否以某个已登记的前缀开头
+    """
+
+    __slots__ = ("_root",)
+
+    _END = ""
+
+    def __init__(self, prefixes: Iterable[str] = ()):
+        self._root: dict = {}
+        for prefix in prefixes:
+            self.insert(prefix)
+
+    def insert(self, prefix: str):
+        """
+        登记前缀
+        :param prefix: URL 前缀
+        """
+        if not prefix:
+            return
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[self._END] = True
+
+    def match(self, path: str) -> bool:
+        """
+        判断路径是否命中任一前缀
+        :param path: 请求路径
+        :return: 是否命中
+        """
+        node = self._root
+        for char in path:
+            node = node.get(char)
+            if node is None:
+                return False
+            if self._END in node:
+                return True
+        return False
+
+
+class _RouteNode(object):
+    __slots__ = ("static", "param", "catch_all", "methods")
+
+    def __init__(self):
+        self.static: dict[str, _RouteNode] = {}
+        self.param: Optional[_RouteNode] = None
+        self.catch_all: Optional[_RouteNode] = None
+        self.methods: dict[str, bool] = {}
+
+
+class RouteTemplateTrie(object):
+    """
+    路由模板树, 以路径段为节点, 支持 {param} 与 {param:path} 形式的路径参数
+    静态段优先于参数段匹配, 同一模板与方法重复注册时以先注册者为准
+    """
+
+    def __init__(self):
+        self._root = _RouteNode()
+        # 含有混合段(如 /files/{name}.txt)的模板无法放入树中, 退化为正则匹配
+        self._fallbacks: list[tuple[Pattern, dict[str, bool]]] = []
+
+    def add(self, template: str, methods: Iterable[str] | None, value: bool, path_regex: Pattern = None):
+        """
+        登记路由模板
+        :param template: 路由模板
+        :param methods: HTTP 方法, 为空表示任意方法
+        :param value: 是否需要认证
+        :param path_regex: 路由的正则表达式, 用于混合段模板
+        """
+        methods = [method.upper() for method in methods] if methods else [ANY_METHOD]
+        node = self._root
+        for segment in template.lstrip("/").split("/"):
+            param_match = _PARAM_SEGMENT.match(segment)
+            if param_match:
+                if param_match.group("convertor") == "path":
+                    if node.catch_all is None:
+                        node.catch_all = _RouteNode()
+                    node = node.catch_all
+                    break
+                if node.param is None:
+                    node.param = _RouteNode()
+                node = node.param
+            elif "{" in segment:
+                if path_regex is not None:
+                    method_map = {}
+                    for method in methods:
+                        method_map.setdefault(method, value)
+                    self._fallbacks.append((path_regex, method_map))
+                return
+            else:
+                node = node.static.setdefault(segment, _RouteNode())
+        for method in methods:
+            node.methods.setdefault(method, value)
+
+    def lookup(self, path: str) -> dict[str, bool] | None:
+        """
+        查找路径对应的方法映射
+        :param path: 请求路径
+        :return: 方法到是否需要认证的映射, 未找到返回 None
+        """
+        segments = path.lstrip("/").split("/")
+        methods = self.__match(self._root, segments, 0)
+        if methods is not None:
+            return methods
+        for path_regex, method_map in self._fallbacks:
+            if path_regex.match(path):
+                return method_map
+        return None
+
+    def __match(self, node: _RouteNode, segments: list[str], index: int) -> dict[str, bool] | None:
+        if index == len(segments):
+            return node.methods or None
+        segment = segments[index]
+        child = node.static.get(segment)
+        if child is not None:
+            result = self.__match(child, segments, index + 1)
+            if result is not None:
+                return result
+        if node.param is not None and segment:
+            result = self.__match(node.param, segments, index + 1)
+            if result is not None:
+                return result
+        if node.catch_all is not None:
+            return node.catch_all.methods or None
+        return None
+
+
+@singleton
+class RouteAuthIndex(object):
+    """
+    路由认证索引
+    在应用初始化时构建一次, 请求期间以 O(路径长度) 判断是否需要认证
+    """
+
+    def __init__(self):
+        self.__no_login_prefixes: PrefixTrie = PrefixTrie()
+        self.__routes: RouteTemplateTrie = RouteTemplateTrie()
+        self.__built = False
+
+    @property
+    def built(self) -> bool:
+        return self.__built
+
+    def build(self, routes: Iterable, no_login_urls: Iterable[str]):
+        """
+        构建索引
+        :param routes: 应用路由列表
+        :param no_login_urls: 不需要登录的 URL 前缀
+        """
+        no_login_prefixes = PrefixTrie(no_login_urls)
+        route_trie = RouteTemplateTrie()
+        for route in routes:
+            endpoint = getattr(route, "endpoint", None)
+            path = getattr(route, "path", None)
+            if endpoint is None or path is None:
+                continue
+            route_trie.add(
+                path,
+                getattr(route, "methods", None),
+                getattr(endpoint, "require_auth", True),
+                getattr(route, "path_regex", None),
+            )
+        self.__no_login_prefixes = no_login_prefixes
+        self.__routes = route_trie
+        self.__built = True
+
+    def require_auth(self, method: str, path: str) -> bool:
+        """
+        判断请求是否需要认证
+        :param method: HTTP 方法
+        :param path: 请求路径
+        :return: 是否需要认证
+        """
+        if self.__no_login_prefixes.match(path):
+            return False
+        methods = self.__routes.lookup(path)
+        if not methods:
+            return True
+        value = methods.get(method)
+        if value is None:
+            value = methods.get(ANY_METHOD, True)
+        return value
+
+
+route_auth_index = RouteAuthIndex()
@@ -2,29 +2,111 @@ from __future__ import annotations
 
 import time
 from abc import abstractmethod, ABC
-from typing import List, Optional, Type
+from typing import Awaitable, Callable, List, Optional, Type, Union
 
 from fastapi import HTTPException, FastAPI
 from fastapi.exceptions import RequestValidationError
 from pydantic import ValidationError
+from starlette.datastructures import MutableHeaders
 from starlette.middleware.base import BaseHTTPMiddleware, DispatchFunction
 from starlette.requests import Request
 from starlette.responses import Response
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Scope, Receive, Send, Message
 
 from mini_framework.design_patterns.singleton import singleton
-from mini_framework.web.request_context import request_context_manager, RequestContext, current_request_id
+from mini_framework.utils.metrics import metrics_registry, middleware_hook_duration
+from mini_framework.web.profiler import sampling_profiler
+from mini_framework.web.request_context import request_context_manager, RequestContext
 from mini_framework.web.std_models.errors import MiniHTTPException
 
 
 class ResponseManager(object):
-    def __init__(self, request_context: RequestContext, response: Optional[Response, Exception]):
+    def __init__(
+        self,
+        request_context: RequestContext,
+        response: Optional[Union[Response, Exception]],
+        message: Optional[Message] = None,
+    ):
         """
         响应管理器
         :param request_context: 请求上下文
+        :param response: 响应对象或异常
+        :param message: ASGI 模式下的 http.response.start 消息
         """
         self._request_context = request_context
-        self._response: Optional[Response, Exception] = response
+        self._response: Optional[Union[Response, Exception]] = response
+        self._message: Optional[Message] = message
+        self._body_callbacks: List[Callable[["ResponseManager", bytes], Awaitable[Optional[bytes]]]] = []
+
+    @property
+    def status_code(self) -> int:
+        """
+        获取响应状态码
+        :return:
+        """
+        if self._message is not None:
+            return self._message["status"]
+        if isinstance(self._response, (Response, HTTPException)):
+            return self._response.status_code
+        return 500
+
+    @status_code.setter
+    def status_code(self, value: int):
+        if self._message is not None:
+            self._message["status"] = value
+        elif isinstance(self._response, Response):
+            self._response.status_code = value
+
+    @property
+    def headers(self) -> MutableHeaders:
+        """
+        获取可修改的响应头
+        :return:
+        """
+        if self._message is not None:
+            return MutableHeaders(scope=self._message)
+        if isinstance(self._response, Response):
+            return self._response.headers
+        return MutableHeaders()
+
+    def buffer_body(self, callback: Callable[["ResponseManager", bytes], Awaitable[Optional[bytes]]]):
+        """
+        请求缓冲完整响应体，响应头在回调执行后才发送
+        回调可以修改响应头，返回 bytes 时替换响应体；流式响应会被缓冲，只应在需要时使用
+        :param callback: 回调，参数为响应管理器与完整响应体
+        """
+        self._body_callbacks.append(callback)
+
+    @property
+    def buffering(self) -> bool:
+        return bool(self._body_callbacks)
+
+    async def process_body(self, body: bytes) -> bytes:
+        """
+        执行响应体回调
+        :param body: 完整响应体
+        :return: 处理后的响应体
+        """
+        for callback in self._body_callbacks:
+            result = await callback(self, body)
+            if result is not None:
+                body = result
+        return body
+
+    async def __buffered_response(self, response: Response) -> Response:
+        body = getattr(response, "body", None)
+        if body is None:
+            chunks = []
+            async for chunk in response.body_iterator:
+                chunks.append(chunk.encode(response.charset) if isinstance(chunk, str) else chunk)
+            body = b"".join(chunks)
+        body = await self.process_body(body)
+        buffered = Response(content=body, status_code=response.status_code)
+        buffered.raw_headers = [
+            header for header in response.raw_headers if header[0] != b"content-length"
+        ] + [(b"content-length", str(len(body)).encode("latin-1"))]
+        buffered.background = response.background
+        return buffered
 
     def __make_headers(self, headers):
         from mini_framework.web.mini_app import app_config
@@ -41,9 +123,19 @@ class ResponseManager(object):
             headers["Authorization"] = token
         return headers
 
+    def start_message(self) -> Message:
+        """
+        ASGI 模式下向 http.response.start 消息注入 x-request-* 响应头
+        :return: 注入后的消息
+        """
+        self.__make_headers(MutableHeaders(scope=self._message))
+        return self._message
+
     async def response(self):
         response_or_error = self._response
         if isinstance(response_or_error, Response):
+            if self._body_callbacks:
+                response_or_error = await self.__buffered_response(response_or_error)
             self.__make_headers(response_or_error.headers)
             return response_or_error
         elif isinstance(response_or_error, MiniHTTPException):
@@ -75,7 +167,13 @@ class MiddlewareBase(ABC):
         pass
 
     @abstractmethod
-    async def before_request(self, request: RequestContext):
+    async def before_request(self, request: RequestContext) -> Optional[Response]:
+        """
+        请求前处理
+        :param request: 请求上下文
+        :return: 返回响应时跳过后续中间件的 before_request 与路由处理，直接以该响应应答，
+                 after_request 仍会执行
+        """
         pass
 
     @abstractmethod
@@ -99,37 +197,148 @@ class MiddlewareManager(object):
         for middleware in self._middlewares:
             yield middleware
 
+    async def before_request(self, request_context: RequestContext) -> Optional[Response]:
+        """
+        依次执行各中间件的 before_request 并记录耗时
+        :param request_context: 请求上下文
+        :return: 某个中间件返回的响应，没有时返回 None
+        """
+        if not metrics_registry.enabled:
+            for middleware in self._middlewares:
+                response = await middleware.before_request(request_context)
+                if response is not None:
+                    return response
+            return None
+        for middleware in self._middlewares:
+            start = time.perf_counter()
+            response = await middleware.before_request(request_context)
+            middleware_hook_duration.observe(
+                time.perf_counter() - start, type(middleware).__name__, "before_request"
+            )
+            if response is not None:
+                return response
+        return None
+
+    async def after_request(self, request_context: RequestContext, response_manager: ResponseManager):
+        """
+        依次执行各中间件的 after_request 并记录耗时
+        :param request_context: 请求上下文
+        :param response_manager: 响应管理器
+        """
+        if not metrics_registry.enabled:
+            for middleware in self._middlewares:
+                await middleware.after_request(request_context, response_manager)
+            return
+        for middleware in self._middlewares:
+            start = time.perf_counter()
+            await middleware.after_request(request_context, response_manager)
+            middleware_hook_duration.observe(
+                time.perf_counter() - start, type(middleware).__name__, "after_request"
+            )
+
 
 middleware_manager = MiddlewareManager()
 
 
-class RequestProcessMiddleware(BaseHTTPMiddleware):
+def _begin_profile(request_context: RequestContext, request: Request):
     """
-    请求过程中间件
+    开启请求采样分析，未开启时只有一次属性判断
     """
+    if not sampling_profiler.enabled:
+        return None
+    return sampling_profiler.begin(request_context.request_id, request.method, request.url.path)
 
-    def __init__(self, app: ASGIApp, dispatch: DispatchFunction | None = None) -> None:
-        super(RequestProcessMiddleware, self).__init__(app, dispatch)
+
+def _end_profile(profile):
+    sampling_profiler.end(profile)
+
+
+class RequestProcessMiddleware(object):
+    """
+    请求过程中间件（原生 ASGI 实现）
+    直接驱动 MiddlewareBase 的 before_request/after_request 钩子，
+    只在 http.response.start 消息上注入响应头，除非钩子调用 buffer_body，否则不缓冲响应体，流式响应保持流式
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
         for middleware in middleware_manager.middlewares:
             middleware.initialize(app)
 
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope, receive)
         request_context = request_context_manager.get(request)
-        current_request_id.set(request_context.request_id)
-        for middleware in middleware_manager.middlewares:
-            await middleware.before_request(request_context)
+        profile = _begin_profile(request_context, request)
+        try:
+            await self.__process(scope, receive, send, request_context)
+        finally:
+            if profile is not None:
+                _end_profile(profile)
+            request_context_manager.remove()
+
+    async def __process(self, scope: Scope, receive: Receive, send: Send, request_context: RequestContext) -> None:
+        response = await middleware_manager.before_request(request_context)
+
+        response_manager: Optional[ResponseManager] = None
+        body_chunks: Optional[List[bytes]] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_manager, body_chunks
+            if message["type"] == "http.response.start":
+                response_manager = ResponseManager(request_context, None, message)
+                await middleware_manager.after_request(request_context, response_manager)
+                if response_manager.buffering:
+                    body_chunks = []
+                    return
+                message = response_manager.start_message()
+            elif message["type"] == "http.response.body" and body_chunks is not None:
+                body_chunks.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    return
+                body = await response_manager.process_body(b"".join(body_chunks))
+                body_chunks = None
+                start_message = response_manager.start_message()
+                MutableHeaders(scope=start_message)["content-length"] = str(len(body))
+                await send(start_message)
+                message = {"type": "http.response.body", "body": body, "more_body": False}
+            await send(message)
+
+        if response is not None:
+            await response(scope, receive, send_wrapper)
+        else:
+            await self.app(scope, receive, send_wrapper)
 
-        response = await call_next(request)
-        response_manager = ResponseManager(request_context, response)
 
-        for middleware in middleware_manager.middlewares:
-            await middleware.after_request(request_context, response_manager)
-
-        response = await response_manager.response()
+class BaseHTTPRequestProcessMiddleware(BaseHTTPMiddleware):
+    """
+    请求过程中间件（基于 BaseHTTPMiddleware 的兼容实现）
+    """
 
-        request_context_manager.remove(request_context.request_id)
+    def __init__(self, app: ASGIApp, dispatch: DispatchFunction | None = None) -> None:
+        super(BaseHTTPRequestProcessMiddleware, self).__init__(app, dispatch)
+        for middleware in middleware_manager.middlewares:
+            middleware.initialize(app)
 
-        return response
+    async def dispatch(self, request: Request, call_next):
+        request_context = request_context_manager.get(request)
+        profile = _begin_profile(request_context, request)
+        try:
+            response = await middleware_manager.before_request(request_context)
+            if response is None:
+                response = await call_next(request)
+            response_manager = ResponseManager(request_context, response)
+
+            await middleware_manager.after_request(request_context, response_manager)
+
+            return await response_manager.response()
+        finally:
+            if profile is not None:
+                _end_profile(profile)
+            request_context_manager.remove()
 
 
 class HandlerRegister:
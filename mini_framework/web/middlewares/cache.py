@@ -1,15 +1,134 @@
+from __future__ import annotations
+
+import time
+
+from starlette.responses import Response
 from starlette.types import ASGIApp
 
+from mini_framework.utils.log import logger
 from mini_framework.web.middlewares.base import MiddlewareBase, ResponseManager
 from mini_framework.web.request_context import RequestContext
+from mini_framework.web.response_cache import (
+    CachedResponse,
+    ResponseCacheStorage,
+    create_response_cache_storage,
+    etag_matches,
+    filter_cacheable_headers,
+    make_cache_key,
+    make_etag,
+    response_cache_index,
+)
+
+_POLICY_KEY = "response_cache_policy"
+_CACHE_KEY = "response_cache_key"
+_HIT_KEY = "response_cache_hit"
 
 
 class CacheMiddleware(MiddlewareBase):
+    """
+    响应缓存中间件
+    只处理通过 cache_response 或 Router(response_cache=...) 开启缓存的 GET 接口，
+    缓存键包含方法、路径、查询参数、租户编码，以及按策略包含的登录账号；
+    命中时直接返回缓存的响应，If-None-Match 与 ETag 匹配时返回 304
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.__storage: ResponseCacheStorage | None = None
+
     def initialize(self, app: ASGIApp):
         pass
 
+    @property
+    def storage(self) -> ResponseCacheStorage:
+        if self.__storage is None:
+            self.__storage = create_response_cache_storage()
+        return self.__storage
+
     async def before_request(self, request: RequestContext):
-        pass
+        http_request = request.request
+        if not response_cache_index.built:
+            response_cache_index.build(http_request.app.routes)
+        policy = response_cache_index.lookup(http_request.method, http_request.url.path)
+        if policy is None:
+            return None
+        request_cache_control = http_request.headers.get("cache-control", "").lower()
+        if "no-store" in request_cache_control:
+            return None
+        account = request.current_login_account if policy.vary_account else None
+        if policy.vary_account and account is None:
+            # 未登录时无法区分账号，不缓存
+            return None
+        key = make_cache_key(
+            http_request.method,
+            http_request.url.path,
+            http_request.url.query,
+            request.tenant_code,
+            account.account_id if account is not None else None,
+        )
+        request[_POLICY_KEY] = policy
+        request[_CACHE_KEY] = key
+        if "no-cache" in request_cache_control:
+            # 要求重新生成响应，生成后更新缓存
+            return None
+        try:
+            cached = await self.storage.get(key)
+        except Exception as e:
+            logger.warning(f"Response cache get failed: {e}")
+            return None
+        if cached is None:
+            return None
+        request[_HIT_KEY] = True
+        return self.__render(cached, policy.cache_control, http_request.headers.get("if-none-match"))
+
+    @staticmethod
+    def __render(cached: CachedResponse, cache_control: str, if_none_match: str | None) -> Response:
+        if etag_matches(if_none_match, cached.etag):
+            response = Response(status_code=304)
+            for name, value in cached.headers:
+                if name in ("etag", "cache-control", "vary", "expires", "last-modified"):
+                    response.headers.append(name, value)
+        else:
+            response = Response(content=cached.body, status_code=cached.status_code)
+            for name, value in cached.headers:
+                response.headers.append(name, value)
+        response.headers["etag"] = cached.etag
+        response.headers["cache-control"] = cache_control
+        response.headers["age"] = str(cached.age)
+        return response
 
     async def after_request(self, request: RequestContext, response_manager: ResponseManager):
-        pass
+        if _POLICY_KEY not in request or _HIT_KEY in request:
+            return
+        if response_manager.status_code != 200:
+            return
+        headers = response_manager.headers
+        response_cache_control = headers.get("cache-control", "").lower()
+        if "no-store" in response_cache_control or "set-cookie" in headers:
+            return
+        policy = request[_POLICY_KEY]
+        key = request[_CACHE_KEY]
+        if_none_match = request.request.headers.get("if-none-match")
+
+        async def store(manager: ResponseManager, body: bytes):
+            etag = make_etag(body)
+            manager.headers["etag"] = etag
+            manager.headers["cache-control"] = policy.cache_control
+            cached = CachedResponse(
+                status_code=manager.status_code,
+                headers=filter_cacheable_headers(manager.headers.raw),
+                body=body,
+                etag=etag,
+                created_at=time.time(),
+                ttl=policy.ttl,
+            )
+            try:
+                await self.storage.set(key, cached)
+            except Exception as e:
+                logger.warning(f"Response cache set failed: {e}")
+            if etag_matches(if_none_match, etag):
+                manager.status_code = 304
+                return b""
+            return None
+
+        response_manager.buffer_body(store)
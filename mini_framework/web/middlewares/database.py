@@ -9,9 +9,10 @@ class DatabaseMiddleware(MiddlewareBase):
         pass
 
     async def before_request(self, request: RequestContext):
-        from mini_framework.databases.conn_managers.utilities import database_transaction_id
+        from mini_framework.databases.conn_managers.utilities import set_database_transaction_id
 
-        database_transaction_id.set(request.request_id)
+        # 同时创建会话范围，BaseHTTPMiddleware 模式下路由处理在子任务中打开的会话也能在 after_request 中关闭
+        set_database_transaction_id(request.request_id)
 
     async def after_request(
         self, request: RequestContext, response_manager: ResponseManager
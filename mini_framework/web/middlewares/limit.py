@@ -1,15 +1,49 @@
 from starlette.types import ASGIApp
 
 from mini_framework.web.middlewares.base import MiddlewareBase, ResponseManager
+from mini_framework.web.rate_limit import rate_limiter
 from mini_framework.web.request_context import RequestContext
+from mini_framework.web.std_models.errors import MiniHTTPException
+
+
+class HTTPTooManyRequestsError(MiniHTTPException):
+    capture_stack = False
+
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=429,
+            error_code="TOO_MANY_REQUESTS",
+            detail="Too many requests",
+            user_message="请求过于频繁，请稍后再试",
+            headers={"Retry-After": str(retry_after)},
+        )
 
 
 class LimitMiddleware(MiddlewareBase):
+    """
+    限流中间件
+    按配置与接口的 rate_limit 规则，以路由、租户、客户端 IP 组合维度进行令牌桶限流，超限时返回 429
+    """
+
     def initialize(self, app: ASGIApp):
         pass
 
     async def before_request(self, request: RequestContext):
-        pass
+        if not rate_limiter.enabled:
+            return None
+        http_request = request.request
+        if not rate_limiter.built:
+            rate_limiter.build(http_request.app.routes)
+        decision = await rate_limiter.check(
+            http_request.method,
+            http_request.url.path,
+            request.tenant_code,
+            request.real_ip,
+        )
+        if decision.allowed:
+            return None
+        # 直接返回响应而不是抛出异常，过载时避免异常处理与堆栈记录的开销
+        return HTTPTooManyRequestsError(decision.retry_after).response()
 
     async def after_request(self, request: RequestContext, response_manager: ResponseManager):
         pass
@@ -1,15 +1,54 @@
+import time
+
 from starlette.types import ASGIApp
 
+from mini_framework.utils.timing import REQUEST_TIMINGS_KEY, RequestTimings, start_request_timings
+from mini_framework.web.access_log import access_logger
 from mini_framework.web.middlewares.base import MiddlewareBase, ResponseManager
 from mini_framework.web.request_context import RequestContext
 
 
 class LogMiddleware(MiddlewareBase):
+    """
+    访问日志中间件
+    每个请求输出一条结构化记录，包含请求 ID、租户、路由模板、状态码、耗时以及 DB/Redis 耗时
+    """
+
     def initialize(self, app: ASGIApp):
         pass
 
     async def before_request(self, request: RequestContext):
-        pass
+        if not access_logger.enabled:
+            return None
+        start_request_timings(request)
+        return None
 
     async def after_request(self, request: RequestContext, response_manager: ResponseManager):
-        pass
+        if not access_logger.enabled or REQUEST_TIMINGS_KEY not in request:
+            return
+        status_code = response_manager.status_code
+        duration = time.time() - request.start_time
+        if not access_logger.should_log(status_code, duration):
+            return
+        timings: RequestTimings = request[REQUEST_TIMINGS_KEY]
+        http_request = request.request
+        route = http_request.scope.get("route")
+        account = request.current_login_account
+        access_logger.log(
+            dict(
+                request_id=request.request_id,
+                tenant=request.tenant_code,
+                account_id=account.account_id if account is not None else None,
+                method=http_request.method,
+                path=http_request.url.path,
+                route=getattr(route, "path", None),
+                status=status_code,
+                duration_ms=round(duration * 1000, 3),
+                db_ms=round(timings.db_time * 1000, 3),
+                db_count=timings.db_count,
+                redis_ms=round(timings.redis_time * 1000, 3),
+                redis_count=timings.redis_count,
+                ip=request.real_ip,
+            ),
+            status_code,
+        )
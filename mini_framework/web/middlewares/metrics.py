@@ -0,0 +1,39 @@
+import time
+
+from starlette.types import ASGIApp
+
+from mini_framework.utils.metrics import request_db_sessions, request_db_statements, request_duration
+from mini_framework.utils.timing import REQUEST_TIMINGS_KEY, RequestTimings, start_request_timings
+from mini_framework.web.middlewares.base import MiddlewareBase, ResponseManager
+from mini_framework.web.request_context import RequestContext
+
+# 未匹配到路由的请求统一使用的标签，避免以原始路径作为标签
+_UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware(MiddlewareBase):
+    """
+    指标中间件
+    按路由模板、方法与状态码记录请求耗时，以及每个请求打开的 DB 会话数与执行的语句数
+    """
+
+    def initialize(self, app: ASGIApp):
+        pass
+
+    async def before_request(self, request: RequestContext):
+        start_request_timings(request)
+        return None
+
+    async def after_request(self, request: RequestContext, response_manager: ResponseManager):
+        http_request = request.request
+        route = getattr(http_request.scope.get("route"), "path", None) or _UNMATCHED_ROUTE
+        request_duration.observe(
+            time.time() - request.start_time,
+            http_request.method,
+            route,
+            str(response_manager.status_code),
+        )
+        timings: RequestTimings = request.get(REQUEST_TIMINGS_KEY)
+        if timings is not None:
+            request_db_sessions.observe(timings.db_sessions)
+            request_db_statements.observe(timings.db_statements)
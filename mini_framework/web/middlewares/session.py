@@ -0,0 +1,25 @@
+from starlette.types import ASGIApp
+
+from mini_framework.web.middlewares.base import MiddlewareBase, ResponseManager
+from mini_framework.web.request_context import RequestContext
+
+
+class SessionMiddleware(MiddlewareBase):
+    """
+    会话中间件
+    请求结束时将请求范围内会话的修改以一次管道往返写回 Redis，并刷新过期时间
+    """
+
+    def initialize(self, app: ASGIApp):
+        pass
+
+    async def before_request(self, request: RequestContext):
+        return None
+
+    async def after_request(self, request: RequestContext, response_manager: ResponseManager):
+        from mini_framework.web.session import pop_request_session
+
+        session = pop_request_session(request)
+        if session is None or not session.loaded:
+            return
+        await session.flush_async()
@@ -25,6 +25,16 @@ class ApplicationConfig:
         self.multi_tenant = app_settings.get("multi_tenant", False)
         self.server_id = app_settings.get("snowflake_service_id", None)
         self.worker_id = app_settings.get("snowflake_worker_id", None)
+        # 请求过程中间件模式: asgi(原生 ASGI) 或 base_http(BaseHTTPMiddleware)
+        self.middleware_mode = app_settings.get("middleware_mode", "asgi")
+        # 响应缓存存储: memory(进程内) 或 redis
+        self.response_cache_storage = app_settings.get("response_cache_storage", "memory")
+        self.response_cache_db_key = app_settings.get("response_cache_db_key", "response_cache")
+        self.response_cache_maxsize = app_settings.get("response_cache_maxsize", 1024)
+        # 会话过期时间（秒），请求访问会话后写回时刷新，0 表示不过期
+        self.session_ttl = app_settings.get("session_ttl", 0)
+        # 是否启用内置指标采集与 /metrics 接口，采集点的开关见 metrics_registry.enabled
+        self.metrics_enabled = app_settings.get("metrics_enabled", True)
 
 
 app_config = ApplicationConfig()
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Optional
+
+from pydantic import Field
+
+from mini_framework.design_patterns.singleton import singleton
+from mini_framework.utils.log import logger
+from mini_framework.web.std_models.base_model import BaseViewModel
+
+
+class ProfilerConfig(BaseViewModel):
+    """
+    请求采样分析配置，位于 profiler
+    """
+
+    enabled: bool = Field(False, title="Enabled", description="是否开启请求采样分析")
+    sample_rate: float = Field(0.0, title="Sample Rate", description="随机选取请求进行分析的比例")
+    slow_threshold: float = Field(
+        1.0, title="Slow Threshold", description="耗时超过该值（秒）的请求保留分析结果，0 表示不按耗时保留"
+    )
+    interval: float = Field(0.005, title="Interval", description="栈采样间隔（秒）")
+    max_depth: int = Field(128, title="Max Depth", description="单个栈保留的最大帧数")
+    buffer_size: int = Field(100, title="Buffer Size", description="内存中保留的分析结果数量")
+    dump_dir: str = Field(None, title="Dump Dir", description="分析结果写入的目录，为空时只保留在内存中")
+
+
+class RequestProfile(object):
+    """
+    单个请求的采样结果，以折叠栈（collapsed stack）格式保存，可直接用于生成火焰图
+    """
+
+    __slots__ = ("request_id", "method", "path", "started", "duration", "sampled", "samples", "stacks")
+
+    def __init__(self, request_id: str, method: str, path: str, sampled: bool):
+        self.request_id = request_id
+        self.method = method
+        self.path = path
+        self.started = time.time()
+        self.duration = 0.0
+        self.sampled = sampled
+        self.samples = 0
+        self.stacks: dict[str, int] = {}
+
+    def collapsed(self) -> str:
+        """
+        折叠栈文本，每行为以分号分隔的调用栈与采样次数
+        """
+        return "\n".join(f"{stack} {count}" for stack, count in sorted(self.stacks.items()))
+
+    def summary(self) -> dict:
+        return dict(
+            request_id=self.request_id,
+            method=self.method,
+            path=self.path,
+            started=self.started,
+            duration=self.duration,
+            sampled=self.sampled,
+            samples=self.samples,
+        )
+
+
+# 子任务（BaseHTTPMiddleware 模式下的路由处理）通过上下文找到所属请求
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+@singleton
+class SamplingProfiler(object):
+    """
+    请求采样分析器
+    后台线程按固定间隔读取事件循环线程的当前栈，并归属到正在运行的请求任务；
+    事件循环空闲时不记录，因此结果反映请求占用事件循环的时间。
+    按采样率选中的请求总是保留，其他请求只在超过耗时阈值时保留；未开启时中间件只判断一次 enabled。
+    """
+
+    def __init__(self):
+        from mini_framework.configurations import config_injection
+
+        manager = config_injection.get_config_manager()
+        self.__config = ProfilerConfig(**(manager.get_domain_config("profiler") or {}))
+        self.__profiles: deque[RequestProfile] = deque(maxlen=max(1, self.__config.buffer_size))
+        self.__active: dict[asyncio.Task, RequestProfile] = {}
+        self.__pending_dumps: list[RequestProfile] = []
+        self.__lock = threading.Lock()
+        self.__loop: Optional[asyncio.AbstractEventLoop] = None
+        self.__thread: Optional[threading.Thread] = None
+        self.__thread_id: Optional[int] = None
+        self.__stopped = threading.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return self.__config.enabled
+
+    def __ensure_started(self):
+        if self.__thread is not None:
+            return
+        self.__loop = asyncio.get_running_loop()
+        self.__thread_id = threading.get_ident()
+        self.__stopped.clear()
+        self.__thread = threading.Thread(target=self.__run, name="mini-request-profiler", daemon=True)
+        self.__thread.start()
+
+    def begin(self, request_id: str, method: str, path: str) -> Optional[RequestProfile]:
+        """
+        请求开始时调用，决定是否分析该请求
+        :param request_id: 请求 ID
+        :param method: 请求方法
+        :param path: 请求路径
+        :return: 不需要分析时返回 None
+        """
+        config = self.__config
+        sampled = config.sample_rate > 0 and random.random() < config.sample_rate
+        if not sampled and config.slow_threshold <= 0:
+            return None
+        task = asyncio.current_task()
+        if task is None:
+            return None
+        self.__ensure_started()
+        profile = RequestProfile(request_id, method, path, sampled)
+        _current_profile.set(profile)
+        with self.__lock:
+            self.__active[task] = profile
+        return profile
+
+    def end(self, profile: RequestProfile):
+        """
+        请求结束时调用，按采样标记或耗时阈值决定是否保留结果
+        :param profile: begin 返回的分析对象
+        """
+        profile.duration = time.time() - profile.started
+        task = asyncio.current_task()
+        with self.__lock:
+            self.__active.pop(task, None)
+        _current_profile.set(None)
+        threshold = self.__config.slow_threshold
+        if not profile.samples or not (profile.sampled or (0 < threshold <= profile.duration)):
+            return
+        with self.__lock:
+            self.__profiles.append(profile)
+            if self.__config.dump_dir:
+                self.__pending_dumps.append(profile)
+
+    def get(self, request_id: str) -> Optional[RequestProfile]:
+        with self.__lock:
+            for profile in self.__profiles:
+                if profile.request_id == request_id:
+                    return profile
+        return None
+
+    def profiles(self) -> list[RequestProfile]:
+        with self.__lock:
+            return list(self.__profiles)
+
+    def stop(self):
+        self.__stopped.set()
+        thread = self.__thread
+        if thread is not None:
+            thread.join(timeout=1)
+        self.__thread = None
+
+    def __find_profile(self) -> Optional[RequestProfile]:
+        task = asyncio.current_task(self.__loop)
+        if task is None:
+            return None
+        profile = self.__active.get(task)
+        if profile is None and hasattr(task, "get_context"):
+            profile = task.get_context().get(_current_profile)
+        return profile
+
+    def __collapse(self, frame) -> str:
+        frames = []
+        max_depth = self.__config.max_depth
+        while frame is not None and len(frames) < max_depth:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+            frame = frame.f_back
+        frames.reverse()
+        return ";".join(frames)
+
+    def __sample(self):
+        frame = sys._current_frames().get(self.__thread_id)
+        if frame is None:
+            return
+        with self.__lock:
+            if not self.__active:
+                return
+            profile = self.__find_profile()
+        if profile is None:
+            return
+        stack = self.__collapse(frame)
+        profile.stacks[stack] = profile.stacks.get(stack, 0) + 1
+        profile.samples += 1
+
+    def __dump(self):
+        with self.__lock:
+            pending, self.__pending_dumps = self.__pending_dumps, []
+        for profile in pending:
+            filename = os.path.join(self.__config.dump_dir, f"{profile.request_id}.folded")
+            try:
+                os.makedirs(self.__config.dump_dir, exist_ok=True)
+                with open(filename, "w", encoding="utf-8") as f:
+                    f.write(profile.collapsed())
+            except OSError as e:
+                logger.warning(f"Write request profile failed: {filename}, {e}")
+
+    def __run(self):
+        interval = self.__config.interval
+        while not self.__stopped.wait(interval):
+            try:
+                self.__sample()
+                if self.__pending_dumps:
+                    self.__dump()
+            except Exception as e:
+                logger.warning(f"Request profiler sample failed: {e}")
+
+
+sampling_profiler = SamplingProfiler()
+
+
+def list_profiles():
+    """
+    已保留的请求分析结果
+    """
+    return [profile.summary() for profile in sampling_profiler.profiles()]
+
+
+def get_profile(request_id: str):
+    """
+    获取请求的折叠栈
+    :param request_id: 请求 ID
+    """
+    from starlette.responses import PlainTextResponse
+
+    from mini_framework.web.std_models.errors import MiniHTTPException
+
+    profile = sampling_profiler.get(request_id)
+    if profile is None:
+        raise MiniHTTPException(404, "PROFILE_NOT_FOUND", f"profile {request_id} not found.", stack="")
+    return PlainTextResponse(profile.collapsed())
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import math
+import time
+from typing import Iterable
+
+from cachetools import LRUCache
+from pydantic import Field
+
+from mini_framework.design_patterns.singleton import singleton
+from mini_framework.utils.log import logger
+from mini_framework.web.middlewares.auth_index import ANY_METHOD, PrefixTrie, RouteTemplateTrie
+from mini_framework.web.std_models.base_model import BaseViewModel
+
+# 限流维度
+KEY_BY_ROUTE = "route"
+KEY_BY_TENANT = "tenant"
+KEY_BY_IP = "ip"
+
+# 令牌桶脚本：按时间补充令牌，令牌足够时扣减并返回 1，否则返回 0 与需要等待的毫秒数
+token_bucket_script = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local requested = tonumber(ARGV[4])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1])
+local ts = tonumber(bucket[2])
+if tokens == nil or ts == nil then
+    tokens = burst
+    ts = now
+end
+if now > ts then
+    tokens = math.min(burst, tokens + (now - ts) * rate / 1000)
+    ts = now
+end
+local allowed = 0
+local retry_after = 0
+if tokens >= requested then
+    tokens = tokens - requested
+    allowed = 1
+else
+    retry_after = math.ceil((requested - tokens) * 1000 / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(ts))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst * 1000 / rate) + 1000)
+return {allowed, retry_after}
+"""
+
+
+class RateLimitRule(BaseViewModel):
+    """
+    限流规则
+    """
+
+    name: str = Field(..., title="Name", description="规则名称，作为 Redis 键的一部分")
+    rate: float = Field(..., title="Rate", description="每秒补充的令牌数")
+    burst: int = Field(..., title="Burst", description="令牌桶容量，即允许的突发请求数")
+    key_by: list[str] = Field(
+        [KEY_BY_IP], title="Key By", description="限流维度组合: route(路由), tenant(租户), ip(客户端 IP)"
+    )
+    paths: list[str] = Field([], title="Paths", description="生效的路径前缀，为空时对所有路径生效")
+    methods: list[str] = Field([], title="Methods", description="生效的 HTTP 方法，为空时对所有方法生效")
+
+
+class RateLimitConfig(BaseViewModel):
+    """
+    限流配置
+    """
+
+    enabled: bool = Field(False, title="Enabled", description="是否开启限流")
+    db_key: str = Field("rate_limit", title="DB Key", description="令牌桶所在的 Redis 数据库 Key")
+    local_buckets: int = Field(
+        10000, title="Local Buckets", description="进程内预检令牌桶的最大数量，0 表示不做本地预检"
+    )
+    rules: list[RateLimitRule] = Field([], title="Rules", description="限流规则")
+
+
+def rate_limit(rate: float, burst: int, key_by: Iterable[str] = (KEY_BY_IP,), name: str | None = None):
+    """
+    为接口增加限流规则，接口的规则总是包含 route 维度
+    :param rate: 每秒补充的令牌数
+    :param burst: 令牌桶容量
+    :param key_by: 路由之外的限流维度
+    :param name: 规则名称，默认为函数的模块名与限定名
+    """
+
+    def decorator(func):
+        rule = RateLimitRule(
+            name=name or f"{func.__module__}.{func.__qualname__}",
+            rate=rate,
+            burst=burst,
+            key_by=[KEY_BY_ROUTE, *[key for key in key_by if key != KEY_BY_ROUTE]],
+        )
+        func.rate_limits = [*getattr(func, "rate_limits", []), rule]
+        return func
+
+    return decorator
+
+
+class _LocalBucket(object):
+    __slots__ = ("tokens", "timestamp")
+
+    def __init__(self, tokens: float, timestamp: float):
+        self.tokens = tokens
+        self.timestamp = timestamp
+
+
+class RateLimitDecision(object):
+    """
+    限流判定结果
+    """
+
+    __slots__ = ("allowed", "retry_after", "rule")
+
+    def __init__(self, allowed: bool, retry_after: int = 0, rule: RateLimitRule | None = None):
+        """
+        :param allowed: 是否放行
+        :param retry_after: 建议的重试等待时间（秒）
+        :param rule: 触发拒绝的规则
+        """
+        self.allowed = allowed
+        self.retry_after = retry_after
+        self.rule = rule
+
+
+_ALLOWED = RateLimitDecision(True)
+
+
+class _ConfiguredRule(object):
+    """
+    配置文件中的规则及其路径、方法过滤条件
+    """
+
+    __slots__ = ("rule", "paths", "methods")
+
+    def __init__(self, rule: RateLimitRule):
+        self.rule = rule
+        self.paths = PrefixTrie(rule.paths) if rule.paths else None
+        self.methods = {method.upper() for method in rule.methods}
+
+    def match(self, method: str, path: str) -> bool:
+        if self.methods and method not in self.methods:
+            return False
+        return self.paths is None or self.paths.match(path)
+
+
+@singleton
+class RateLimiter(object):
+    """
+    分布式令牌桶限流器
+    全局令牌桶由 Redis Lua 脚本原子维护；进程内另有同参数的预检令牌桶，只记录本进程放行的请求，
+    本地桶已空时全局桶必然不足，直接拒绝而不访问 Redis。Redis 不可用时放行（仅保留本地预检）。
+    """
+
+    def __init__(self):
+        from mini_framework.configurations import config_injection
+
+        manager = config_injection.get_config_manager()
+        self.__config = RateLimitConfig(**(manager.get_domain_config("rate_limit") or {}))
+        self.__rules = [_ConfiguredRule(rule) for rule in self.__config.rules]
+        self.__local: LRUCache | None = (
+            LRUCache(maxsize=self.__config.local_buckets) if self.__config.local_buckets > 0 else None
+        )
+        self.__routes: RouteTemplateTrie = RouteTemplateTrie()
+        self.__built = False
+        self.__prefix: str | None = None
+        self.__script = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.__config.enabled
+
+    @property
+    def built(self) -> bool:
+        return self.__built
+
+    def build(self, routes: Iterable):
+        """
+        构建路由索引，用于解析 route 维度的路由模板与接口自身的限流规则
+        :param routes: 应用路由列表
+        """
+        route_trie = RouteTemplateTrie()
+        for route in routes:
+            endpoint = getattr(route, "endpoint", None)
+            path = getattr(route, "path", None)
+            if endpoint is None or path is None:
+                continue
+            route_trie.add(
+                path,
+                getattr(route, "methods", None),
+                (path, tuple(getattr(endpoint, "rate_limits", ()))),
+                getattr(route, "path_regex", None),
+            )
+        self.__routes = route_trie
+        self.__built = True
+
+    def __resolve_route(self, method: str, path: str) -> tuple[str, tuple]:
+        methods = self.__routes.lookup(path)
+        if methods:
+            value = methods.get(method) or methods.get(ANY_METHOD)
+            if value is not None:
+                return value
+        return path, ()
+
+    def __key(self, rule: RateLimitRule, route: str, method: str, tenant_code: str | None, ip: str | None) -> str:
+        parts = [rule.name]
+        for key_by in rule.key_by:
+            if key_by == KEY_BY_ROUTE:
+                parts.append(f"{method} {route}")
+            elif key_by == KEY_BY_TENANT:
+                parts.append(tenant_code or "-")
+            elif key_by == KEY_BY_IP:
+                parts.append(ip or "-")
+        return ":".join(parts)
+
+    def __try_local(self, key: str, rule: RateLimitRule, now: float) -> int:
+        """
+        本地预检，返回 0 表示通过，否则为建议的重试等待时间（秒）
+        """
+        if self.__local is None:
+            return 0
+        bucket = self.__local.get(key)
+        if bucket is None:
+            bucket = _LocalBucket(rule.burst, now)
+            self.__local[key] = bucket
+        elif now > bucket.timestamp:
+            bucket.tokens = min(rule.burst, bucket.tokens + (now - bucket.timestamp) * rule.rate)
+            bucket.timestamp = now
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return 0
+        return max(1, math.ceil((1 - bucket.tokens) / rule.rate))
+
+    def __refund_local(self, key: str):
+        if self.__local is None:
+            return
+        bucket = self.__local.get(key)
+        if bucket is not None:
+            bucket.tokens += 1
+
+    def __redis_key(self, key: str) -> str:
+        if self.__prefix is None:
+            from mini_framework.cache.config import redis_config
+
+            db_config = redis_config.dbs.get(self.__config.db_key, None)
+            if not db_config:
+                raise ValueError(f"Redis db config not found: {self.__config.db_key}")
+            self.__prefix = f"{db_config.prefix}:rate_limit"
+        return f"{self.__prefix}:{key}"
+
+    async def __try_remote(self, key: str, rule: RateLimitRule) -> int:
+        """
+        全局令牌桶，返回 0 表示通过，否则为建议的重试等待时间（秒）
+        """
+        if self.__script is None:
+            from mini_framework.cache.manager import redis_client_manager
+
+            client = redis_client_manager.get_client_async(self.__config.db_key)
+            self.__script = client.register_script(token_bucket_script)
+        allowed, retry_after = await self.__script(
+            keys=[self.__redis_key(key)],
+            args=[rule.rate, rule.burst, int(time.time() * 1000), 1],
+        )
+        if int(allowed) == 1:
+            return 0
+        return max(1, math.ceil(int(retry_after) / 1000))
+
+    async def check(self, method: str, path: str, tenant_code: str | None, ip: str | None) -> RateLimitDecision:
+        """
+        判断请求是否放行
+        :param method: HTTP 方法
+        :param path: 请求路径
+        :param tenant_code: 租户编码
+        :param ip: 客户端 IP
+        """
+        if not self.enabled:
+            return _ALLOWED
+        route, route_rules = self.__resolve_route(method, path)
+        rules = [configured.rule for configured in self.__rules if configured.match(method, path)]
+        rules.extend(route_rules)
+        now = time.monotonic()
+        for rule in rules:
+            key = self.__key(rule, route, method, tenant_code, ip)
+            retry_after = self.__try_local(key, rule, now)
+            if retry_after:
+                return RateLimitDecision(False, retry_after, rule)
+            try:
+                retry_after = await self.__try_remote(key, rule)
+            except Exception as e:
+                logger.warning(f"Rate limit check failed, request allowed: {e}")
+                continue
+            if retry_after:
+                # 本地桶只记录全局放行的请求，被全局拒绝的请求归还本地令牌
+                self.__refund_local(key)
+                return RateLimitDecision(False, retry_after, rule)
+        return _ALLOWED
+
+
+rate_limiter = RateLimiter()
@@ -1,6 +1,6 @@
 import time
 from contextvars import ContextVar
-from typing import Dict, Optional, Any
+from typing import Optional, Any
 
 import shortuuid
 from fastapi.requests import Request
@@ -13,48 +13,124 @@ from mini_framework.web.std_models.account import RenderAccount, AccountInfo
 current_request_id: ContextVar[Optional[str]] = ContextVar(
     "current_request_id", default=None
 )
+current_request_context: ContextVar[Optional["RequestContext"]] = ContextVar(
+    "current_request_context", default=None
+)
+
+
+_UNSET = object()
 
 
 class RequestContext:
+    # 常用字段使用固定槽位，其余键值存放在按需创建的字典中
+    __slots__ = (
+        "__request",
+        "__request_id",
+        "__session_id",
+        "__start_time",
+        "__end_time",
+        "__token",
+        "__tenant_code",
+        "__current_user",
+        "__extra",
+    )
+
+    # 键名与槽位属性的对应关系，保持以 request["key"] 访问的兼容性
+    __fields = {
+        "request_id": "_RequestContext__request_id",
+        "session_id": "_RequestContext__session_id",
+        "start_time": "_RequestContext__start_time",
+        "end_time": "_RequestContext__end_time",
+        "token": "_RequestContext__token",
+        "tenant_code": "_RequestContext__tenant_code",
+        "current_user": "_RequestContext__current_user",
+    }
+
     def __init__(self, request: Request, request_id: str):
         """
         Web 请求上下文
         :param request: Web 请求对象
         """
         self.__request: Request = request
-        self.__data: dict[str, Any] = {"request_id": request_id}
+        self.__request_id = request_id
+        self.__session_id = _UNSET
+        self.__start_time = _UNSET
+        self.__end_time = _UNSET
+        self.__token = _UNSET
+        self.__tenant_code = _UNSET
+        self.__current_user = _UNSET
+        self.__extra: Optional[dict[str, Any]] = None
+
+    def __items(self):
+        for key, attr in self.__fields.items():
+            value = getattr(self, attr)
+            if value is not _UNSET:
+                yield key, value
+        if self.__extra:
+            yield from self.__extra.items()
 
     def __getitem__(self, key):
-        return self.__data[key]
+        attr = self.__fields.get(key)
+        if attr is None:
+            if self.__extra is None:
+                raise KeyError(key)
+            return self.__extra[key]
+        value = getattr(self, attr)
+        if value is _UNSET:
+            raise KeyError(key)
+        return value
 
     def __setitem__(self, key, value):
-        self.__data[key] = value
+        attr = self.__fields.get(key)
+        if attr is not None:
+            setattr(self, attr, value)
+            return
+        if self.__extra is None:
+            self.__extra = {}
+        self.__extra[key] = value
 
     def __contains__(self, key):
-        return key in self.__data
+        attr = self.__fields.get(key)
+        if attr is not None:
+            return getattr(self, attr) is not _UNSET
+        return self.__extra is not None and key in self.__extra
 
     def __delitem__(self, key):
-        del self.__data[key]
+        attr = self.__fields.get(key)
+        if attr is not None:
+            if getattr(self, attr) is _UNSET:
+                raise KeyError(key)
+            setattr(self, attr, _UNSET)
+            return
+        if self.__extra is None:
+            raise KeyError(key)
+        del self.__extra[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
 
     def __iter__(self):
-        return iter(self.__data)
+        return (key for key, _ in self.__items())
 
     def __len__(self):
-        return len(self.__data)
+        return sum(1 for _ in self.__items())
 
     def __repr__(self):
-        return repr(self.__data)
+        return repr(dict(self.__items()))
 
     def __str__(self):
-        return str(self.__data)
+        return str(dict(self.__items()))
 
     @property
     def start_time(self) -> float:
-        return self.__data["start_time"]
+        return self["start_time"]
 
     @start_time.setter
     def start_time(self, value: float):
-        self.__data["start_time"] = value
+        self.__start_time = value
 
     @property
     def url(self) -> URL:
@@ -62,35 +138,35 @@ class RequestContext:
 
     @property
     def request_id(self):
-        return self.__data["request_id"]
+        return self.__request_id
 
     @request_id.setter
     def request_id(self, value):
-        self.__data["request_id"] = value
+        self.__request_id = value
 
     @property
     def session_id(self):
-        return self.__data["session_id"]
+        return self["session_id"]
 
     @session_id.setter
     def session_id(self, value):
-        self.__data["session_id"] = value
+        self.__session_id = value
 
     @property
     def token(self) -> str:
-        return self.__data.get("token", "")
+        return self.get("token", "")
 
     @token.setter
     def token(self, value: str):
-        self.__data["token"] = value
+        self.__token = value
 
     @property
     def end_time(self) -> float:
-        return self.__data.get("end_time", 0)
+        return self.get("end_time", 0)
 
     @end_time.setter
     def end_time(self, value: float):
-        self.__data["end_time"] = value
+        self.__end_time = value
 
     @property
     def duration(self) -> float:
@@ -98,7 +174,7 @@ class RequestContext:
 
     @property
     def tenant_code(self):
-        return self.__data.get("tenant_code")
+        return self.get("tenant_code")
 
     @property
     def request(self):
@@ -106,12 +182,12 @@ class RequestContext:
 
     @property
     def current_login_account(self) -> RenderAccount:
-        account_info = self.__data.get("current_user")
+        account_info = self.get("current_user")
         return account_info
 
     @current_login_account.setter
     def current_login_account(self, value: RenderAccount):
-        self.__data["current_user"] = value
+        self.__current_user = value
 
     async def get_full_account_info(self) -> AccountInfo:
         current_login_account = self.current_login_account
@@ -153,23 +229,39 @@ class RequestContext:
         return client_ip
 
 
+# ASGI scope 中保存请求上下文的键
+_SCOPE_KEY = "mini.request_context"
+
+
 @singleton
 class RequestContextManager:
     def __init__(self):
         """
         Web 请求上下文管理器
+        上下文只保存在 ContextVar 中，随请求任务的上下文一起释放，不维护全局注册表
         """
-        self.request_contexts: Dict[str, RequestContext] = {}
 
     def get(self, request: Request):
-        if not current_request_id.get():
+        request_context = current_request_context.get()
+        if request_context is None:
+            # 异常处理器在最外层的 ServerErrorMiddleware 中执行，此时 ContextVar 已清除，从 ASGI scope 取回原上下文
+            request_context = request.scope.get(_SCOPE_KEY)
+        if request_context is None:
             request_context = self.__create(request)
-        else:
-            request_context = self.request_contexts[current_request_id.get()]
         return request_context
 
-    def remove(self, request_id: str):
-        self.request_contexts.pop(request_id, None)
+    def remove(self, request_id: Optional[str] = None):
+        """
+        清除当前请求上下文
+        :param request_id: 兼容旧接口，只在与当前上下文一致时清除
+        """
+        request_context = current_request_context.get()
+        if request_context is None:
+            return
+        if request_id is not None and request_context.request_id != request_id:
+            return
+        current_request_context.set(None)
+        current_request_id.set(None)
 
     def __create(self, request: Request):
         request_id = shortuuid.uuid()
@@ -184,16 +276,18 @@ class RequestContextManager:
         request_context.session_id = session_id
 
         request_context.start_time = time.time()
-        self.request_contexts[request_id] = request_context
+        # scope 随请求释放，异常响应仍能使用同一个请求 ID、开始时间、会话 ID 与令牌
+        request.scope[_SCOPE_KEY] = request_context
+        current_request_context.set(request_context)
+        current_request_id.set(request_id)
         return request_context
 
-    def current(self) -> RequestContext:
+    def current(self) -> Optional[RequestContext]:
         """
         获取当前请求上下文
         :return: 请求上下文
         """
-        request_id = current_request_id.get()
-        return self.request_contexts.get(request_id)
+        return current_request_context.get()
 
 
 request_context_manager = RequestContextManager()
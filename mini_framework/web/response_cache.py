@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import time
+from abc import ABC, abstractmethod
+from typing import Iterable
+from urllib.parse import parse_qsl, urlencode
+
+from cachetools import TLRUCache
+
+from mini_framework.design_patterns.singleton import singleton
+from mini_framework.utils.json import JsonUtils
+from mini_framework.web.middlewares.auth_index import ANY_METHOD, RouteTemplateTrie
+
+# 不随缓存保存的响应头，x-request-* 与 Authorization 在每次响应时重新注入
+_EXCLUDED_HEADERS = {
+    "content-length",
+    "date",
+    "server",
+    "connection",
+    "keep-alive",
+    "transfer-encoding",
+    "authorization",
+    "set-cookie",
+}
+
+
+class ResponseCachePolicy(object):
+    """
+    响应缓存策略
+    """
+
+    __slots__ = ("ttl", "vary_account", "cache_control")
+
+    def __init__(self, ttl: int = 60, vary_account: bool = False, cache_control: str | None = None):
+        """
+        :param ttl: 缓存时间（秒）
+        :param vary_account: 缓存键是否包含当前登录账号，返回内容因账号而异时必须开启
+        :param cache_control: 响应的 Cache-Control 头，默认为 private, max-age={ttl}
+        """
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+        self.ttl = ttl
+        self.vary_account = vary_account
+        self.cache_control = cache_control or f"private, max-age={ttl}"
+
+
+def cache_response(ttl: int = 60, vary_account: bool = False, cache_control: str | None = None):
+    """
+    为 GET 接口开启响应缓存，可用于路由函数与视图方法
+    :param ttl: 缓存时间（秒）
+    :param vary_account: 缓存键是否包含当前登录账号
+    :param cache_control: 响应的 Cache-Control 头
+    """
+    policy = ResponseCachePolicy(ttl, vary_account, cache_control)
+
+    def decorator(func):
+        func.response_cache = policy
+        return func
+
+    return decorator
+
+
+class CachedResponse(object):
+    """
+    已缓存的响应
+    """
+
+    __slots__ = ("status_code", "headers", "body", "etag", "created_at", "ttl")
+
+    def __init__(
+        self,
+        status_code: int,
+        headers: list[tuple[str, str]],
+        body: bytes,
+        etag: str,
+        created_at: float,
+        ttl: int,
+    ):
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+        self.etag = etag
+        self.created_at = created_at
+        self.ttl = ttl
+
+    @property
+    def expires_at(self) -> float:
+        return self.created_at + self.ttl
+
+    @property
+    def age(self) -> int:
+        return max(0, int(time.time() - self.created_at))
+
+    def to_dict(self) -> dict:
+        return dict(
+            status_code=self.status_code,
+            headers=self.headers,
+            body=base64.b64encode(self.body).decode("ascii"),
+            etag=self.etag,
+            created_at=self.created_at,
+            ttl=self.ttl,
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> CachedResponse:
+        return cls(
+            status_code=data["status_code"],
+            headers=[tuple(header) for header in data["headers"]],
+            body=base64.b64decode(data["body"]),
+            etag=data["etag"],
+            created_at=data["created_at"],
+            ttl=data["ttl"],
+        )
+
+
+def make_etag(body: bytes) -> str:
+    """
+    根据响应体生成强 ETag
+    :param body: 响应体
+    """
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    判断 If-None-Match 是否与 ETag 匹配，按弱比较处理
+    :param if_none_match: If-None-Match 请求头
+    :param etag: ETag
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    etag = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        if candidate.strip().removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def filter_cacheable_headers(raw_headers: Iterable[tuple[bytes, bytes]]) -> list[tuple[str, str]]:
+    """
+    过滤出可以随缓存保存的响应头
+    :param raw_headers: ASGI 响应头
+    """
+    headers = []
+    for name, value in raw_headers:
+        name = name.decode("latin-1").lower()
+        if name in _EXCLUDED_HEADERS or name.startswith("x-request-"):
+            continue
+        headers.append((name, value.decode("latin-1")))
+    return headers
+
+
+def make_cache_key(
+    method: str,
+    path: str,
+    query_string: str,
+    tenant_code: str | None,
+    account_id: str | None,
+) -> str:
+    """
+    生成响应缓存键，查询参数按名称排序，参数顺序不同的相同请求共享缓存
+    """
+    query = urlencode(sorted(parse_qsl(query_string, keep_blank_values=True)))
+    raw = "\n".join([method, path, query, tenant_code or "", account_id or ""])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCacheStorage(ABC):
+    """
+    响应缓存存储
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> CachedResponse | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(self, key: str, response: CachedResponse):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, key: str):
+        raise NotImplementedError
+
+
+class MemoryResponseCacheStorage(ResponseCacheStorage):
+    """
+    进程内响应缓存，各进程独立
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.__cache: TLRUCache = TLRUCache(
+            maxsize=maxsize, ttu=lambda key, value, now: value.expires_at, timer=time.time
+        )
+
+    async def get(self, key: str) -> CachedResponse | None:
+        return self.__cache.get(key)
+
+    async def set(self, key: str, response: CachedResponse):
+        self.__cache[key] = response
+
+    async def delete(self, key: str):
+        self.__cache.pop(key, None)
+
+
+class RedisResponseCacheStorage(ResponseCacheStorage):
+    """
+    Redis 响应缓存，各进程共享
+    """
+
+    def __init__(self, db_key: str):
+        """
+        :param db_key: Redis 数据库 Key，键以该库配置的 prefix 为前缀
+        """
+        from mini_framework.cache.config import redis_config
+
+        db_config = redis_config.dbs.get(db_key, None)
+        if not db_config:
+            raise ValueError(f"Redis db config not found: {db_key}")
+        self.__db_key = db_key
+        self.__prefix = f"{db_config.prefix}:response_cache"
+
+    def __client(self):
+        from mini_framework.cache.manager import redis_client_manager
+
+        return redis_client_manager.get_client_async(self.__db_key)
+
+    async def get(self, key: str) -> CachedResponse | None:
+        data = await self.__client().get(f"{self.__prefix}:{key}")
+        if data is None:
+            return None
+        return CachedResponse.from_dict(JsonUtils.json_str_to_dict(data))
+
+    async def set(self, key: str, response: CachedResponse):
+        await self.__client().set(
+            f"{self.__prefix}:{key}",
+            JsonUtils.dict_to_json_str(response.to_dict(), separators=(",", ":")),
+            ex=response.ttl,
+        )
+
+    async def delete(self, key: str):
+        await self.__client().delete(f"{self.__prefix}:{key}")
+
+
+def create_response_cache_storage() -> ResponseCacheStorage:
+    """
+    根据 web_server 配置创建响应缓存存储
+    """
+    from mini_framework.web.mini_app import app_config
+
+    if app_config.response_cache_storage == "redis":
+        return RedisResponseCacheStorage(app_config.response_cache_db_key)
+    if app_config.response_cache_storage == "memory":
+        return MemoryResponseCacheStorage(app_config.response_cache_maxsize)
+    raise ValueError(f"Unknown response cache storage: {app_config.response_cache_storage}")
+
+
+@singleton
+class ResponseCacheIndex(object):
+    """
+    路由响应缓存策略索引，在应用初始化时构建
+    """
+
+    def __init__(self):
+        self.__routes: RouteTemplateTrie = RouteTemplateTrie()
+        self.__built = False
+        self.__enabled = False
+
+    @property
+    def built(self) -> bool:
+        return self.__built
+
+    def build(self, routes: Iterable):
+        """
+        构建索引
+        :param routes: 应用路由列表
+        """
+        route_trie = RouteTemplateTrie()
+        enabled = False
+        for route in routes:
+            endpoint = getattr(route, "endpoint", None)
+            path = getattr(route, "path", None)
+            if endpoint is None or path is None:
+                continue
+            policy = getattr(endpoint, "response_cache", None)
+            methods = getattr(route, "methods", None)
+            # 只缓存 GET，其他方法登记为 None 以免参数段误匹配
+            if policy is not None and methods and "GET" not in methods:
+                policy = None
+            enabled = enabled or policy is not None
+            route_trie.add(path, methods, policy, getattr(route, "path_regex", None))
+        self.__routes = route_trie
+        self.__enabled = enabled
+        self.__built = True
+
+    def lookup(self, method: str, path: str) -> ResponseCachePolicy | None:
+        """
+        获取请求对应的缓存策略
+        :param method: HTTP 方法
+        :param path: 请求路径
+        :return: 缓存策略，不缓存时返回 None
+        """
+        if not self.__enabled or method != "GET":
+            return None
+        methods = self.__routes.lookup(path)
+        if not methods:
+            return None
+        policy = methods.get(method)
+        if policy is None:
+            policy = methods.get(ANY_METHOD)
+        return policy
+
+
+response_cache_index = ResponseCacheIndex()
@@ -0,0 +1,70 @@
+import json
+from datetime import date, datetime
+from typing import Any
+
+from pydantic import BaseModel
+from pydantic_core import PydanticSerializationError
+from starlette.responses import JSONResponse
+
+from mini_framework.web.std_models.base_model import json_datetime_encoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 为可选依赖
+    orjson = None
+
+
+def _default(value: Any):
+    """
+    标准库与 orjson 无法直接序列化的对象
+    日期时间保持 json_datetime_encoder 的格式，其余对象交给 FastAPI 的 jsonable_encoder
+    """
+    if isinstance(value, (datetime, date)):
+        return json_datetime_encoder(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", by_alias=True)
+    from fastapi.encoders import jsonable_encoder
+
+    return jsonable_encoder(value)
+
+
+def dumps_json(content: Any) -> bytes:
+    """
+    将内容序列化为 JSON 字节串
+    pydantic 模型由 pydantic-core 直接输出字节，其他内容优先使用 orjson
+    :param content: 序列化内容
+    :return: UTF-8 编码的 JSON
+    """
+    if isinstance(content, BaseModel):
+        try:
+            # 与 FastAPI 序列化 response_model 一致，按别名输出
+            return content.__pydantic_serializer__.to_json(content, by_alias=True)
+        except PydanticSerializationError:
+            # 模型中包含 pydantic 无法推断的任意对象，交给 jsonable_encoder 转换后再序列化
+            from fastapi.encoders import jsonable_encoder
+
+            content = jsonable_encoder(content)
+    if orjson is not None:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+        default=_default,
+    ).encode("utf-8")
+
+
+class MiniJSONResponse(JSONResponse):
+    """
+    框架默认的 JSON 响应
+    BaseViewModel 通过 model_dump_json 一次输出字节，字典与列表使用 orjson，未安装 orjson 时回退到标准库
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
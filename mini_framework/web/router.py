@@ -1,9 +1,13 @@
+from __future__ import annotations
+
+import sys
 from datetime import datetime
 from typing import Type, List, Callable
 
 from fastapi import APIRouter
 
 from mini_framework.design_patterns.singleton import singleton
+from mini_framework.web.response_cache import ResponseCachePolicy
 from mini_framework.web.std_models.base_model import BaseViewModel
 from mini_framework.web.views import BaseView
 
@@ -21,16 +25,52 @@ def health_check():
     )
 
 
+async def readiness_check():
+    """
+    检查已创建的 Redis 客户端与数据库从库，任一检查失败时返回 503
+    检查失败的 Redis 客户端会被重建，失败的从库会被摘除
+    """
+    from mini_framework.web.responses import MiniJSONResponse
+
+    checks = {}
+    # 只检查进程中已使用的组件
+    if "mini_framework.cache.manager" in sys.modules:
+        from mini_framework.cache.manager import redis_client_manager
+
+        checks["redis"] = await redis_client_manager.health_check()
+    if "mini_framework.databases.conn_managers.db_manager" in sys.modules:
+        from mini_framework.databases.conn_managers.db_manager import db_connection_manager
+
+        checks["databases"] = await db_connection_manager.health_check()
+    healthy = all(checks.get("redis", {}).values()) and all(
+        all(replicas.values()) for replicas in checks.get("databases", {}).values()
+    )
+    return MiniJSONResponse(dict(healthy=healthy, checks=checks), status_code=200 if healthy else 503)
+
+
 class Router:
-    def __init__(self, require_auth: bool = True):
+    def __init__(self, require_auth: bool = True, response_cache: ResponseCachePolicy = None):
+        """
+        :param require_auth: 路由是否需要认证
+        :param response_cache: 路由下 GET 接口的默认响应缓存策略，接口自身的 cache_response 优先
+        """
         self._root_router = APIRouter()
         self.__need_login = require_auth
+        self.__response_cache = response_cache
         self._routers: List[Router] = []
 
     @property
     def require_auth(self):
         return self.__need_login
 
+    @property
+    def response_cache(self) -> ResponseCachePolicy | None:
+        return self.__response_cache
+
+    def __apply_response_cache(self, endpoint: Callable):
+        if self.__response_cache is not None and getattr(endpoint, "response_cache", None) is None:
+            endpoint.response_cache = self.__response_cache
+
     def set_root_prefix(self, prefix):
         self._root_router.prefix = prefix
 
@@ -50,6 +90,7 @@ class Router:
         show_in_doc: bool = True,
     ):
         func.require_auth = self.require_auth
+        self.__apply_response_cache(func)
         self._root_router.add_api_route(
             path,
             func,
@@ -77,6 +118,7 @@ class Router:
         )
         for sub_router in sub_routers:
             sub_router["endpoint"].require_auth = self.require_auth
+            self.__apply_response_cache(sub_router["endpoint"])
             if sub_api_router:
                 sub_api_router.add_api_route(**sub_router)
             else:
@@ -119,6 +161,29 @@ class RootRouter(Router):
 
         health_router = Router(require_auth=False)
         health_router.register_func_router(health_check, "/health", ["GET"])
+        health_router.register_func_router(readiness_check, "/health/ready", ["GET"])
+        from mini_framework.web.mini_app import app_config
+
+        if app_config.metrics_enabled:
+            from mini_framework.web.metrics import metrics_endpoint
+
+            health_router.register_func_router(
+                metrics_endpoint, "/metrics", ["GET"], show_in_doc=False
+            )
+
+        from mini_framework.web.profiler import sampling_profiler
+
+        if sampling_profiler.enabled:
+            from mini_framework.web.profiler import list_profiles, get_profile
+
+            profile_router = Router()
+            profile_router.register_func_router(
+                list_profiles, "/debug/profiles", ["GET"], show_in_doc=False
+            )
+            profile_router.register_func_router(
+                get_profile, "/debug/profiles/{request_id}", ["GET"], show_in_doc=False
+            )
+            self.include_router(profile_router)
 
         doc_router = Router(require_auth=False)
         from mini_framework.web.api_doc_manager import docs, redoc
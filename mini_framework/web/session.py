@@ -1,25 +1,209 @@
+from __future__ import annotations
+
+from typing import Optional
+
 from mini_framework.cache.manager import redis_client_manager
 
+SESSION_DB_KEY = "session"
+# 请求上下文中保存会话对象的键
+_REQUEST_SESSION_KEY = "session"
+
 
 class Session(object):
-    def __init__(self, unique_key: str):
-        self.__session_cache = redis_client_manager.get_client("session")
+    def __init__(self, unique_key: str, buffered: bool = False, ttl: int = 0):
+        """
+        会话
+        首次访问时以 HGETALL 加载整个哈希，之后的读取都来自内存
+        :param unique_key: 会话 ID
+        :param buffered: 是否缓冲写入，为 True 时修改只记录在内存中，由 flush 一次性写回；
+                         为 False 时与之前一样每次修改立即写入 Redis
+        :param ttl: 写回时刷新的过期时间（秒），0 表示不设置
+        """
         self.__unique_key = unique_key
+        self.__buffered = buffered
+        self.__ttl = ttl
+        self.__data: Optional[dict] = None
+        self.__dirty: set = set()
+        self.__deleted: set = set()
+
+    @property
+    def unique_key(self) -> str:
+        return self.__unique_key
+
+    @property
+    def loaded(self) -> bool:
+        return self.__data is not None
+
+    @property
+    def modified(self) -> bool:
+        return bool(self.__dirty or self.__deleted)
+
+    def load(self) -> dict:
+        """
+        加载会话数据，已加载时直接返回
+        :return: 会话数据
+        """
+        if self.__data is None:
+            client = redis_client_manager.get_client(SESSION_DB_KEY)
+            self.__data = dict(client.hget_all(self.__unique_key) or {})
+        return self.__data
+
+    async def load_async(self) -> dict:
+        """
+        异步加载会话数据，已加载时直接返回
+        :return: 会话数据
+        """
+        if self.__data is None:
+            client = redis_client_manager.get_client_async(SESSION_DB_KEY)
+            data = dict(await client.hget_all(self.__unique_key) or {})
+            # 等待期间可能已被同步加载
+            if self.__data is None:
+                self.__data = data
+        return self.__data
+
+    def get(self, key, default=None):
+        return self.load().get(key, default)
+
+    async def aget(self, key, default=None):
+        """
+        异步读取
+        :param key: 键
+        :param default: 不存在时的默认值
+        """
+        return (await self.load_async()).get(key, default)
+
+    async def aset(self, key, value):
+        """
+        异步写入，非缓冲模式下立即写入 Redis
+        :param key: 键
+        :param value: 值
+        """
+        if not self.__buffered:
+            await redis_client_manager.get_client_async(SESSION_DB_KEY).hset(self.__unique_key, key, value)
+            self.__update_loaded(key, value)
+            return
+        await self.load_async()
+        self.__set(key, value)
+
+    async def adelete(self, key):
+        """
+        异步删除，非缓冲模式下立即写入 Redis
+        :param key: 键
+        """
+        if not self.__buffered:
+            await redis_client_manager.get_client_async(SESSION_DB_KEY).hdel(self.__unique_key, key)
+            self.__remove_loaded(key)
+            return
+        await self.load_async()
+        self.__delete(key)
+
+    def __update_loaded(self, key, value):
+        if self.__data is not None:
+            self.__data[key] = value
+
+    def __remove_loaded(self, key):
+        if self.__data is not None:
+            self.__data.pop(key, None)
+
+    def __set(self, key, value):
+        self.__data[key] = value
+        self.__dirty.add(key)
+        self.__deleted.discard(key)
+
+    def __delete(self, key):
+        self.__data.pop(key, None)
+        self.__deleted.add(key)
+        self.__dirty.discard(key)
 
     def __setitem__(self, key, value):
-        self.__session_cache.hset(self.__unique_key, key, value)
+        if not self.__buffered:
+            redis_client_manager.get_client(SESSION_DB_KEY).hset(self.__unique_key, key, value)
+            self.__update_loaded(key, value)
+            return
+        self.load()
+        self.__set(key, value)
 
     def __getitem__(self, key):
-        return self.__session_cache.hget(self.__unique_key, key)
+        return self.load().get(key)
 
     def __delitem__(self, key):
-        self.__session_cache.hdel(self.__unique_key, key)
+        if not self.__buffered:
+            redis_client_manager.get_client(SESSION_DB_KEY).hdel(self.__unique_key, key)
+            self.__remove_loaded(key)
+            return
+        self.load()
+        self.__delete(key)
 
     def __contains__(self, key):
-        return self.__session_cache.hexists(self.__unique_key, key)
+        return key in self.load()
 
     def __iter__(self):
-        return iter(self.__session_cache.hkeys(self.__unique_key))
+        return iter(list(self.load()))
 
     def __len__(self):
-        return self.__session_cache.hlen(self.__unique_key)
+        return len(self.load())
+
+    def __enqueue(self, pipe):
+        """
+        将修改与过期时间刷新写入管道
+        """
+        if self.__dirty:
+            pipe.hmset(self.__unique_key, {key: self.__data[key] for key in self.__dirty})
+        if self.__deleted:
+            pipe.hdel(self.__unique_key, *self.__deleted)
+        if self.__ttl and (self.__dirty or self.__deleted or self.__data):
+            pipe.expire(self.__unique_key, self.__ttl)
+
+    def __clear_changes(self):
+        self.__dirty = set()
+        self.__deleted = set()
+
+    def flush(self):
+        """
+        以一次管道往返写回修改并刷新过期时间，未加载过的会话不做任何操作
+        """
+        if self.__data is None:
+            return
+        client = redis_client_manager.get_client(SESSION_DB_KEY)
+        with client.pipeline(transaction=False) as pipe:
+            self.__enqueue(pipe)
+        self.__clear_changes()
+
+    async def flush_async(self):
+        """
+        异步写回修改并刷新过期时间，未加载过的会话不做任何操作
+        """
+        if self.__data is None:
+            return
+        client = redis_client_manager.get_client_async(SESSION_DB_KEY)
+        async with client.pipeline(transaction=False) as pipe:
+            self.__enqueue(pipe)
+        self.__clear_changes()
+
+
+def get_request_session(request_context) -> Optional[Session]:
+    """
+    获取请求范围内的会话，同一请求内复用同一个对象，修改在请求结束时由 SessionMiddleware 写回
+    :param request_context: 请求上下文
+    :return: 没有请求上下文时返回 None
+    """
+    if request_context is None:
+        return None
+    session = request_context.get(_REQUEST_SESSION_KEY)
+    if session is None:
+        from mini_framework.web.mini_app import app_config
+
+        session = Session(request_context.session_id, buffered=True, ttl=app_config.session_ttl)
+        request_context[_REQUEST_SESSION_KEY] = session
+    return session
+
+
+def pop_request_session(request_context) -> Optional[Session]:
+    """
+    取出请求范围内的会话
+    :param request_context: 请求上下文
+    """
+    session = request_context.get(_REQUEST_SESSION_KEY)
+    if session is not None:
+        del request_context[_REQUEST_SESSION_KEY]
+    return session
@@ -1,11 +1,12 @@
+import sys
 import traceback
 from typing import Optional, Dict, Any, Union
 
 from fastapi import HTTPException
-from fastapi.encoders import jsonable_encoder
 from pydantic import Field, ValidationError
-from starlette.responses import JSONResponse
 
+from mini_framework.context import env
+from mini_framework.web.responses import MiniJSONResponse
 from mini_framework.web.std_models.base_model import BaseViewModel
 
 
@@ -18,6 +19,9 @@ class ErrorResponse(BaseViewModel):
 
 
 class MiniHTTPException(HTTPException):
+    # 预期内的错误（如未登录、资源不存在）可设为 False，不保留异常现场也不生成堆栈
+    capture_stack: bool = True
+
     def __init__(self, status_code: int, error_code: str, detail: str, user_message: Optional[str] = None,
                  details: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None,
                  stack: Optional[str] = None):
@@ -29,20 +33,41 @@ class MiniHTTPException(HTTPException):
         :param user_message: 用户友好的错误消息
         :param details: 详细的错误信息
         :param headers: HTTP headers
-        :param stack: 错误堆栈信息
+        :param stack: 错误堆栈信息，为 None 时记录正在处理的异常，在读取 stack 时才格式化
         """
         if headers is None:
             headers = {}
         super().__init__(status_code=status_code, detail=detail, headers=headers)
-        if stack is not None:
-            self.stack = stack
-        else:
-            self.stack = traceback.format_exc()
+        self.__stack = stack
+        self.__cause: Optional[BaseException] = None
+        if stack is None and self.capture_stack:
+            self.__cause = sys.exc_info()[1]
 
         self.error_code = error_code
         self.user_message = user_message
         self.details = details
 
+    @property
+    def stack(self) -> Optional[str]:
+        """
+        错误堆栈信息，首次读取时格式化
+        """
+        if self.__stack is None and self.__cause is not None:
+            cause = self.__cause
+            self.__stack = "".join(traceback.format_exception(type(cause), cause, cause.__traceback__))
+            self.__cause = None
+        return self.__stack
+
+    @stack.setter
+    def stack(self, value: Optional[str]):
+        self.__stack = value
+        self.__cause = None
+
+    def __with_cause(self, cause: BaseException):
+        self.__stack = None
+        self.__cause = cause
+        return self
+
     @staticmethod
     def from_http_exception(error: HTTPException, headers: Optional[Dict[str, str]] = None):
         if headers is None:
@@ -53,10 +78,9 @@ class MiniHTTPException(HTTPException):
             error.status_code,
             error_code=error_code,
             detail=error.detail,
-            stack=traceback.format_exc(),
             details=None,
             headers=headers
-        )
+        ).__with_cause(error)
 
     @staticmethod
     def from_exception(e: Exception, headers: Optional[Dict[str, str]] = None):
@@ -64,10 +88,9 @@ class MiniHTTPException(HTTPException):
             status_code=500,
             error_code="500",
             detail=str(e),
-            stack=traceback.format_exc(),
             user_message="服务器内部错误",
             headers=headers
-        )
+        ).__with_cause(e)
 
     @staticmethod
     def from_validation_error(exc: ValidationError):
@@ -78,8 +101,7 @@ class MiniHTTPException(HTTPException):
             detail="输入验证失败",
             user_message="输入信息中有一些无效的值",
             details={"fields": errors},
-            stack=traceback.format_exc()
-        )
+        ).__with_cause(exc)
 
     def response(self, headers: Optional[Dict[str, str]] = None):
         if headers is None:
@@ -89,11 +111,11 @@ class MiniHTTPException(HTTPException):
             error_code=self.error_code,
             message=self.detail,
             user_message=self.user_message,
-            details=self.details
+            details=self.details,
+            stack=self.stack if env.debug else None,
         )
-        err_resp_detail = jsonable_encoder(err_resp)
-        return JSONResponse(
-            content=err_resp_detail,
+        return MiniJSONResponse(
+            content=err_resp,
             status_code=self.status_code,
             headers=headers
         )
@@ -1,11 +1,11 @@
-from typing import List, Type, TypeVar, Generic
+from typing import List, Literal, Optional, Type, TypeVar, Generic
 
 from fastapi import Query
-from pydantic import Field
+from pydantic import Field, field_validator
 
 from .base_model import BaseViewModel
 from ..toolkit.model_utilities import orm_model_to_view_model
-from ...databases.queries.pages import Paging
+from ...databases.queries.pages import CursorPaging, Paging, decode_cursor
 
 T = TypeVar("T", bound=BaseViewModel)
 
@@ -18,9 +18,9 @@ class PaginatedResponse(BaseViewModel, Generic[T]):
     has_next: bool = Field(..., title="是否有下一页", description="是否有下一页")
     has_prev: bool = Field(..., title="是否有上一页", description="是否有上一页")
     page: int = Field(..., title="当前页码", description="当前页码")
-    pages: int = Field(..., title="总页数", description="总页数")
+    pages: Optional[int] = Field(None, title="总页数", description="总页数，未统计总数时为空")
     per_page: int = Field(..., title="每页数量", description="每页数量")
-    total: int = Field(..., title="总数量", description="总数量")
+    total: Optional[int] = Field(None, title="总数量", description="总数量，未统计总数时为空，估算时为近似值")
     items: List[T] = Field(..., title="数据列表", description="数据列表")
 
     @classmethod
@@ -55,6 +55,42 @@ class PaginatedResponse(BaseViewModel, Generic[T]):
         }
 
 
+class CursorPaginatedResponse(BaseViewModel, Generic[T]):
+    """
+    游标分页响应模型
+    """
+
+    has_next: bool = Field(..., title="是否有下一页", description="是否有下一页")
+    next_cursor: Optional[str] = Field(None, title="下一页游标", description="获取下一页时作为 cursor 传入，没有下一页时为空")
+    per_page: int = Field(..., title="每页数量", description="每页数量")
+    items: List[T] = Field(..., title="数据列表", description="数据列表")
+
+    @classmethod
+    def from_paging(
+        cls, paging: CursorPaging, model: Type[T], other_mapper: dict[str, str] = None
+    ):
+        result_items = []
+        for item in paging.items:
+            inst = orm_model_to_view_model(item, model, other_mapper)
+            result_items.append(inst)
+        return cls(
+            has_next=paging.has_next,
+            next_cursor=paging.next_cursor,
+            per_page=paging.page_size,
+            items=result_items,
+        )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "has_next": True,
+                "next_cursor": "WzEwMjRd",
+                "per_page": 10,
+                "items": [],
+            }
+        }
+
+
 class PageRequest(BaseViewModel):
     """
     分页请求模型
@@ -62,7 +98,33 @@ class PageRequest(BaseViewModel):
 
     page: int = Query(1, title="页码", description="页码")
     per_page: int = Query(10, title="每页数量", ge=1, description="每页数量")
+    count_mode: Literal["exact", "none", "estimated", "cached"] = Query(
+        "exact",
+        title="总数统计方式",
+        description="exact: 精确统计；none: 不统计；estimated: 按执行计划估算，仅支持 PostgreSQL/Kingbase，"
+        "其他数据库返回的 total 为空；cached: 精确统计并缓存，未配置 page_count 缓存库时等同 exact",
+    )
+
+    class Config:
+        from_attributes = True
+        json_schema_extra = {"example": {"page": 1, "per_page": 10, "count_mode": "exact"}}
+
+
+class CursorPageRequest(BaseViewModel):
+    """
+    游标分页请求模型，首页不传 cursor
+    """
+
+    cursor: Optional[str] = Query(None, title="游标", description="上一页返回的 next_cursor")
+    per_page: int = Query(10, title="每页数量", ge=1, description="每页数量")
+
+    @field_validator("cursor")
+    @classmethod
+    def check_cursor(cls, value):
+        if value:
+            decode_cursor(value)
+        return value or None
 
     class Config:
         from_attributes = True
-        json_schema_extra = {"example": {"page": 1, "per_page": 10}}
+        json_schema_extra = {"example": {"cursor": None, "per_page": 10}}
@@ -0,0 +1,224 @@
+"""
+Web 层性能基准测试
+
+对比原生 ASGI 与 BaseHTTPMiddleware 两种请求过程中间件模式在 hello-world 路由上的吞吐量与延迟，
+以及视图路由处理函数在逐次绑定签名与预生成调用方式下的单次调用耗时。
+运行方式:
+    python -m mini_framework.web.toolkit.benchmark
+"""
+import asyncio
+import statistics
+import time
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    """
+    计算百分位数
+    :param values: 已排序的数值列表
+    :param percent: 百分位 (0-100)
+    :return:
+    """
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(percent / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def _build_app(middleware_cls):
+    """
+    构建仅包含 hello-world 路由的应用
+    :param middleware_cls: 请求过程中间件类
+    :return:
+    """
+    from mini_framework.web.mini_app import Application
+
+    app = Application(title="benchmark")
+    app.add_middleware(middleware_cls)
+
+    @app.get("/hello")
+    async def hello():
+        return {"message": "hello world"}
+
+    return app
+
+
+async def _run(app, total: int, concurrency: int) -> dict:
+    """
+    并发请求应用并统计结果
+    :param app: ASGI 应用
+    :param total: 请求总数
+    :param concurrency: 并发数
+    :return: 统计结果
+    """
+    import httpx
+
+    latencies: list[float] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        queue: asyncio.Queue = asyncio.Queue()
+        for _ in range(total):
+            queue.put_nowait(None)
+
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                start = time.perf_counter()
+                response = await client.get("/hello")
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    raise RuntimeError(f"unexpected status code: {response.status_code}")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return dict(
+        requests=total,
+        rps=total / elapsed if elapsed else 0.0,
+        mean_ms=statistics.mean(latencies) * 1000,
+        p50_ms=_percentile(latencies, 50) * 1000,
+        p99_ms=_percentile(latencies, 99) * 1000,
+    )
+
+
+def benchmark_middleware_modes(total: int = 5000, concurrency: int = 50) -> dict[str, dict]:
+    """
+    对比两种请求过程中间件模式
+    :param total: 每种模式的请求总数
+    :param concurrency: 并发数
+    :return: 以模式名称为键的统计结果
+    """
+    from mini_framework.web.middlewares.base import (
+        RequestProcessMiddleware,
+        BaseHTTPRequestProcessMiddleware,
+    )
+
+    modes = {
+        "asgi": RequestProcessMiddleware,
+        "base_http": BaseHTTPRequestProcessMiddleware,
+    }
+    results = {}
+    for mode, middleware_cls in modes.items():
+        app = _build_app(middleware_cls)
+        # 预热
+        asyncio.run(_run(app, min(total, 200), concurrency))
+        results[mode] = asyncio.run(_run(app, total, concurrency))
+    return results
+
+
+def _legacy_route_handler(view_cls, method_name: str):
+    """
+    逐次绑定签名的路由处理函数，作为对比基准
+    :param view_cls: 视图类
+    :param method_name: 视图方法名
+    :return:
+    """
+    import inspect
+
+    method = getattr(view_cls, method_name)
+    signature = inspect.signature(method)
+
+    async def route_handler(*args, **kwargs):
+        view_instance = view_cls()
+        bound = signature.bind(view_instance, *args, **kwargs)
+        bound.apply_defaults()
+        return await method(*bound.args, **bound.kwargs)
+
+    return route_handler
+
+
+def _build_view():
+    """
+    构建包含多个参数的视图
+    :return: 视图类与调用参数
+    """
+    from mini_framework.web.views import BaseView
+
+    class BenchmarkView(BaseView):
+        async def get(
+            self,
+            item_id: int,
+            name: str,
+            page: int = 1,
+            page_size: int = 20,
+            keyword: str = None,
+            order_by: str = "id",
+            desc: bool = False,
+            include_deleted: bool = False,
+        ):
+            return item_id
+
+    class StatelessBenchmarkView(BenchmarkView):
+        stateless = True
+
+    kwargs = dict(item_id=1, name="bench", page=2, page_size=50, keyword="k", order_by="name")
+    return BenchmarkView, StatelessBenchmarkView, kwargs
+
+
+async def _time_handler(handler, kwargs: dict, iterations: int) -> dict:
+    """
+    连续调用处理函数并统计单次耗时
+    :param handler: 路由处理函数
+    :param kwargs: 调用参数
+    :param iterations: 调用次数
+    :return: 统计结果
+    """
+    for _ in range(min(iterations, 1000)):
+        await handler(**kwargs)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await handler(**kwargs)
+    elapsed = time.perf_counter() - started
+    return dict(
+        calls=iterations,
+        us_per_call=elapsed / iterations * 1_000_000 if iterations else 0.0,
+    )
+
+
+def benchmark_route_handlers(iterations: int = 200000) -> dict[str, dict]:
+    """
+    对比视图路由处理函数的调用开销
+    :param iterations: 每种方式的调用次数
+    :return: 以方式名称为键的统计结果
+    """
+    from mini_framework.web.views import create_route_handler
+
+    view_cls, stateless_view_cls, kwargs = _build_view()
+    handlers = {
+        "bind": _legacy_route_handler(view_cls, "get"),
+        "compiled": create_route_handler(view_cls, "get")[0],
+        "stateless": create_route_handler(stateless_view_cls, "get")[0],
+    }
+    return {
+        mode: asyncio.run(_time_handler(handler, kwargs, iterations))
+        for mode, handler in handlers.items()
+    }
+
+
+def _print_results(title: str, results: dict[str, dict]):
+    print(title)
+    for mode, result in results.items():
+        print(
+            f"  {mode:<12} rps={result['rps']:>10.1f}  mean={result['mean_ms']:.3f}ms  "
+            f"p50={result['p50_ms']:.3f}ms  p99={result['p99_ms']:.3f}ms"
+        )
+
+
+def _setup_standalone_config():
+    """
+    独立运行时注入最小配置
+    """
+    from mini_framework.configurations.config_manager import ConfigManager
+
+    ConfigManager.set_cls_content(
+        {"web_server": {"name": "benchmark", "version": "0.0.0", "need_auth": False}}
+    )
+
+
+if __name__ == "__main__":
+    _setup_standalone_config()
+    _print_results("request process middleware", benchmark_middleware_modes())
+    print("route handler")
+    for mode, result in benchmark_route_handlers().items():
+        print(f"  {mode:<12} {result['us_per_call']:.3f}us/call")
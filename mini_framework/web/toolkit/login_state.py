@@ -50,7 +50,7 @@ class LoginStateManager:
         client_id = self.__tenant.client_id if self.__tenant else None
         cert = None if self.__tenant is None else self.__tenant.cert_content
         payload = await jwt_utils.verify(token, client_id, cert=cert)
-        self.__login_state_cache.delete(payload.get(UNIQUE_KEY))
+        await redis_client_manager.get_client_async("login_state").delete(payload.get(UNIQUE_KEY))
 
 
 login_state_manager = LoginStateManager()
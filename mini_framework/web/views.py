@@ -1,25 +1,85 @@
-from typing import Callable, Type, List, Tuple
+from typing import Callable, Optional, Type, List, Tuple, get_args
 
 from pydantic import create_model
 
 from mini_framework.utils.func_inspect import Function
+from mini_framework.web.responses import MiniJSONResponse
 from mini_framework.web.request_context import (
     request_context_manager,
     RequestContextManager,
 )
-from mini_framework.web.session import Session
+from mini_framework.web.session import Session, get_request_session
 from mini_framework.web.std_models.base_model import BaseViewModel
 
 
-def create_route_handler(view_cls: Type, method_name: str) -> Tuple[Callable, Function]:
+def create_view_factory(view_cls: Type) -> Callable[[], object]:
+    """
+    创建视图实例工厂，声明为无状态的视图只创建一个实例并复用
+    :param view_cls: 视图类
+    :return: 返回视图实例的函数
+    """
+    if not getattr(view_cls, "stateless", False):
+        return view_cls
+
+    instance = None
+
+    def get_instance():
+        nonlocal instance
+        if instance is None:
+            instance = view_cls()
+        return instance
+
+    return get_instance
+
+
+def _paged_response_source(response_model) -> Optional[tuple]:
+    """
+    动态创建的分页响应模型的基类与条目类型，视图返回基类实例时可以直接转换，其他模型返回 None
+    """
+    from mini_framework.web.std_models.page import CursorPaginatedResponse, PaginatedResponse
+
+    if not isinstance(response_model, type) or not response_model.__bases__:
+        return None
+    base = response_model.__bases__[0]
+    if base not in (PaginatedResponse, CursorPaginatedResponse):
+        return None
+    args = get_args(response_model.model_fields["items"].annotation)
+    return (base, args[0]) if args else None
+
+
+def create_route_handler(
+    view_cls: Type, method_name: str, response_model=None, func: Function = None
+) -> Tuple[Callable, Function]:
+    """
+    在注册时生成路由处理函数
+    FastAPI 按声明的签名以关键字参数调用处理函数，参数校验与默认值由解释器在调用视图方法时完成，
+    因此每次请求不再进行 Signature.bind 与 apply_defaults
+    :param view_cls: 视图类
+    :param method_name: 视图方法名
+    :param response_model: 路由注册的响应模型，返回值正是该类型的实例时直接输出
+    :param func: 视图方法的函数描述，为空时重新解析
+    :return: 路由处理函数与函数描述
+    """
     method = getattr(view_cls, method_name)
-    func = Function(method)
+    if func is None:
+        func = Function(method)
+    view_factory = create_view_factory(view_cls)
+    paged_source = _paged_response_source(response_model)
 
     async def route_handler(*args, **kwargs):
-        view_instance = view_cls()
-        bound = func.signature.bind(view_instance, *args, **kwargs)
-        bound.apply_defaults()
-        return await method(*bound.args, **bound.kwargs)
+        result = await method(view_factory(), *args, **kwargs)
+        # 视图返回 PaginatedResponse.from_paging 等基类实例且条目类型一致时，不经校验构造为路由的响应模型
+        if paged_source is not None and type(result) is paged_source[0]:
+            base, item_cls = paged_source
+            if all(type(item) is item_cls for item in result.items):
+                result = response_model.model_construct(
+                    _fields_set=result.model_fields_set,
+                    **{name: getattr(result, name) for name in base.model_fields},
+                )
+        # 返回值正是响应模型的实例时直接输出，跳过 FastAPI 的再次校验与 jsonable_encoder 转换
+        if response_model is not None and type(result) is response_model:
+            return MiniJSONResponse(result)
+        return result
 
     # 动态设置函数签名，以便 Swagger 文档正确生成
     new_sig = func.signature.replace(
@@ -27,6 +87,9 @@ def create_route_handler(view_cls: Type, method_name: str) -> Tuple[Callable, Fu
         return_annotation=func.return_annotation,
     )
     route_handler.__signature__ = new_sig
+    response_cache = getattr(method, "response_cache", None)
+    if response_cache is not None:
+        route_handler.response_cache = response_cache
     return route_handler, func
 
 
@@ -41,6 +104,17 @@ def create_paginated_response_model(
     return model
 
 
+def create_cursor_paginated_response_model(
+    item_type: Type[BaseViewModel],
+) -> Type[BaseViewModel]:
+    type_name = f"CursorPaginatedResponse_{item_type.__name__}"
+    fields = {"items": (List[item_type], ...)}
+    from mini_framework.web.std_models.page import CursorPaginatedResponse
+
+    model = create_model(type_name, __base__=CursorPaginatedResponse, **fields)
+    return model
+
+
 def get_response_cls(method_name, response_cls, func: Function):
     """
     获取响应模型
@@ -58,6 +132,8 @@ def get_response_cls(method_name, response_cls, func: Function):
         response_model = List[response_cls]
     elif method_name == "page" and response_cls:
         response_model = create_paginated_response_model(response_cls)
+    elif method_name == "page_cursor" and response_cls:
+        response_model = create_cursor_paginated_response_model(response_cls)
     elif method_name == "post" and response_cls:
         response_model = response_cls
     elif method_name == "put" and response_cls:
@@ -68,12 +144,18 @@ def get_response_cls(method_name, response_cls, func: Function):
 
 
 class BaseView:
+    # 视图不保存请求相关的实例状态时可声明为 True，所有请求复用同一个实例
+    stateless: bool = False
+
     def __init__(self):
         self.request_context_manager: RequestContextManager = request_context_manager
 
     @property
     def session(self) -> Session:
-        return Session(self.request_context_manager.current().session_id)
+        """
+        请求范围内的会话，同一请求内多次访问只加载一次，修改在请求结束时一次写回
+        """
+        return get_request_session(self.request_context_manager.current())
 
     @staticmethod
     def register_routes(cls, path: str, response_cls, description: str = None):
@@ -93,6 +175,7 @@ class BaseView:
             "get": "单个获取",
             "query": "查询列表",
             "page": "分页查询",
+            "page_cursor": "游标分页查询",
             "post": "新增",
             "put": "修改",
             "delete": "删除",
@@ -111,25 +194,32 @@ class BaseView:
             method_name = split_name[0]
             if method_name not in methods:
                 continue
+            # page_cursor 与 page_cursor_* 为游标分页，路径为 cursor 与 cursor-*
+            method_kind = (
+                "page_cursor"
+                if cls_method == "page_cursor" or cls_method.startswith("page_cursor_")
+                else method_name
+            )
             method_suffix = ""
             if method_name in ["page", "query"]:
                 method_suffix = method_name
             method_name = "get" if method_name in ["page", "query"] else method_name
             if len(split_name) == 2:
                 method_suffix = split_name[1].replace("_", "-")
-            method_describes[method_name] = method_describes.get(
-                split_name[0], method_suffix
-            )
+            # 按方法种类取说明，不写回共享的说明表，避免影响之后同名 HTTP 方法的路由
+            method_describe = method_describes.get(method_kind, method_suffix)
             real_method = method_name
             real_path = f"{path}/{method_suffix}"
-            handler, func = create_route_handler(cls, cls_method)
+            func = Function(getattr(cls, cls_method))
+            # 与路由注册使用同一个响应模型，动态创建的分页模型才能命中直接输出
+            response_model = get_response_cls(method_kind, response_cls, func)
+            handler, func = create_route_handler(cls, cls_method, response_model, func)
             real_summary = func.summary.title if func.summary else None
             real_description = (
-                f"{description} - {method_describes[method_name]}"
+                f"{description} - {method_describe}"
                 if not func.summary
                 else func.summary.description
             )
-            response_model = get_response_cls(split_name[0], response_cls, func)
             routers.append(
                 dict(
                     path=real_path,